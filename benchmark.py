@@ -0,0 +1,194 @@
+import argparse
+import itertools
+import json
+import sys
+import time
+import numpy as np
+from src.gestures.detector import HandGestureDetector
+from src.replay.replay import Recording, ReplayHands, ReplaySource
+from src.config.settings import (MODEL_COMPLEXITY, GESTURE_SMOOTHING_FRAMES, GESTURE_SMOOTHING_POLICY,
+                                 INFERENCE_DOWNSCALE)
+
+# Gestures that trigger a Spotify command in the controllers
+COMMAND_GESTURES = {"Play/Pause", "Next Track", "Previous Track", "Volume Up", "Volume Down"}
+
+PERCENTILES = (50, 90, 99)
+
+# Fields that identify a configuration when comparing against a baseline
+CONFIG_FIELDS = ("mode", "model_complexity", "resolution", "smoothing", "policy", "roi", "downscale")
+
+# Stage latency changes smaller than this are timer noise, whatever the percentage
+REGRESSION_FLOOR_MS = 0.05
+
+
+def percentiles_ms(samples):
+    if not samples:
+        return {f"p{p}": None for p in PERCENTILES}
+    values = np.percentile(np.asarray(samples) * 1000, PERCENTILES)
+    return {f"p{p}": round(float(v), 3) for p, v in zip(PERCENTILES, values)}
+
+
+def run_config(recording, use_model, model_complexity, resolution, smoothing, policy,
+               roi_tracking=False, downscale=1.0):
+    """Replay a recording through the detector and measure one configuration"""
+    hands = None if use_model else ReplayHands(recording)
+    # Recorded landmarks are already full-frame, so ROI cropping only applies with the model
+    detector = HandGestureDetector(smoothing_frames=smoothing, smoothing_policy=policy,
+                                   model_complexity=model_complexity, hands=hands,
+                                   roi_tracking=roi_tracking and use_model, downscale=downscale,
+                                   idle_mode=False)
+    source = ReplaySource(recording, size=resolution)
+
+    stages = {"find_hands": [], "find_landmarks": [], "get_gesture": [], "total": []}
+    command_latencies = []
+    onset = {}  # Raw gesture -> recorded time its current run started
+    previous_raw = None
+    previous_smoothed = detector.last_gesture
+
+    wall_start = time.perf_counter()
+    frames = 0
+    try:
+        while True:
+            success, img = source.read()
+            if not success:
+                break
+            recorded_at = source.timestamp()
+
+            t0 = time.perf_counter()
+            detector.find_hands(img, draw=False)
+            t1 = time.perf_counter()
+            hands = detector.find_all_landmarks()
+            t2 = time.perf_counter()
+            gesture = detector.get_hands_gesture(hands, recorded_at)
+            t3 = time.perf_counter()
+
+            stages["find_hands"].append(t1 - t0)
+            stages["find_landmarks"].append(t2 - t1)
+            stages["get_gesture"].append(t3 - t2)
+            stages["total"].append(t3 - t0)
+            frames += 1
+
+            # Track when each raw classification run started so we can tell how long
+            # smoothing took to turn it into a command
+            raw = detector.gesture_history[-1]
+            if raw != previous_raw:
+                onset = {raw: recorded_at}
+                previous_raw = raw
+
+            if gesture != previous_smoothed and gesture in COMMAND_GESTURES and gesture in onset:
+                command_latencies.append((recorded_at - onset[gesture]) + (t3 - t0))
+            previous_smoothed = gesture
+    finally:
+        source.release()
+
+    wall_time = time.perf_counter() - wall_start
+    return {
+        "mode": "model" if use_model else "landmarks",
+        "model_complexity": model_complexity,
+        "resolution": f"{resolution[0]}x{resolution[1]}" if resolution else "native",
+        "smoothing": smoothing,
+        "policy": policy,
+        "roi": detector.roi_tracking,
+        "downscale": downscale,
+        "frames": frames,
+        "fps": round(frames / wall_time, 1) if wall_time > 0 else 0.0,
+        "stages_ms": {name: percentiles_ms(samples) for name, samples in stages.items()},
+        "commands": len(command_latencies),
+        "gesture_to_command_ms": percentiles_ms(command_latencies),
+    }
+
+
+def format_result(result):
+    lines = [
+        f"[{result['mode']}] complexity={result['model_complexity']} resolution={result['resolution']} "
+        f"smoothing={result['smoothing']} ({result['policy']}) roi={result['roi']} downscale={result['downscale']}: "
+        f"{result['frames']} frames, {result['fps']} fps"
+    ]
+    for name, stats in list(result["stages_ms"].items()) + [("gesture->command", result["gesture_to_command_ms"])]:
+        values = ", ".join(f"{p}={v:.2f}ms" if v is not None else f"{p}=n/a" for p, v in stats.items())
+        lines.append(f"    {name:<18} {values}")
+    return "\n".join(lines)
+
+
+def find_regressions(results, baseline, max_regression):
+    """Messages for every p90 stage latency or FPS that got more than `max_regression` % worse"""
+    previous = {tuple(result[field] for field in CONFIG_FIELDS): result for result in baseline}
+    regressions = []
+    compared = 0
+    for result in results:
+        old = previous.get(tuple(result[field] for field in CONFIG_FIELDS))
+        if old is None:
+            continue
+        compared += 1
+        name = " ".join(f"{field}={result[field]}" for field in CONFIG_FIELDS)
+        for stage, stats in result["stages_ms"].items():
+            before = old["stages_ms"].get(stage, {}).get("p90")
+            after = stats["p90"]
+            if before is None or after is None:
+                continue
+            if after > before * (1 + max_regression / 100) and after - before > REGRESSION_FLOOR_MS:
+                regressions.append(f"{name}: {stage} p90 {before:.2f}ms -> {after:.2f}ms")
+        if result["fps"] < old["fps"] * (1 - max_regression / 100):
+            regressions.append(f"{name}: {old['fps']} fps -> {result['fps']} fps")
+    if not compared:
+        regressions.append("No configuration matches the baseline")
+    return regressions
+
+
+def parse_resolution(text):
+    if text == "native":
+        return None
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the gesture pipeline on a recording")
+    parser.add_argument("recording", help="Directory written by src/replay/recorder.py")
+    parser.add_argument("--model", action="store_true",
+                        help="Run MediaPipe on the recorded frames instead of replaying recorded landmarks")
+    parser.add_argument("--model-complexity", type=int, nargs="+", default=[MODEL_COMPLEXITY])
+    parser.add_argument("--resolution", nargs="+", default=["native"], help="e.g. 640x480 320x240")
+    parser.add_argument("--smoothing", type=int, nargs="+", default=[GESTURE_SMOOTHING_FRAMES])
+    parser.add_argument("--policy", nargs="+", default=[GESTURE_SMOOTHING_POLICY])
+    parser.add_argument("--roi", action="store_true", help="Enable ROI tracking (with --model)")
+    parser.add_argument("--downscale", type=float, nargs="+", default=[INFERENCE_DOWNSCALE],
+                        help="Full-frame search scale factors, e.g. 1.0 0.5")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Results written by an earlier --json run to compare against")
+    parser.add_argument("--max-regression", type=float, default=10.0,
+                        help="Percent a p90 stage latency or the FPS may get worse before the run fails")
+    parser.add_argument("--check", action="store_true",
+                        help="Also replay the recording through the stateful components and verify them")
+    args = parser.parse_args()
+
+    recording = Recording(args.recording)
+    results = []
+    for complexity, resolution, smoothing, policy, downscale in itertools.product(
+            args.model_complexity, args.resolution, args.smoothing, args.policy, args.downscale):
+        result = run_config(recording, args.model, complexity, parse_resolution(resolution), smoothing, policy,
+                            args.roi, downscale)
+        print(format_result(result))
+        results.append(result)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failed = False
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        failed = failed or bool(regressions)
+
+    if args.check:
+        from src.replay.checks import run_checks
+        for name, failures in run_checks(recording).items():
+            print(f"check {name}: {'FAILED' if failures else 'ok'}")
+            for failure in failures:
+                print(f"    {failure}")
+            failed = failed or bool(failures)
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,236 @@
+import argparse
+import json
+import math
+import threading
+import time
+from types import SimpleNamespace
+import numpy as np
+from src.main import SpotifyGestureController
+from src.spotify.client import SpotifyClient
+from src.spotify.dispatcher import CommandDispatcher
+from src.spotify.fake_api import FakeSpotifyAPI, FakePlayer, default_tracks
+from src.spotify.track_scheduler import TrackScheduler
+from src.spotify.volume import VolumeWriter
+from src.gestures.landmarks import DIAL_GESTURE
+from src.metrics.metrics import metrics
+from src.config.settings import VOLUME_WRITE_INTERVAL
+
+PERCENTILES = (50, 90, 99)
+
+# Gestures cycled through by each synthetic pattern
+PATTERNS = {
+    "commands": ["Play/Pause", "Next Track", "Volume Up", "Previous Track", "Volume Down"],
+    "volume": ["Volume Up", "Volume Down"],
+    "skips": ["Next Track", "Previous Track"],
+}
+
+
+def percentiles_ms(samples):
+    if not samples:
+        return {f"p{p}": None for p in PERCENTILES}
+    values = np.percentile(np.asarray(samples) * 1000, PERCENTILES)
+    return {f"p{p}": round(float(v), 3) for p, v in zip(PERCENTILES, values)}
+
+
+def synthetic_stream(pattern, seconds, fps, hold, gap):
+    """(time, gesture, volume target) per frame: each gesture held for `hold` seconds, then no hand for `gap`"""
+    frames = int(seconds * fps)
+    for i in range(frames):
+        t = i / fps
+        if pattern == "dial":
+            # Sweep the volume up and down every four seconds
+            yield t, DIAL_GESTURE, 50 + 45 * math.sin(2 * math.pi * t / 4)
+            continue
+        gestures = PATTERNS[pattern]
+        step = int(t // (hold + gap))
+        if t - step * (hold + gap) < hold:
+            yield t, gestures[step % len(gestures)], None
+        else:
+            yield t, "No Hand", None
+
+
+def recording_stream(path):
+    """(time, gesture, volume target) per frame of a recording, classified by the detector"""
+    from src.gestures.detector import HandGestureDetector
+    from src.replay.replay import Recording, ReplayHands, ReplaySource
+
+    recording = Recording(path)
+    detector = HandGestureDetector(hands=ReplayHands(recording), idle_mode=False)
+    source = ReplaySource(recording)
+    start = None
+    try:
+        while True:
+            success, img = source.read()
+            if not success:
+                return
+            recorded_at = source.timestamp()
+            start = recorded_at if start is None else start
+            detector.find_hands(img, draw=False)
+            gesture = detector.get_hands_gesture(detector.find_all_landmarks(), recorded_at)
+            yield recorded_at - start, gesture, detector.volume_target
+    finally:
+        source.release()
+
+
+class LoadController(SpotifyGestureController):
+    """The desktop controller's gesture handling against a given Web API, without camera, model or window"""
+
+    def __init__(self, api_url, cooldown, poll_tracks=False):
+        # Only the state process_gesture() relies on; nothing from the frame loop is started
+        self.spotify = SpotifyClient(api_url=api_url)
+        self.dispatcher = CommandDispatcher(self.spotify)
+        self.tracks = TrackScheduler(self.spotify)
+        self.dispatcher.add_listener(self.on_command_event)
+        self.volume_writer = VolumeWriter(self.dispatcher)
+        self.detector = SimpleNamespace(volume_target=None)
+        self.prev_gesture = None
+        self.gesture_cooldown = cooldown
+        self.last_action_time = 0
+        self.gestures = 0
+        self.spotify.connect()
+        if poll_tracks:
+            self.tracks.start()
+
+    def replay(self, stream):
+        """Feed a gesture stream through process_gesture() in real time (the cooldown is wall-clock based)"""
+        start = time.perf_counter()
+        for t, gesture, volume_target in stream:
+            delay = start + t - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.detector.volume_target = volume_target
+            if gesture != DIAL_GESTURE:
+                self.volume_writer.release()
+            if gesture != "No Hand" and gesture != "Unknown Gesture":
+                self.gestures += 1
+                self.process_gesture(gesture)
+
+    def finish(self, timeout=10.0):
+        # Let the volume writer send its last target, then wait for the dispatcher to run dry
+        time.sleep(VOLUME_WRITE_INTERVAL)
+        self.volume_writer.stop()
+        self.dispatcher.flush(timeout)
+        self.dispatcher.stop()
+        self.tracks.stop()
+        self.spotify.close()
+
+
+def run_load(args, api_url):
+    stream_args = (args.pattern, args.seconds, args.fps, args.hold, args.gap)
+    controllers = [LoadController(api_url, args.cooldown, args.poll_tracks) for _ in range(args.clients)]
+    events = []
+    lock = threading.Lock()
+
+    def collect(event):
+        with lock:
+            events.append(event)
+
+    for controller in controllers:
+        controller.dispatcher.add_listener(collect)
+
+    def drive(controller):
+        stream = recording_stream(args.recording) if args.recording else synthetic_stream(*stream_args)
+        controller.replay(stream)
+
+    wall_start = time.perf_counter()
+    threads = [threading.Thread(target=drive, args=(controller,), daemon=True) for controller in controllers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for controller in controllers:
+        controller.finish()
+    wall_time = time.perf_counter() - wall_start
+
+    by_command = {}
+    for event in events:
+        counts = by_command.setdefault(event["command"], {"ok": 0, "failed": 0})
+        counts["ok" if event["ok"] else "failed"] += 1
+    errors = {}
+    for event in events:
+        if not event["ok"]:
+            errors[event["error"]] = errors.get(event["error"], 0) + 1
+
+    snapshot = metrics.snapshot()
+    return {
+        "source": args.recording or args.pattern,
+        "clients": args.clients,
+        "seconds": round(wall_time, 2),
+        "gestures": sum(controller.gestures for controller in controllers),
+        "commands": len(events),
+        "ok": sum(1 for event in events if event["ok"]),
+        "throughput": round(len(events) / wall_time, 2) if wall_time > 0 else 0.0,
+        "by_command": by_command,
+        "errors": errors,
+        "command_ms": percentiles_ms([event["latency"] for event in events]),
+        "end_to_end_ms": percentiles_ms([event["queued"] + event["latency"] for event in events]),
+        "requests_ms": {label: values for label, values in snapshot["latency_ms"].items()
+                        if label.startswith("spotify")},
+        "retries": sum(value for name, value in snapshot["counters"].items()
+                       if name.startswith("spotify_request_retries")),
+    }
+
+
+def format_result(result):
+    lines = [
+        f"[{result['source']}] {result['clients']} client(s), {result['seconds']}s: {result['gestures']} gesture frames, "
+        f"{result['commands']} commands ({result['ok']} ok), {result['throughput']} commands/s, "
+        f"{result['retries']} retries"
+    ]
+    for name in ("command_ms", "end_to_end_ms"):
+        values = ", ".join(f"{p}={v:.1f}ms" if v is not None else f"{p}=n/a" for p, v in result[name].items())
+        lines.append(f"    {name[:-3]:<28} {values}")
+    for label, values in sorted(result["requests_ms"].items()):
+        lines.append(f"    {label:<28} " + ", ".join(f"{p}={v:.1f}ms" for p, v in values.items()))
+    for command, counts in sorted(result["by_command"].items()):
+        lines.append(f"    {command:<28} ok={counts['ok']} failed={counts['failed']}")
+    for error, count in sorted(result["errors"].items(), key=lambda item: -item[1]):
+        lines.append(f"    error x{count}: {error}")
+    if "server" in result:
+        lines.append(f"    server: {result['server']['requests']} requests, by status {result['server']['by_status']}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive gesture streams through the command path against a fake Spotify API")
+    parser.add_argument("--recording", help="Replay the gestures of a recording instead of a synthetic pattern")
+    parser.add_argument("--pattern", choices=sorted(PATTERNS) + ["dial"], default="commands")
+    parser.add_argument("--seconds", type=float, default=20, help="Length of a synthetic stream")
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--hold", type=float, default=0.4, help="Seconds each synthetic gesture is held")
+    parser.add_argument("--gap", type=float, default=0.2, help="Seconds without a hand between gestures")
+    parser.add_argument("--cooldown", type=float, default=0.5, help="Gesture cooldown (the app uses 1.0)")
+    parser.add_argument("--clients", type=int, default=1, help="Controllers driving the API concurrently")
+    parser.add_argument("--poll-tracks", action="store_true", help="Run the track scheduler alongside")
+    parser.add_argument("--api-url", help="Use an already running fake API instead of starting one")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--track-seconds", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the result to this file")
+    args = parser.parse_args()
+
+    api = None
+    api_url = args.api_url
+    if api_url is None:
+        player = FakePlayer(default_tracks(duration_ms=int(args.track_seconds * 1000)))
+        api = FakeSpotifyAPI(latency=args.latency, jitter=args.jitter, rate_limit_rate=args.rate_limit_rate,
+                             retry_after=args.retry_after, error_rate=args.error_rate, player=player,
+                             seed=args.seed).start()
+        api_url = api.url
+
+    try:
+        result = run_load(args, api_url)
+    finally:
+        if api is not None:
+            api.stop()
+    if api is not None:
+        result["server"] = api.stats()
+    print(format_result(result))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
@@ -0,0 +1,5 @@
+from src.multicam.pool import DetectorPool
+
+if __name__ == "__main__":
+    pool = DetectorPool()
+    pool.run()
@@ -0,0 +1,248 @@
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+import cv2
+import numpy as np
+from src.metrics.metrics import metrics, FRAMES_DROPPED
+from src.config.settings import (CAMERA_SOURCE, FRAME_WIDTH, FRAME_HEIGHT, TARGET_FPS, CAMERA_BUFFER_SIZE,
+                                 CAMERA_THREADED, CAMERA_READ_TIMEOUT)
+
+
+class Frame:
+    """One captured image with its capture time (time.time()) and sequence number"""
+
+    __slots__ = ("img", "captured_at", "seq")
+
+    def __init__(self, img, captured_at, seq):
+        self.img = img
+        self.captured_at = captured_at
+        self.seq = seq
+
+    @property
+    def age(self):
+        """Seconds since the frame was captured"""
+        return time.time() - self.captured_at
+
+
+class FrameSource(ABC):
+    """Base class for everything the gesture loops read frames from
+
+    Subclasses implement `_grab()`. `read_frame()` returns a Frame (or None
+    when the source is exhausted) and `read()` keeps the `cv2.VideoCapture`
+    interface the loops were written against.
+    """
+
+    def __init__(self):
+        self.seq = 0
+
+    @abstractmethod
+    def _grab(self):
+        """Next image, or None when the source has no more frames"""
+
+    def read_frame(self):
+        img = self._grab()
+        if img is None:
+            return None
+        self.seq += 1
+        return Frame(img, time.time(), self.seq)
+
+    def read(self, image=None):
+        frame = self.read_frame()
+        if frame is None:
+            return False, None
+        return True, frame.img
+
+    def isOpened(self):
+        return True
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        pass
+
+
+class CameraSource(FrameSource):
+    """A camera opened with the app's capture settings"""
+
+    def __init__(self, index, width=FRAME_WIDTH, height=FRAME_HEIGHT, fps=TARGET_FPS, buffer_size=CAMERA_BUFFER_SIZE):
+        super().__init__()
+        self.index = index
+        self.cap = cv2.VideoCapture(index)
+        if not self.cap.isOpened():
+            print(f"Failed to open camera with index {index}")
+
+        # Set camera properties for higher FPS
+        self.cap.set(cv2.CAP_PROP_FPS, fps)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+        # A short driver queue keeps queued frames from going stale (not every backend honors it)
+        if buffer_size:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+
+    def _grab(self):
+        success, img = self.cap.read()
+        return img if success else None
+
+    def read(self, image=None):
+        # Passed straight through so callers can capture into their own buffer
+        if image is None:
+            return self.cap.read()
+        return self.cap.read(image=image)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def release(self):
+        self.cap.release()
+
+
+class FileSource(FrameSource):
+    """A video file, played back at its own frame rate unless `realtime` is False"""
+
+    def __init__(self, path, loop=False, realtime=True):
+        super().__init__()
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+        fps = self.cap.get(cv2.CAP_PROP_FPS) or TARGET_FPS
+        self.interval = 1.0 / fps if realtime else 0.0
+        self._next = None
+
+    def _grab(self):
+        success, img = self.cap.read()
+        if not success and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, img = self.cap.read()
+        if not success:
+            return None
+        self._next = pace(self._next, self.interval)
+        return img
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class SyntheticSource(FrameSource):
+    """Generated frames (a bar sweeping across a gradient) for running without a camera"""
+
+    def __init__(self, width=FRAME_WIDTH, height=FRAME_HEIGHT, fps=TARGET_FPS, frames=None):
+        super().__init__()
+        self.width = width
+        self.height = height
+        self.interval = 1.0 / fps if fps else 0.0
+        self.frames = frames  # Stop after this many frames (None = forever)
+        self._background = np.repeat(np.linspace(0, 255, width, dtype=np.uint8)[None, :, None], height, axis=0)
+        self._background = np.repeat(self._background, 3, axis=2)
+        self._next = None
+
+    def _grab(self):
+        if self.frames is not None and self.seq >= self.frames:
+            return None
+        img = self._background.copy()
+        x = (self.seq * 8) % self.width
+        img[:, x:x + 20] = (0, 200, 255)
+        self._next = pace(self._next, self.interval)
+        return img
+
+
+class ThreadedSource(FrameSource):
+    """Reads another source on a grabber thread and always hands out the newest frame
+
+    Frames that arrive while the consumer is busy replace each other instead
+    of queueing in the driver, so processing always starts from the freshest
+    image. Each frame keeps the wrapped source's capture time for latency
+    measurements; `dropped` counts frames that were never read.
+    """
+
+    def __init__(self, source, timeout=CAMERA_READ_TIMEOUT):
+        super().__init__()
+        self.source = source
+        self.timeout = timeout
+        self.dropped = 0
+        self._cond = threading.Condition()
+        self._frame = None
+        self._last_seq = 0
+        self._finished = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._grab_loop, name="frame-grabber", daemon=True)
+        self._thread.start()
+
+    def _grab_loop(self):
+        while not self._stop.is_set():
+            frame = self.source.read_frame()
+            with self._cond:
+                if frame is None:
+                    self._finished = True
+                    self._cond.notify_all()
+                    return
+                if self._frame is not None and self._frame.seq > self._last_seq:
+                    # Replaced before anyone read it: latest-frame-wins at work
+                    self.dropped += 1
+                    metrics.increment(FRAMES_DROPPED, stage="grabber")
+                self._frame = frame
+                self._cond.notify_all()
+
+    def read_frame(self):
+        """Newest frame not returned before; None on timeout or once the source is exhausted"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._finished or (self._frame is not None
+                                                           and self._frame.seq > self._last_seq), self.timeout)
+            if self._frame is None or self._frame.seq <= self._last_seq:
+                return None
+            self._last_seq = self._frame.seq
+            return self._frame
+
+    def _grab(self):
+        # read_frame() is overridden to keep the wrapped source's capture times; this only serves direct callers
+        frame = self.read_frame()
+        return frame.img if frame is not None else None
+
+    def isOpened(self):
+        return self.source.isOpened()
+
+    def set(self, prop, value):
+        return self.source.set(prop, value)
+
+    def release(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self.source.release()
+
+
+def pace(deadline, interval):
+    """Sleep until `deadline` and return the next one, so generated or file frames arrive in real time"""
+    if not interval:
+        return None
+    now = time.perf_counter()
+    if deadline is None or deadline < now - interval:
+        # First frame, or we fell behind: restart the schedule rather than rushing
+        return now + interval
+    if deadline > now:
+        time.sleep(deadline - now)
+    return deadline + interval
+
+
+def open_source(source=CAMERA_SOURCE, threaded=CAMERA_THREADED):
+    """Open a frame source from a camera index, video file, recording directory or "synthetic"
+
+    Only cameras are wrapped in a ThreadedSource; files, recordings and
+    synthetic frames are already produced on demand.
+    """
+    if isinstance(source, int) or str(source).isdigit():
+        camera = CameraSource(int(source))
+        return ThreadedSource(camera) if threaded else camera
+    if source == "synthetic":
+        return SyntheticSource()
+    if os.path.isdir(source):
+        from src.replay.replay import Recording, ReplaySource
+        return ReplaySource(Recording(source), loop=True)
+    return FileSource(source)
@@ -8,15 +8,120 @@ load_dotenv()
 SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
 SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
 SPOTIFY_REDIRECT_URI = os.getenv("SPOTIFY_REDIRECT_URI")
+SPOTIFY_API_URL = os.getenv("SPOTIFY_API_URL")  # Web API base URL override, e.g. the local fake; None = Spotify
 
 # Gesture recognition settings
 CAMERA_INDEX = 0  # Default camera (usually webcam)
+CAMERA_SOURCE = os.getenv("CAMERA_SOURCE", str(CAMERA_INDEX))  # Camera index, video file, recording dir or "synthetic"
+CAMERA_SOURCES = [CAMERA_INDEX]  # Camera indices or video files for multi-camera mode
+CAMERA_THREADED = True  # Grab camera frames on a thread and always process the newest one
+CAMERA_BUFFER_SIZE = 1  # Frames the camera driver may queue (0 keeps the driver default)
+CAMERA_READ_TIMEOUT = 5.0  # Seconds without a new frame before a threaded camera counts as failed
+FRAME_WIDTH = 640  # Capture resolution
+FRAME_HEIGHT = 480
+MAX_NUM_HANDS = None  # Hands MediaPipe tracks; None = 2 only when HAND_ROLES or TWO_HAND_GESTURES need them
+HAND_ROLES = {}  # Restrict each hand to a role, e.g. {"Left": "volume", "Right": "transport"}
+TWO_HAND_GESTURES = {}  # (left hand gesture, right hand gesture) -> gesture, e.g. {("Fist", "Fist"): "Play/Pause"}
 DETECTION_CONFIDENCE = 0.8  # Increased from 0.7 for better accuracy
 TRACKING_CONFIDENCE = 0.8  # Increased from 0.7 for better accuracy
+MODEL_COMPLEXITY = 1  # MediaPipe hand model: 0 = lite, 1 = full (more accurate)
+
+# Inference region settings
+ROI_TRACKING = False  # Run inference on a crop around the previous frame's hand (enable if benchmark.py --model --roi shows a gain)
+ROI_PADDING = 0.5  # Padding added on each side of the hand, as a fraction of its size
+ROI_MIN_SIZE = 120  # Smallest hand box (pixels) used to size the crop
+ROI_MAX_AREA = 0.6  # Skip cropping when the crop would cover more than this share of the frame
+INFERENCE_DOWNSCALE = 1.0  # Scale factor for full-frame hand search (e.g. 0.5 halves each side)
+
+# Idle mode settings
+IDLE_MODE = True  # Gate inference on motion while no hand is in view
+IDLE_AFTER_SECONDS = 3  # Seconds without a hand before dropping to idle
+IDLE_PROBE_FPS = 2  # Inference rate while idle and nothing is moving
+MOTION_THRESHOLD = 4.0  # Mean absolute pixel difference (0-255) that counts as motion
+MOTION_SIZE = (80, 60)  # Thumbnail size used for motion detection
 GESTURE_SMOOTHING_FRAMES = 5  # Number of frames to smooth gesture detection
+GESTURE_SMOOTHING_POLICY = "majority"  # "majority", "hysteresis" or "confidence"
+SMOOTHING_MAJORITY_THRESHOLD = 0.6  # Share of the window a new gesture needs (majority/confidence)
+SMOOTHING_ENTER_THRESHOLD = 0.6  # Hysteresis: share a new gesture needs to take over
+SMOOTHING_EXIT_THRESHOLD = 0.3  # Hysteresis: the current gesture is kept while above this share
+SMOOTHING_ENTER_TIME = 0.1  # Hysteresis: seconds a new gesture must lead before switching
+SMOOTHING_MIN_HOLD = 0.2  # Hysteresis: minimum seconds a gesture stays active
+SMOOTHING_MIN_CONFIDENCE = 0.5  # Confidence: frames below this confidence don't vote
 
 # Volume control settings
 VOLUME_STEP = 5  # Percentage to increase/decrease volume
+VOLUME_MODE = "step"  # "step": Volume Up/Down gestures; "continuous": pinch thumb and index with 3 fingers up
+PINCH_RANGE = (0.15, 0.9)  # Pinch distance (relative to hand size) mapped to 0% and 100% volume
+VOLUME_SMOOTHING = 0.5  # Weight of the newest pinch reading in the volume target (1 = no smoothing)
+VOLUME_WRITE_INTERVAL = 0.2  # Minimum seconds between volume writes while dialing
+VOLUME_DEADBAND = 2  # Volume changes (percentage points) smaller than this are not sent
 
 # FPS settings
-TARGET_FPS = 60  # Target frames per second
\ No newline at end of file
+TARGET_FPS = 60  # Target frames per second (the most the frame scheduler paces to)
+FPS_GOVERNOR = True  # Lower the frame rate when processing can't keep up with it, raise it again with headroom
+MIN_FPS = 10  # The governor never paces below this
+IDLE_FPS = 10  # Frame rate while the idle governor has parked the hand model
+FPS_GOVERNOR_LOAD = 0.8  # Fraction of each frame interval the governor lets processing take
+FPS_GOVERNOR_INTERVAL = 1.0  # Seconds between governor adjustments
+
+# Headless mode settings
+HEADLESS_FPS = 30  # Frame rate the headless daemon paces itself to
+HEADLESS_STATS_INTERVAL = 60  # Seconds between structured stats log lines
+
+# Web video feed settings
+JPEG_QUALITY = 80  # JPEG quality (0-100) for the /video_feed stream
+STATE_MAX_UPDATES_PER_SECOND = 10  # Cap on Socket.IO state updates sent to the browser
+
+# Album art proxy settings
+COVER_CACHE_DIR = ".cover_cache"  # On-disk album art cache used by /cover/<id>
+COVER_CACHE_ITEMS = 64  # Album images kept in memory
+COVER_CACHE_DISK_MB = 50  # Size limit of the on-disk cache
+COVER_SIZES = (64, 150, 300, 640)  # Sizes /cover/<id>?size= may resize to (largest side, pixels)
+COVER_DISPLAY_SIZE = 300  # Size requested by the web UI (150px box at 2x pixel density)
+COVER_FETCH_TIMEOUT = 5  # Seconds to wait for Spotify's image CDN
+
+# Pipeline settings
+PIPELINE_MODE = True  # Run capture, inference and rendering as overlapping stages
+PIPELINE_QUEUE_SIZE = 1  # Frames buffered between stages; older frames are dropped
+PIPELINE_REPORT_INTERVAL = 5  # Seconds between per-stage throughput reports
+
+# Metrics settings
+METRICS_WINDOW = 30  # Seconds of samples behind each latency quantile (rolling, 1-2 windows)
+METRICS_REPORT_INTERVAL = 30  # Seconds between metrics summaries printed by the desktop app
+
+# Spotify transport settings
+SPOTIFY_POOL_SIZE = 4  # Keep-alive connections to the Web API (commands, track polls and covers overlap)
+SPOTIFY_CONNECT_TIMEOUT = 1.0  # Seconds to open a connection before the attempt counts as failed
+SPOTIFY_TIMEOUTS = {  # Seconds per call, covering every attempt and backoff; "default" for unlisted endpoints
+    "default": 2.0,
+    "current_playback": 3.0,
+    "currently_playing": 3.0,
+    "queue": 5.0,
+}
+SPOTIFY_MAX_RETRIES = 2  # Extra attempts after a timeout, 429 or 5xx (while the budget lasts)
+SPOTIFY_BACKOFF_BASE = 0.1  # Seconds; retry waits are jittered up to base * 2^attempt
+SPOTIFY_BACKOFF_MAX = 1.0  # Longest jittered wait between attempts
+SPOTIFY_BREAKER_FAILURES = 5  # Consecutive failed calls (after their retries) before calls fail fast
+SPOTIFY_BREAKER_RESET = 10  # Seconds to fail fast before letting a trial request through
+
+# OAuth token settings
+TOKEN_CACHE_PATH = ".spotify_cache"  # Token file, read once at startup and rewritten only when the token changes
+TOKEN_REFRESH_MARGIN = 300  # Refresh the token in the background this many seconds before it expires
+TOKEN_REFRESH_RETRY = 30  # Seconds before retrying a failed background refresh
+
+# Playback state cache settings
+PLAYBACK_STATE_MAX_AGE = 30  # Seconds cached playback state is trusted before a command re-reads it
+
+# Track info scheduler settings
+TRACK_POLL_INTERVAL = 5  # Longest wait (seconds) between track polls while playing
+TRACK_BOUNDARY_MARGIN = 0.5  # Seconds after the predicted end of a track to poll for the next one
+TRACK_PAUSED_MAX_INTERVAL = 30  # Poll interval while paused doubles up to this many seconds
+TRACK_ERROR_MAX_INTERVAL = 60  # Poll interval after failed requests doubles up to this many seconds
+TRACK_COMMAND_REFRESH_DELAY = 0.3  # Seconds to let Spotify apply a command before re-reading the track
+
+# Multi-camera settings
+MULTICAM_CONFLICT_WINDOW = 0.15  # Seconds to collect gestures from all cameras before picking one
+MULTICAM_REPORT_INTERVAL = 5  # Seconds between per-camera stats reports
+SHARED_MEMORY_FRAMES = True  # Split capture and inference into separate processes sharing a frame ring
+FRAME_RING_SLOTS = 4  # Frame slots per camera in the shared memory ring
+FRAME_WAIT_TIMEOUT = 0.1  # Seconds inference waits for a new frame before re-checking for shutdown
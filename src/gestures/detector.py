@@ -1,170 +1,256 @@
 import cv2
-import mediapipe as mp
 import numpy as np
-from collections import deque
-from src.config.settings import DETECTION_CONFIDENCE, TRACKING_CONFIDENCE, GESTURE_SMOOTHING_FRAMES
+from types import SimpleNamespace
+from src.gestures.landmarks import HandLandmarks, classify_hands, pinch_ratio, DIAL_GESTURE
+from src.gestures.roles import HandRoles
+from src.gestures.smoothing import GestureSmoother, make_policy
+from src.gestures.idle import IdleGovernor
+from src.metrics.metrics import metrics, Timer, STAGE_SECONDS, GESTURES
+from src.config.settings import (DETECTION_CONFIDENCE, TRACKING_CONFIDENCE, GESTURE_SMOOTHING_FRAMES,
+                                 GESTURE_SMOOTHING_POLICY, MODEL_COMPLEXITY, ROI_TRACKING, ROI_PADDING,
+                                 ROI_MIN_SIZE, ROI_MAX_AREA, INFERENCE_DOWNSCALE, IDLE_MODE,
+                                 FRAME_WIDTH, FRAME_HEIGHT, VOLUME_MODE, PINCH_RANGE, VOLUME_SMOOTHING,
+                                 MAX_NUM_HANDS)
+
+# Result returned when inference is skipped, shaped like an empty MediaPipe result
+NO_HANDS = SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
 
 class HandGestureDetector:
-    def __init__(self):
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=2,
-            min_detection_confidence=DETECTION_CONFIDENCE,
-            min_tracking_confidence=TRACKING_CONFIDENCE,
-            model_complexity=1  # Use more complex model for better accuracy
-        )
-        self.mp_draw = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
+    def __init__(self, smoothing_frames=GESTURE_SMOOTHING_FRAMES, smoothing_policy=GESTURE_SMOOTHING_POLICY,
+                 model_complexity=MODEL_COMPLEXITY, hands=None, roi_tracking=ROI_TRACKING,
+                 downscale=INFERENCE_DOWNSCALE, idle_mode=IDLE_MODE, volume_mode=VOLUME_MODE,
+                 max_hands=MAX_NUM_HANDS, roles=None):
+        # Per-hand roles and two-hand combinations; tracking a second hand only pays off when they are used
+        self.roles = roles if roles is not None else HandRoles()
+        if max_hands is None:
+            max_hands = 2 if self.roles.needs_two_hands else 1
+        self.max_hands = max_hands
+        
+        # `hands` lets a replay or test backend stand in for the MediaPipe graph
+        crop_hands = hands
+        if hands is None:
+            # Imported here rather than at module level: loading mediapipe takes seconds
+            import mediapipe as mp
+            hands = mp.solutions.hands.Hands(
+                static_image_mode=False,
+                max_num_hands=max_hands,
+                min_detection_confidence=DETECTION_CONFIDENCE,
+                min_tracking_confidence=TRACKING_CONFIDENCE,
+                model_complexity=model_complexity
+            )
+            if roi_tracking and max_hands == 1:
+                # Crops move and change size every frame, which would break the tracking graph's
+                # frame-to-frame state, so they get their own graph that treats each image separately
+                crop_hands = mp.solutions.hands.Hands(
+                    static_image_mode=True,
+                    max_num_hands=max_hands,
+                    min_detection_confidence=DETECTION_CONFIDENCE,
+                    model_complexity=model_complexity
+                )
+        self.hands = hands
+        self.crop_hands = crop_hands
+        self._mp = None  # mediapipe.solutions, loaded the first time landmarks are drawn
         
         # Gesture smoothing
-        self.gesture_history = deque(maxlen=GESTURE_SMOOTHING_FRAMES)
-        self.last_gesture = "No Hand"
+        self.smoother = GestureSmoother(smoothing_frames, make_policy(smoothing_policy))
+        self.results = None
+        self.frame_size = (480, 640)
+        
+        # Region-of-interest tracking and downscaled full-frame search. A crop around the hands
+        # already found would never see a second hand enter, so it is only used for one hand
+        self.roi_tracking = roi_tracking and max_hands == 1
+        self.downscale = downscale
+        self.roi = None  # (x0, y0, x1, y1) crop to run inference on next frame
+        self.roi_frames = 0
+        self.full_frames = 0
+        
+        # Skip inference while nobody is in front of the camera
+        self.idle = IdleGovernor() if idle_mode else None
+        
+        # Continuous volume: the pinch distance sets a target volume while the dial posture is held
+        self.continuous_volume = volume_mode == "continuous"
+        self.volume_target = None  # 0-100 while dialing, otherwise None
+        
+    def _process(self, img, scale=1.0, hands=None):
+        """Run the hand model (the full-frame graph unless `hands` is given) on a BGR image, optionally downscaled first"""
+        with Timer(STAGE_SECONDS, stage="color_convert"):
+            if scale != 1.0:
+                img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            
+            # Convert BGR image to RGB
+            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        with Timer(STAGE_SECONDS, stage="inference"):
+            return (hands or self.hands).process(img_rgb)
+    
+    def warm_up(self, size=(FRAME_HEIGHT, FRAME_WIDTH)):
+        """Run one inference on a blank frame so the first real frame doesn't pay for graph setup"""
+        blank = np.zeros((size[0], size[1], 3), dtype=np.uint8)
+        self.hands.process(blank)
+        if self.crop_hands is not self.hands:
+            self.crop_hands.process(blank)
+        return self
+    
+    def _draw_landmarks(self, img, hand_landmarks):
+        if self._mp is None:
+            import mediapipe as mp
+            self._mp = mp.solutions
+        # Enhanced visualization with different colors for connections
+        self._mp.drawing_utils.draw_landmarks(
+            img, 
+            hand_landmarks, 
+            self._mp.hands.HAND_CONNECTIONS,
+            self._mp.drawing_styles.get_default_hand_landmarks_style(),
+            self._mp.drawing_styles.get_default_hand_connections_style()
+        )
+    
+    def _update_roi(self, w, h):
+        """Padded bounding box of all detected hands, or None to search the full frame next time"""
+        self.roi = None
+        if not self.roi_tracking or not self.results.multi_hand_landmarks:
+            return
+        
+        xs = [lm.x for hand in self.results.multi_hand_landmarks for lm in hand.landmark]
+        ys = [lm.y for hand in self.results.multi_hand_landmarks for lm in hand.landmark]
+        x0, x1 = min(xs) * w, max(xs) * w
+        y0, y1 = min(ys) * h, max(ys) * h
         
+        # Pad around the hand so it stays inside the crop while it moves
+        size = max(x1 - x0, y1 - y0, ROI_MIN_SIZE)
+        pad = size * ROI_PADDING
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+        half = size / 2 + pad
+        x0, x1 = max(0, int(cx - half)), min(w, int(cx + half))
+        y0, y1 = max(0, int(cy - half)), min(h, int(cy + half))
+        
+        # Not worth cropping when the hand fills most of the frame
+        if (x1 - x0) * (y1 - y0) < ROI_MAX_AREA * w * h:
+            self.roi = (x0, y0, x1, y1)
+    
+    def _map_to_frame(self, results, roi, w, h):
+        """Convert landmarks detected in an ROI crop back to full-frame normalized coordinates"""
+        x0, y0, x1, y1 = roi
+        crop_w, crop_h = x1 - x0, y1 - y0
+        for hand_landmarks in results.multi_hand_landmarks:
+            for lm in hand_landmarks.landmark:
+                lm.x = (x0 + lm.x * crop_w) / w
+                lm.y = (y0 + lm.y * crop_h) / h
+                lm.z = lm.z * crop_w / w
+    
     def find_hands(self, img, draw=True):
-        # Convert BGR image to RGB
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        h, w = img.shape[:2]
+        self.frame_size = (h, w)
+        self.results = None
+        
+        if self.idle is not None and not self.idle.should_infer(img):
+            self.results = NO_HANDS
+            return img
+        
+        # Track the hand from the previous frame inside a padded crop
+        if self.roi is not None:
+            results = self._process(img[self.roi[1]:self.roi[3], self.roi[0]:self.roi[2]], hands=self.crop_hands)
+            if results.multi_hand_landmarks:
+                self._map_to_frame(results, self.roi, w, h)
+            # If the crop lost the hand, the whole frame is searched on the next frame rather than
+            # running a second inference on this one
+            self.results = results
+            self.roi_frames += 1
         
-        # Process the image and find hands
-        self.results = self.hands.process(img_rgb)
+        # No crop (or ROI tracking disabled): search the whole, optionally downscaled, frame
+        if self.results is None:
+            self.results = self._process(img, self.downscale)
+            self.full_frames += 1
+        
+        self._update_roi(w, h)
+        if self.idle is not None:
+            self.idle.record(bool(self.results.multi_hand_landmarks))
         
         if self.results.multi_hand_landmarks:
             for hand_landmarks in self.results.multi_hand_landmarks:
                 if draw:
-                    # Enhanced visualization with different colors for connections
-                    self.mp_draw.draw_landmarks(
-                        img, 
-                        hand_landmarks, 
-                        self.mp_hands.HAND_CONNECTIONS,
-                        self.mp_drawing_styles.get_default_hand_landmarks_style(),
-                        self.mp_drawing_styles.get_default_hand_connections_style()
-                    )
+                    self._draw_landmarks(img, hand_landmarks)
         
         return img
     
-    def find_position(self, img, hand_no=0):
-        landmark_list = []
+    def find_landmarks(self, hand_no=0):
+        """Landmarks of one detected hand as a HandLandmarks, or None if there is no such hand"""
+        if self.results is None or not self.results.multi_hand_landmarks or len(self.results.multi_hand_landmarks) <= hand_no:
+            return None
         
-        if self.results.multi_hand_landmarks:
-            if len(self.results.multi_hand_landmarks) > hand_no:
-                my_hand = self.results.multi_hand_landmarks[hand_no]
-                
-                for id, lm in enumerate(my_hand.landmark):
-                    h, w, c = img.shape
-                    cx, cy = int(lm.x * w), int(lm.y * h)
-                    landmark_list.append([id, cx, cy])
-                
-                # Determine if this is a left or right hand
-                if self.results.multi_handedness:
-                    handedness = self.results.multi_handedness[hand_no].classification[0].label
-                    landmark_list.append(["handedness", handedness])
+        # Determine if this is a left or right hand
+        classification = None
+        if self.results.multi_handedness:
+            classification = self.results.multi_handedness[hand_no]
         
-        return landmark_list
+        h, w = self.frame_size
+        return HandLandmarks.from_mediapipe(self.results.multi_hand_landmarks[hand_no], classification, w, h)
     
-    def get_gesture(self, landmark_list):
-        if not landmark_list:
-            self.gesture_history.append("No Hand")
-            return self._smooth_gesture("No Hand")
-        
-        # Get fingertips (landmarks 4, 8, 12, 16, 20)
-        # Thumb, Index, Middle, Ring, Pinky
-        fingertips = [4, 8, 12, 16, 20]
-        finger_bases = [2, 5, 9, 13, 17]  # Base points for comparison
-        finger_mids = [3, 6, 10, 14, 18]  # Middle joints for better accuracy
-        
-        # Check if fingers are up or down
-        fingers_up = []
-        
-        # Check handedness if available
-        handedness = "Right"
-        for point in landmark_list:
-            if isinstance(point[0], str) and point[0] == "handedness":
-                handedness = point[1]
-                break
-        
-        # Special case for thumb based on handedness
-        if handedness == "Right":
-            # For right hand, thumb is up if it's to the left of the base
-            if landmark_list[fingertips[0]][1] < landmark_list[finger_bases[0]][1]:
-                fingers_up.append(1)
-            else:
-                fingers_up.append(0)
-        else:  # Left hand
-            # For left hand, thumb is up if it's to the right of the base
-            if landmark_list[fingertips[0]][1] > landmark_list[finger_bases[0]][1]:
-                fingers_up.append(1)
-            else:
-                fingers_up.append(0)
+    def find_all_landmarks(self):
+        """Every detected hand (up to `max_hands`) as a list of HandLandmarks"""
+        if self.results is None or not self.results.multi_hand_landmarks:
+            return []
         
-        # For other fingers (vertical comparison with additional check)
-        for i in range(1, 5):
-            # Primary check: fingertip is above base
-            primary_check = landmark_list[fingertips[i]][2] < landmark_list[finger_bases[i]][2]
-            
-            # Secondary check: middle joint is above base (for bent fingers)
-            secondary_check = landmark_list[finger_mids[i]][2] < landmark_list[finger_bases[i]][2]
-            
-            # A finger is considered up if the fingertip is above the base
-            # and the middle joint is in a reasonable position
-            if primary_check and (secondary_check or 
-                                 abs(landmark_list[finger_mids[i]][2] - landmark_list[finger_bases[i]][2]) < 20):
-                fingers_up.append(1)  # Finger is up
-            else:
-                fingers_up.append(0)  # Finger is down
-        
-        # Recognize gestures based on finger positions
-        gesture = "Unknown Gesture"
-        
-        if sum(fingers_up) == 0:  # All fingers down
-            gesture = "Fist"
-        elif sum(fingers_up) == 5:  # All fingers up
-            gesture = "Open Hand"
-        elif fingers_up == [0, 1, 0, 0, 0]:  # Only index finger up
-            gesture = "Point"
-        elif fingers_up == [0, 1, 1, 0, 0]:  # Index and middle fingers up (peace sign)
-            gesture = "Play/Pause"
-        elif fingers_up == [1, 1, 0, 0, 0]:  # Thumb and index up
-            gesture = "Next Track"
-        elif fingers_up == [1, 0, 0, 0, 1]:  # Thumb and pinky up
-            gesture = "Previous Track"
-        elif fingers_up == [0, 1, 1, 1, 1]:  # All except thumb up
-            gesture = "Volume Up"
-        elif fingers_up == [1, 0, 0, 0, 0]:  # Only thumb up
-            gesture = "Volume Down"
-        
-        # Add to history for smoothing
-        self.gesture_history.append(gesture)
-        
-        # Return smoothed gesture
-        return self._smooth_gesture(gesture)
+        h, w = self.frame_size
+        handedness = self.results.multi_handedness or []
+        return [
+            HandLandmarks.from_mediapipe(hand_landmarks, handedness[i] if i < len(handedness) else None, w, h)
+            for i, hand_landmarks in enumerate(self.results.multi_hand_landmarks[:self.max_hands])
+        ]
+    
+    def find_position(self, img, hand_no=0):
+        """Legacy list form of find_landmarks(): [[id, cx, cy], ..., ["handedness", label]]"""
+        landmarks = self.find_landmarks(hand_no)
+        return landmarks.to_list() if landmarks is not None else []
     
-    def _smooth_gesture(self, current_gesture):
-        """Smooth gesture detection to prevent flickering"""
-        if not self.gesture_history:
-            return current_gesture
-        
-        # Count occurrences of each gesture in history
-        gesture_counts = {}
-        for g in self.gesture_history:
-            if g in gesture_counts:
-                gesture_counts[g] += 1
+    def get_gesture(self, landmarks, timestamp=None):
+        """Classify a HandLandmarks (or a legacy landmark list) and return the smoothed gesture
+
+        `timestamp` overrides the clock used by time-based smoothing, e.g. when replaying.
+        """
+        if landmarks is None or len(landmarks) == 0:
+            return self.get_hands_gesture([], timestamp)
+        if not isinstance(landmarks, HandLandmarks):
+            landmarks = HandLandmarks.from_list(landmarks)
+        return self.get_hands_gesture([landmarks], timestamp)
+    
+    def get_hands_gesture(self, hands, timestamp=None):
+        """Classify every hand of a frame in one pass and return the smoothed gesture
+
+        Two-hand combinations and per-hand roles decide which hand's gesture
+        counts; see HandRoles.
+        """
+        previous = self.smoother.current
+        with Timer(STAGE_SECONDS, stage="classification"):
+            if not hands:
+                self.volume_target = None
+                gesture = self.smoother.update("No Hand", now=timestamp)
             else:
-                gesture_counts[g] = 1
-        
-        # Find the most common gesture
-        max_count = 0
-        most_common = current_gesture
-        
-        for g, count in gesture_counts.items():
-            if count > max_count:
-                max_count = count
-                most_common = g
-        
-        # Only change gesture if the new one is consistent
-        if most_common != self.last_gesture:
-            # Require at least 60% of frames to have the same gesture to change
-            threshold = 0.6 * len(self.gesture_history)
-            if max_count >= threshold:
-                self.last_gesture = most_common
+                raw, hand, score = self.roles.resolve(hands, classify_hands(hands, dial=self.continuous_volume))
+                if raw == DIAL_GESTURE and hand is not None:
+                    self._update_volume_target(hand)
+                else:
+                    self.volume_target = None
+                
+                # Add to history and smooth
+                gesture = self.smoother.update(raw, score, timestamp)
         
-        return self.last_gesture
\ No newline at end of file
+        if gesture != previous and gesture not in ("No Hand", "Unknown Gesture"):
+            metrics.increment(GESTURES, gesture=gesture)
+        return gesture
+    
+    def _update_volume_target(self, landmarks):
+        low, high = PINCH_RANGE
+        ratio = float(pinch_ratio(landmarks.points, landmarks.width, landmarks.height))
+        volume = 100.0 * min(1.0, max(0.0, (ratio - low) / (high - low)))
+        if self.volume_target is None:
+            self.volume_target = volume
+        else:
+            # Exponential smoothing takes the jitter out of the landmarks
+            self.volume_target += VOLUME_SMOOTHING * (volume - self.volume_target)
+    
+    @property
+    def gesture_history(self):
+        return self.smoother.history
+    
+    @property
+    def last_gesture(self):
+        return self.smoother.current
\ No newline at end of file
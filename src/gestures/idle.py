@@ -0,0 +1,110 @@
+import logging
+import time
+import cv2
+from src.config.settings import IDLE_AFTER_SECONDS, IDLE_PROBE_FPS, MOTION_THRESHOLD, MOTION_SIZE
+
+
+class MotionDetector:
+    """Cheap frame-difference motion check on a small grayscale thumbnail"""
+
+    def __init__(self, size=MOTION_SIZE, threshold=MOTION_THRESHOLD):
+        self.size = size
+        self.threshold = threshold
+        self.prev = None
+        self.score = 0.0
+
+    def update(self, img):
+        """Return True if the frame differs enough from the previous one"""
+        small = cv2.resize(img, self.size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        prev, self.prev = self.prev, gray
+        if prev is None:
+            return False
+        self.score = float(cv2.absdiff(gray, prev).mean())
+        return self.score > self.threshold
+
+    def reset(self):
+        self.prev = None
+
+
+class IdleGovernor:
+    """Gates hand-model inference while nobody is in front of the camera
+
+    In the active state every frame is inferred. After `idle_after` seconds
+    without a hand it switches to idle, where only a motion check runs per
+    frame and the model is probed at `probe_fps`. Motion or a detected hand
+    switches straight back to active.
+    """
+
+    def __init__(self, idle_after=IDLE_AFTER_SECONDS, probe_fps=IDLE_PROBE_FPS, motion=None):
+        self.idle_after = idle_after
+        self.probe_interval = 1.0 / probe_fps
+        self.motion = motion if motion is not None else MotionDetector()
+        self.state = "active"
+        # Clock references are taken from the first frame so callers can supply their own time base
+        self.last_hand = None
+        self.last_probe = 0.0
+        self.state_since = None
+        self.time_in = {"active": 0.0, "idle": 0.0}
+        self.transitions = 0
+        self.skipped_frames = 0
+
+    def _switch(self, state, now, reason):
+        self.time_in[self.state] += now - self.state_since
+        self.state = state
+        self.state_since = now
+        self.transitions += 1
+        logging.info(f"Gesture detector {state} ({reason})")
+
+    def should_infer(self, img, now=None):
+        """Decide whether the model should run on this frame"""
+        if now is None:
+            now = time.monotonic()
+        if self.state_since is None:
+            self.state_since = self.last_hand = now
+        if self.state == "active":
+            return True
+
+        if self.motion.update(img):
+            self._switch("active", now, "motion")
+            self.last_hand = now
+            return True
+        if now - self.last_probe >= self.probe_interval:
+            self.last_probe = now
+            return True
+
+        self.skipped_frames += 1
+        return False
+
+    def record(self, hand_present, now=None):
+        """Feed back whether the inferred frame contained a hand"""
+        if now is None:
+            now = time.monotonic()
+        if hand_present:
+            self.last_hand = now
+            if self.state == "idle":
+                self._switch("active", now, "hand detected")
+        elif self.state == "active" and self.last_hand is not None and now - self.last_hand >= self.idle_after:
+            self._switch("idle", now, f"no hand for {self.idle_after:.0f}s")
+            self.motion.reset()
+            self.last_probe = now
+
+    def report(self, now=None):
+        if now is None:
+            now = time.monotonic()
+        time_in = dict(self.time_in)
+        if self.state_since is not None:
+            time_in[self.state] += now - self.state_since
+        return {
+            "state": self.state,
+            "transitions": self.transitions,
+            "skipped_frames": self.skipped_frames,
+            "active_seconds": time_in["active"],
+            "idle_seconds": time_in["idle"],
+        }
+
+    @staticmethod
+    def format_report(report):
+        return (f"detector: {report['state']}, {report['transitions']} transitions, "
+                f"{report['skipped_frames']} frames skipped, "
+                f"active {report['active_seconds']:.0f}s / idle {report['idle_seconds']:.0f}s")
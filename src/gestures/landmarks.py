@@ -0,0 +1,154 @@
+from itertools import chain
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+# Thumb, Index, Middle, Ring, Pinky
+FINGERTIPS = np.array([4, 8, 12, 16, 20])
+FINGER_BASES = np.array([2, 5, 9, 13, 17])  # Base points for comparison
+FINGER_MIDS = np.array([3, 6, 10, 14, 18])  # Middle joints for better accuracy
+
+# A bent finger still counts as up if its middle joint is within this many pixels of the base
+MID_JOINT_TOLERANCE_PX = 20
+
+# Continuous volume posture: middle, ring and pinky up, leaving thumb and index free to pinch
+DIAL_GESTURE = "Volume Dial"
+
+# Finger states packed into a 5-bit code (thumb = bit 0 ... pinky = bit 4)
+FINGER_WEIGHTS = np.array([1, 2, 4, 8, 16])
+
+
+def _finger_code(fingers):
+    return int(np.dot(fingers, FINGER_WEIGHTS))
+
+
+# Lookup table from finger code to gesture name
+GESTURE_TABLE = np.full(32, "Unknown Gesture", dtype=object)
+GESTURE_TABLE[0] = "Fist"  # All fingers down
+GESTURE_TABLE[31] = "Open Hand"  # All fingers up
+GESTURE_TABLE[_finger_code([0, 1, 0, 0, 0])] = "Point"  # Only index finger up
+GESTURE_TABLE[_finger_code([0, 1, 1, 0, 0])] = "Play/Pause"  # Index and middle fingers up (peace sign)
+GESTURE_TABLE[_finger_code([1, 1, 0, 0, 0])] = "Next Track"  # Thumb and index up
+GESTURE_TABLE[_finger_code([1, 0, 0, 0, 1])] = "Previous Track"  # Thumb and pinky up
+GESTURE_TABLE[_finger_code([0, 1, 1, 1, 1])] = "Volume Up"  # All except thumb up
+GESTURE_TABLE[_finger_code([1, 0, 0, 0, 0])] = "Volume Down"  # Only thumb up
+
+# With continuous volume the dial replaces both step gestures: any posture with middle, ring and
+# pinky up (which includes Volume Up) is the dial, and Volume Down no longer triggers anything
+DIAL_POSTURE = _finger_code([0, 0, 1, 1, 1])
+DIAL_GESTURE_TABLE = GESTURE_TABLE.copy()
+DIAL_GESTURE_TABLE[(np.arange(32) & DIAL_POSTURE) == DIAL_POSTURE] = DIAL_GESTURE
+DIAL_GESTURE_TABLE[DIAL_GESTURE_TABLE == "Volume Down"] = "Unknown Gesture"
+
+
+class HandLandmarks:
+    """One detected hand: a (21, 3) float32 array of normalized x, y, z plus its handedness
+
+    `width` and `height` are the size of the frame the landmarks were detected
+    in, used to convert to pixel coordinates when needed.
+    """
+
+    __slots__ = ("points", "handedness", "score", "width", "height")
+
+    def __init__(self, points, handedness="Right", score=1.0, width=1, height=1):
+        self.points = points
+        self.handedness = handedness
+        self.score = score
+        self.width = width
+        self.height = height
+
+    def __len__(self):
+        return len(self.points)
+
+    @classmethod
+    def from_mediapipe(cls, hand_landmarks, classification=None, width=1, height=1):
+        """Convert a MediaPipe NormalizedLandmarkList in a single buffer fill"""
+        points = np.fromiter(
+            chain.from_iterable((lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark),
+            dtype=np.float32,
+            count=NUM_LANDMARKS * 3,
+        ).reshape(NUM_LANDMARKS, 3)
+        handedness, score = "Right", 1.0
+        if classification is not None:
+            handedness = classification.classification[0].label
+            score = classification.classification[0].score
+        return cls(points, handedness, score, width, height)
+
+    @classmethod
+    def from_list(cls, landmark_list):
+        """Build from the legacy `[[id, cx, cy], ..., ["handedness", label]]` format"""
+        handedness = "Right"
+        coords = []
+        for point in landmark_list:
+            if isinstance(point[0], str) and point[0] == "handedness":
+                handedness = point[1]
+            else:
+                coords.append((point[1], point[2], 0.0))
+        # Legacy coordinates are already in pixels, so use a unit frame size
+        return cls(np.array(coords, dtype=np.float32), handedness)
+
+    def pixels(self):
+        """Landmark x, y in pixel coordinates as an (21, 2) int array"""
+        return (self.points[:, :2] * (self.width, self.height)).astype(np.int32)
+
+    def to_list(self):
+        """Legacy `[[id, cx, cy], ..., ["handedness", label]]` representation"""
+        landmark_list = [[id, int(cx), int(cy)] for id, (cx, cy) in enumerate(self.pixels().tolist())]
+        landmark_list.append(["handedness", self.handedness])
+        return landmark_list
+
+
+def fingers_up(points, is_right, width=1, height=1):
+    """Finger states for landmarks of shape (..., 21, 3)
+
+    Returns an int array of shape (..., 5), thumb first, where 1 means the
+    finger is up. `is_right` broadcasts against the leading dimensions.
+    """
+    # Compare in whole pixels, matching the original list-based classifier
+    x = (points[..., 0] * width).astype(np.int32)
+    y = (points[..., 1] * height).astype(np.int32)
+
+    # Thumb is judged sideways: right hand thumb is up if it's to the left of the base
+    thumb_tip, thumb_base = x[..., FINGERTIPS[0]], x[..., FINGER_BASES[0]]
+    thumb = np.where(is_right, thumb_tip < thumb_base, thumb_tip > thumb_base)
+
+    # Other fingers: fingertip above base, and the middle joint above or close to the base
+    tips, bases, mids = y[..., FINGERTIPS[1:]], y[..., FINGER_BASES[1:]], y[..., FINGER_MIDS[1:]]
+    others = (tips < bases) & ((mids < bases) | (np.abs(mids - bases) < MID_JOINT_TOLERANCE_PX))
+
+    return np.concatenate([thumb[..., None], others], axis=-1).astype(np.int8)
+
+
+def classify(fingers, dial=False):
+    """Map finger states of shape (..., 5) to gesture names; `dial` uses the continuous volume table"""
+    return (DIAL_GESTURE_TABLE if dial else GESTURE_TABLE)[fingers @ FINGER_WEIGHTS]
+
+
+def classify_hand(landmarks, dial=False):
+    """Gesture name for a single HandLandmarks; with `dial` the volume dial replaces the step gestures"""
+    fingers = fingers_up(landmarks.points, landmarks.handedness == "Right",
+                         landmarks.width, landmarks.height)
+    return (DIAL_GESTURE_TABLE if dial else GESTURE_TABLE)[int(fingers @ FINGER_WEIGHTS)]
+
+
+def classify_hands(hands, dial=False):
+    """Gesture names for a list of HandLandmarks from one frame, classified in a single pass"""
+    if not hands:
+        return []
+    points = np.stack([hand.points for hand in hands])
+    is_right = np.array([hand.handedness == "Right" for hand in hands])
+    # All hands come from the same frame, so they share its size
+    fingers = fingers_up(points, is_right, hands[0].width, hands[0].height)
+    return classify(fingers, dial).tolist()
+
+
+def pinch_ratio(points, width=1, height=1):
+    """Thumb tip to index tip distance relative to hand size (wrist to middle knuckle)
+
+    Works on landmarks of shape (..., 21, 3); being relative, it doesn't
+    depend on how far the hand is from the camera.
+    """
+    xy = points[..., :2] * np.array([width, height], dtype=np.float32)
+    pinch = np.linalg.norm(xy[..., FINGERTIPS[0], :] - xy[..., FINGERTIPS[1], :], axis=-1)
+    size = np.linalg.norm(xy[..., 0, :] - xy[..., FINGER_BASES[2], :], axis=-1)
+    return pinch / np.maximum(size, 1e-6)
@@ -0,0 +1,53 @@
+from src.gestures.landmarks import DIAL_GESTURE
+from src.config.settings import HAND_ROLES, TWO_HAND_GESTURES
+
+# Gestures each hand role may trigger; gestures outside every role are allowed for all hands
+ROLE_GESTURES = {
+    "transport": {"Play/Pause", "Next Track", "Previous Track"},
+    "volume": {"Volume Up", "Volume Down", DIAL_GESTURE},
+}
+
+# Classifications that don't mean anything by themselves
+IDLE_GESTURES = ("Unknown Gesture", "No Hand")
+
+
+class HandRoles:
+    """Turns the classified hands of one frame into the single gesture the controllers act on
+
+    A configured two-hand combination wins when both hands show it. Otherwise
+    each hand may only trigger the gestures of its role (by handedness), and
+    the most confident hand showing a recognized gesture is used.
+    """
+
+    def __init__(self, roles=HAND_ROLES, combos=TWO_HAND_GESTURES):
+        unknown = set(roles.values()) - set(ROLE_GESTURES)
+        if unknown:
+            raise ValueError(f"Unknown hand roles: {', '.join(sorted(unknown))}")
+        self.roles = dict(roles)
+        self.combos = dict(combos)
+        self._role_only = set().union(*ROLE_GESTURES.values())
+
+    @property
+    def needs_two_hands(self):
+        return bool(self.roles or self.combos)
+
+    def allowed(self, hand, gesture):
+        role = self.roles.get(hand.handedness)
+        if role is None or gesture not in self._role_only:
+            return True
+        return gesture in ROLE_GESTURES[role]
+
+    def resolve(self, hands, gestures):
+        """(gesture, hand that produced it or None for a combination, confidence)"""
+        if len(hands) >= 2 and self.combos:
+            by_side = {hand.handedness: gesture for hand, gesture in zip(hands, gestures)}
+            combo = self.combos.get((by_side.get("Left"), by_side.get("Right")))
+            if combo is not None:
+                return combo, None, min(hand.score for hand in hands)
+
+        candidates = [(gesture not in IDLE_GESTURES, hand.score, index)
+                      for index, (hand, gesture) in enumerate(zip(hands, gestures)) if self.allowed(hand, gesture)]
+        if not candidates:
+            return "Unknown Gesture", None, max(hand.score for hand in hands)
+        _, score, index = max(candidates)
+        return gestures[index], hands[index], score
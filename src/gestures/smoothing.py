@@ -0,0 +1,161 @@
+import time
+from collections import deque
+from src.config.settings import (GESTURE_SMOOTHING_FRAMES, GESTURE_SMOOTHING_POLICY, SMOOTHING_MAJORITY_THRESHOLD,
+                                 SMOOTHING_ENTER_THRESHOLD, SMOOTHING_EXIT_THRESHOLD, SMOOTHING_ENTER_TIME,
+                                 SMOOTHING_MIN_HOLD, SMOOTHING_MIN_CONFIDENCE)
+
+
+class GestureWindow:
+    """Sliding window of recent gestures with running (optionally weighted) counts
+
+    Counts are adjusted on append and eviction, and the leading gesture is
+    tracked incrementally; it is only recomputed when the leader itself loses
+    weight, and then over the handful of distinct labels rather than the window.
+    """
+
+    def __init__(self, size):
+        self.entries = deque()
+        self.size = size
+        self.counts = {}
+        self.total = 0.0
+        self.leader = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def push(self, gesture, weight=1.0):
+        if len(self.entries) >= self.size:
+            self._evict()
+        self.entries.append((gesture, weight))
+        self.counts[gesture] = self.counts.get(gesture, 0.0) + weight
+        self.total += weight
+        if self.leader is None or self.counts[gesture] > self.counts.get(self.leader, 0.0):
+            self.leader = gesture
+
+    def _evict(self):
+        gesture, weight = self.entries.popleft()
+        remaining = self.counts.get(gesture, 0.0) - weight
+        self.total -= weight
+        if remaining <= 1e-9:
+            self.counts.pop(gesture, None)
+        else:
+            self.counts[gesture] = remaining
+        if gesture == self.leader:
+            self.leader = max(self.counts, key=self.counts.get) if self.counts else None
+
+    def share(self, gesture):
+        """Fraction of the window's weight held by `gesture`"""
+        if self.total <= 0:
+            return 0.0
+        return self.counts.get(gesture, 0.0) / self.total
+
+    def clear(self):
+        self.entries.clear()
+        self.counts.clear()
+        self.total = 0.0
+        self.leader = None
+
+
+class MajorityVotePolicy:
+    """Switch once one gesture holds at least `threshold` of the window"""
+
+    weighted = False
+
+    def __init__(self, threshold=SMOOTHING_MAJORITY_THRESHOLD):
+        self.threshold = threshold
+
+    def decide(self, window, current, now):
+        leader = window.leader
+        if leader is not None and leader != current and window.share(leader) >= self.threshold:
+            return leader
+        return current
+
+
+class HysteresisPolicy:
+    """Separate enter/exit thresholds plus time-based debouncing
+
+    A new gesture must hold `enter` of the window for `enter_time` seconds,
+    and the current one is kept while it still holds `exit` of the window or
+    has been active for less than `min_hold` seconds.
+    """
+
+    weighted = False
+
+    def __init__(self, enter=SMOOTHING_ENTER_THRESHOLD, exit=SMOOTHING_EXIT_THRESHOLD,
+                 enter_time=SMOOTHING_ENTER_TIME, min_hold=SMOOTHING_MIN_HOLD):
+        self.enter = enter
+        self.exit = exit
+        self.enter_time = enter_time
+        self.min_hold = min_hold
+        self._candidate = None
+        self._candidate_since = 0.0
+        self._switched_at = 0.0
+
+    def decide(self, window, current, now):
+        leader = window.leader
+        if leader is None or leader == current or window.share(leader) < self.enter:
+            self._candidate = None
+            return current
+
+        if leader != self._candidate:
+            self._candidate = leader
+            self._candidate_since = now
+
+        if now - self._switched_at < self.min_hold or window.share(current) >= self.exit:
+            return current
+        if now - self._candidate_since < self.enter_time:
+            return current
+
+        self._candidate = None
+        self._switched_at = now
+        return leader
+
+
+class ConfidenceWeightedPolicy(MajorityVotePolicy):
+    """Majority vote where each frame counts with its detection confidence"""
+
+    weighted = True
+
+    def __init__(self, threshold=SMOOTHING_MAJORITY_THRESHOLD, min_confidence=SMOOTHING_MIN_CONFIDENCE):
+        super().__init__(threshold)
+        self.min_confidence = min_confidence
+
+
+POLICIES = {
+    "majority": MajorityVotePolicy,
+    "hysteresis": HysteresisPolicy,
+    "confidence": ConfidenceWeightedPolicy,
+}
+
+
+def make_policy(name=GESTURE_SMOOTHING_POLICY):
+    if name not in POLICIES:
+        raise ValueError(f"Unknown gesture smoothing policy: {name}")
+    return POLICIES[name]()
+
+
+class GestureSmoother:
+    """Smooth gesture detection to prevent flickering, in constant time per frame"""
+
+    def __init__(self, window=GESTURE_SMOOTHING_FRAMES, policy=None, initial="No Hand"):
+        self.window = GestureWindow(window)
+        self.policy = policy if policy is not None else make_policy()
+        self.current = initial
+
+    def update(self, gesture, confidence=1.0, now=None):
+        if now is None:
+            now = time.monotonic()
+        weight = 1.0
+        if self.policy.weighted:
+            weight = confidence if confidence >= self.policy.min_confidence else 0.0
+        self.window.push(gesture, weight)
+        self.current = self.policy.decide(self.window, self.current, now)
+        return self.current
+
+    @property
+    def history(self):
+        return [gesture for gesture, _ in self.window.entries]
+
+    def reset(self, initial="No Hand"):
+        self.window.clear()
+        self.current = initial
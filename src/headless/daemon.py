@@ -0,0 +1,113 @@
+import json
+import logging
+import signal
+import threading
+import time
+from src.main import SpotifyGestureController
+from src.gestures.landmarks import DIAL_GESTURE
+from src.camera.sources import open_source
+from src.pacing.frame_scheduler import FrameScheduler
+from src.metrics.metrics import metrics, Timer, STAGE_SECONDS, FRAME_AGE
+from src.config.settings import CAMERA_SOURCE, HEADLESS_FPS, HEADLESS_STATS_INTERVAL
+
+logger = logging.getLogger("gesture-daemon")
+
+
+def log_event(event, **fields):
+    """Log one event as a single JSON object per line"""
+    logger.info(json.dumps({"event": event, "time": round(time.time(), 3), **fields}, default=str))
+
+
+class HeadlessController(SpotifyGestureController):
+    """Gesture control for unattended units: no landmarks, overlays or preview window
+
+    Frames are paced by a FrameScheduler instead of `cv2.waitKey`,
+    SIGTERM and SIGINT stop the loop cleanly, and gestures, commands and
+    periodic stats are logged as JSON lines.
+    """
+
+    def __init__(self, target_fps=HEADLESS_FPS):
+        super().__init__()
+        self.stop_event = threading.Event()
+        # Sleeping on the stop event lets a signal end the wait for the next frame
+        self.scheduler = FrameScheduler(target_fps, sleep=self.stop_event.wait)
+        self.last_gesture = None
+        self.frames = 0
+        log_event("startup", **self.startup.status())
+
+    def open_camera(self):
+        # Paced below the camera rate, so grab on a thread and always take the newest frame
+        return open_source(CAMERA_SOURCE, threaded=True)
+
+    def handle_frame(self, img, gesture):
+        """Act on the detected gesture; nothing is drawn"""
+        if gesture != self.last_gesture:
+            log_event("gesture", gesture=gesture, previous=self.last_gesture)
+            self.last_gesture = gesture
+
+        # Letting go of the dial writes its final position, even within the deadband
+        if gesture != DIAL_GESTURE:
+            self.volume_writer.release()
+        if gesture != "No Hand" and gesture != "Unknown Gesture":
+            self.process_gesture(gesture)
+
+        for event in self.dispatcher.drain_events():
+            log_event("command", command=event["command"], value=event["value"], ok=event["ok"],
+                      error=event["error"], latency_ms=round(event["latency"] * 1000, 1))
+        return img
+
+    def stop(self, signum=None, frame=None):
+        if signum is not None:
+            log_event("signal", signal=signal.Signals(signum).name)
+        self.stop_event.set()
+
+    def log_stats(self, elapsed):
+        log_event("stats", frames=self.frames, fps=round(self.frames / elapsed, 1) if elapsed > 0 else 0.0,
+                  pacing=self.scheduler.report(), track=self.current_track["name"] if self.current_track else None,
+                  **metrics.snapshot())
+        self.frames = 0
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        log_event("running", target_fps=self.scheduler.max_fps)
+
+        last_stats = time.monotonic()
+        try:
+            while not self.stop_event.is_set():
+                with Timer(STAGE_SECONDS, stage="capture"):
+                    frame = self.cap.read_frame()
+                if frame is None:
+                    log_event("error", message="Failed to capture image from camera")
+                    break
+                self.scheduler.begin()
+
+                self.detector.find_hands(frame.img, draw=False)
+                gesture = self.detector.get_hands_gesture(self.detector.find_all_landmarks())
+                metrics.observe(FRAME_AGE, frame.age)
+                self.current_track = self.tracks.current_track
+                self.handle_frame(frame.img, gesture)
+                self.frames += 1
+
+                now = time.monotonic()
+                if now - last_stats >= HEADLESS_STATS_INTERVAL:
+                    self.log_stats(now - last_stats)
+                    last_stats = now
+
+                self.scheduler.wait(idle=self.is_idle())
+        finally:
+            log_event("stopping")
+            self.volume_writer.stop()
+            self.dispatcher.stop()
+            self.tracks.stop()
+            self.spotify.close()
+            self.cap.release()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    HeadlessController().run()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,21 +2,55 @@ import cv2
 import time
 import numpy as np
 from src.gestures.detector import HandGestureDetector
+from src.gestures.idle import IdleGovernor
 from src.spotify.client import SpotifyClient
-from src.config.settings import CAMERA_INDEX, VOLUME_STEP, TARGET_FPS
+from src.spotify.dispatcher import CommandDispatcher, describe_event, VOLUME_COMMANDS, GESTURE_COMMANDS
+from src.spotify.volume import VolumeWriter
+from src.gestures.landmarks import DIAL_GESTURE
+from src.spotify.track_scheduler import TrackScheduler
+from src.pipeline.pipeline import GesturePipeline
+from src.ui.overlay import OverlayCompositor
+from src.metrics.metrics import metrics, Timer, STAGE_SECONDS, FRAME_AGE
+from src.camera.sources import open_source
+from src.startup.orchestrator import StartupOrchestrator
+from src.pacing.frame_scheduler import FrameScheduler
+from src.config.settings import (CAMERA_SOURCE, TARGET_FPS, PIPELINE_MODE, PIPELINE_REPORT_INTERVAL,
+                                 METRICS_REPORT_INTERVAL, VOLUME_MODE)
+
+# Gesture instructions shown in the corner of the preview window
+INSTRUCTIONS = [
+    "Peace Sign: Play/Pause",
+    "Thumb + Index: Next Track",
+    "Thumb + Pinky: Previous Track",
+] + ([
+    # The dial posture replaces both step gestures
+    "Middle+Ring+Pinky up: pinch = volume",
+] if VOLUME_MODE == "continuous" else [
+    "All fingers except thumb: Volume Up",
+    "Only thumb up: Volume Down",
+]) + [
+    "Press 'q' to exit"
+]
 
 class SpotifyGestureController:
     def __init__(self):
-        self.cap = cv2.VideoCapture(CAMERA_INDEX)
+        # Spotify objects are cheap until connected; the dispatcher can queue commands right away
+        self.spotify = SpotifyClient()
+        self.dispatcher = CommandDispatcher(self.spotify)
+        # Track info is polled off the frame loop and re-read right after every command
+        self.tracks = TrackScheduler(self.spotify)
+        self.dispatcher.add_listener(self.on_command_event)
+        self.volume_writer = VolumeWriter(self.dispatcher)
         
-        # Set camera properties for higher FPS
-        self.cap.set(cv2.CAP_PROP_FPS, TARGET_FPS)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+        # Camera, hand model and Spotify auth start concurrently; only the first two gate the loop
+        self.startup = StartupOrchestrator()
+        self.startup.run("camera", self.open_camera)
+        self.startup.run("detector", lambda: HandGestureDetector().warm_up())
+        self.startup.run("spotify", self.connect_spotify)
+        self.cap = self.startup.wait("camera")
+        self.detector = self.startup.wait("detector")
+        print(self.startup.format_summary())
         
-        self.detector = HandGestureDetector()
-        self.spotify = SpotifyClient()
         self.prev_time = 0
         self.current_time = 0
         self.prev_gesture = None
@@ -26,130 +60,144 @@ class SpotifyGestureController:
         self.frame_count = 0
         self.fps_update_interval = 10  # Update FPS display every 10 frames
         self.fps = 0
+        self.overlay = OverlayCompositor()
+        self.last_metrics_report = time.time()
         
+    def open_camera(self):
+        # The pipeline's capture thread already reads continuously, so only the
+        # sequential loop needs a grabber thread to keep frames fresh
+        return open_source(CAMERA_SOURCE, threaded=not PIPELINE_MODE)
+    
+    def connect_spotify(self):
+        self.spotify.connect()
+        self.tracks.start()
+    
+    def on_command_event(self, event):
+        # Volume changes can't change the track, so only re-read it after other commands
+        if event["command"] not in VOLUME_COMMANDS:
+            self.tracks.poke()
+    
     def display_track_info(self, img):
         if self.current_track:
-            # Create a semi-transparent overlay for text background
-            overlay = img.copy()
-            cv2.rectangle(overlay, (5, 5), (350, 100), (0, 0, 0), -1)
-            alpha = 0.7  # Transparency factor
-            img = cv2.addWeighted(overlay, alpha, img, 1 - alpha, 0)
-            
-            # Display track info on the image with better formatting
-            cv2.putText(img, f"Track: {self.current_track['name']}", (10, 30), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-            cv2.putText(img, f"Artist: {self.current_track['artist']}", (10, 60), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
             status = "Playing" if self.current_track['is_playing'] else "Paused"
-            cv2.putText(img, f"Status: {status}", (10, 90), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            # Semi-transparent box behind the track info; re-rendered only when the track changes
+            self.overlay.draw_panel(img, "track", (5, 5), (346, 96), [
+                (f"Track: {self.current_track['name']}", (5, 25)),
+                (f"Artist: {self.current_track['artist']}", (5, 55)),
+                (f"Status: {status}", (5, 85)),
+            ], font_scale=0.7, thickness=2, background_alpha=0.7)
+        return img
         
     def process_gesture(self, gesture):
         current_time = time.time()
         
+        # The volume dial is continuous: no cooldown, the writer rate-limits the API calls
+        if gesture == DIAL_GESTURE:
+            if self.detector.volume_target is not None:
+                self.volume_writer.set_target(self.detector.volume_target)
+            self.prev_gesture = gesture
+            return
+        
         # Check cooldown to prevent multiple triggers
         if current_time - self.last_action_time < self.gesture_cooldown:
             return
         
-        # Process different gestures
-        if gesture == "Play/Pause" and self.prev_gesture != "Play/Pause":
-            current_track = self.spotify.get_current_track()
-            if current_track and current_track['is_playing']:
-                self.spotify.pause()
-                print("Paused playback")
-            else:
-                self.spotify.play()
-                print("Started playback")
-            self.last_action_time = current_time
-            
-        elif gesture == "Next Track" and self.prev_gesture != "Next Track":
-            self.spotify.next_track()
-            print("Skipped to next track")
-            self.last_action_time = current_time
-            
-        elif gesture == "Previous Track" and self.prev_gesture != "Previous Track":
-            self.spotify.previous_track()
-            print("Went to previous track")
-            self.last_action_time = current_time
-            
-        elif gesture == "Volume Up" and self.prev_gesture != "Volume Up":
-            self.spotify.increase_volume(VOLUME_STEP)
-            print(f"Increased volume by {VOLUME_STEP}%")
-            self.last_action_time = current_time
-            
-        elif gesture == "Volume Down" and self.prev_gesture != "Volume Down":
-            self.spotify.decrease_volume(VOLUME_STEP)
-            print(f"Decreased volume by {VOLUME_STEP}%")
+        # Queue the command; the dispatcher talks to Spotify off the frame loop
+        if gesture in GESTURE_COMMANDS and self.prev_gesture != gesture:
+            self.dispatcher.submit(*GESTURE_COMMANDS[gesture])
             self.last_action_time = current_time
             
         self.prev_gesture = gesture
     
+    def gesture_label(self, gesture):
+        if gesture == DIAL_GESTURE and self.detector.volume_target is not None:
+            return f"{gesture} {int(self.detector.volume_target)}%"
+        return gesture
+    
+    def update_fps(self):
+        # Calculate and update FPS
+        self.current_time = time.time()
+        self.frame_count += 1
+        
+        if self.frame_count >= self.fps_update_interval:
+            self.fps = self.fps_update_interval / (self.current_time - self.prev_time) if (self.current_time - self.prev_time) > 0 else 0
+            self.prev_time = self.current_time
+            self.frame_count = 0
+    
+    def handle_frame(self, img, gesture):
+        """Act on the detected gesture and draw the overlays for one frame"""
+        overlay_start = time.perf_counter()
+        
+        # Latest track info from the background scheduler
+        self.current_track = self.tracks.current_track
+        
+        # Display track info
+        img = self.display_track_info(img)
+        
+        # Process the detected gesture
+        # Letting go of the dial writes its final position, even within the deadband
+        if gesture != DIAL_GESTURE:
+            self.volume_writer.release()
+        if gesture != "No Hand" and gesture != "Unknown Gesture":
+            self.process_gesture(gesture)
+        
+        # Report results of commands that finished since the last frame
+        for event in self.dispatcher.drain_events():
+            print(describe_event(event))
+        
+        self.update_fps()
+        
+        h, w, c = img.shape
+        
+        # Display FPS and detected gesture on a semi-transparent box
+        self.overlay.draw_panel(img, "status", (5, h-90), (346, 86), [
+            (f"FPS: {int(self.fps)}", (5, 30)),
+            (f"Gesture: {self.gesture_label(gesture)}", (5, 60)),
+        ], font_scale=0.7, thickness=2, background_alpha=0.7)
+        
+        # Gesture instructions never change, so this panel is rasterized once
+        self.overlay.draw_panel(img, "instructions", (w-320, h-140), (311, 131),
+                                [(instruction, (10, 30 + i * 20)) for i, instruction in enumerate(INSTRUCTIONS)],
+                                font_scale=0.5, thickness=1, background_alpha=1.0, border=(255, 255, 255))
+        metrics.observe(STAGE_SECONDS, time.perf_counter() - overlay_start, stage="overlay")
+        
+        if time.time() - self.last_metrics_report >= METRICS_REPORT_INTERVAL:
+            print(metrics.format_summary())
+            self.last_metrics_report = time.time()
+        
+        return img
+    
     def run(self):
+        if PIPELINE_MODE:
+            self.run_pipelined()
+        else:
+            self.run_sequential()
+    
+    def is_idle(self):
+        return self.detector.idle is not None and self.detector.idle.state == "idle"
+    
+    def run_sequential(self):
+        # Frame rate control: perf_counter deadlines, adapted to what the loop can sustain
+        scheduler = FrameScheduler(TARGET_FPS)
+        last_report = time.time()
         try:
             while True:
-                # Calculate time for frame rate control
-                frame_start_time = time.time()
-                
-                success, img = self.cap.read()
-                if not success:
+                with Timer(STAGE_SECONDS, stage="capture"):
+                    frame = self.cap.read_frame()
+                if frame is None:
                     print("Failed to capture image from camera")
                     break
+                scheduler.begin()
                     
                 # Find hands and get landmarks
-                img = self.detector.find_hands(img)
-                landmark_list = self.detector.find_position(img)
+                img = self.detector.find_hands(frame.img)
+                hands = self.detector.find_all_landmarks()
                 
                 # Get gesture and process it
-                gesture = self.detector.get_gesture(landmark_list)
-                
-                # Update current track info periodically
-                if time.time() % 5 < 0.1:  # Update roughly every 5 seconds
-                    self.current_track = self.spotify.get_current_track()
-                
-                # Display track info
-                self.display_track_info(img)
-                
-                # Process the detected gesture
-                if gesture != "No Hand" and gesture != "Unknown Gesture":
-                    self.process_gesture(gesture)
+                gesture = self.detector.get_hands_gesture(hands)
+                metrics.observe(FRAME_AGE, frame.age)
                 
-                # Calculate and update FPS
-                self.current_time = time.time()
-                self.frame_count += 1
-                
-                if self.frame_count >= self.fps_update_interval:
-                    self.fps = self.fps_update_interval / (self.current_time - self.prev_time) if (self.current_time - self.prev_time) > 0 else 0
-                    self.prev_time = self.current_time
-                    self.frame_count = 0
-                
-                # Create a semi-transparent overlay for text background
-                h, w, c = img.shape
-                overlay = img.copy()
-                cv2.rectangle(overlay, (5, h-90), (350, h-5), (0, 0, 0), -1)
-                alpha = 0.7  # Transparency factor
-                img = cv2.addWeighted(overlay, alpha, img, 1 - alpha, 0)
-                
-                # Display FPS and detected gesture with better formatting
-                cv2.putText(img, f"FPS: {int(self.fps)}", (10, h-60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                cv2.putText(img, f"Gesture: {gesture}", (10, h-30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                
-                # Display gesture instructions with better formatting
-                instructions = [
-                    "Peace Sign: Play/Pause",
-                    "Thumb + Index: Next Track",
-                    "Thumb + Pinky: Previous Track",
-                    "All fingers except thumb: Volume Up",
-                    "Only thumb up: Volume Down",
-                    "Press 'q' to exit"
-                ]
-                
-                # Create instruction background
-                cv2.rectangle(img, (w-320, h-140), (w-10, h-10), (0, 0, 0), -1)
-                cv2.rectangle(img, (w-320, h-140), (w-10, h-10), (255, 255, 255), 1)
-                
-                for i, instruction in enumerate(instructions):
-                    cv2.putText(img, instruction, (w-310, h-110 + (i * 20)), 
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+                img = self.handle_frame(img, gesture)
                 
                 # Show the image
                 cv2.imshow("Spotify Gesture Control", img)
@@ -160,13 +208,57 @@ class SpotifyGestureController:
                     print("Exiting application...")
                     break
                 
-                # Control frame rate to target FPS
-                frame_time = time.time() - frame_start_time
-                wait_time = max(1, int((1.0/TARGET_FPS - frame_time) * 1000))
-                cv2.waitKey(wait_time)
+                scheduler.wait(idle=self.is_idle())
+                
+                if time.time() - last_report >= PIPELINE_REPORT_INTERVAL:
+                    print(FrameScheduler.format_report(scheduler.report()))
+                    last_report = time.time()
+                    
+        finally:
+            print("Cleaning up resources...")
+            self.volume_writer.stop()
+            self.dispatcher.stop()
+            self.tracks.stop()
+            self.spotify.close()
+            self.cap.release()
+            cv2.destroyAllWindows()
+    
+    def run_pipelined(self):
+        """Capture and inference run on worker threads; this thread is the render stage"""
+        pipeline = GesturePipeline(self.cap, self.detector).start()
+        last_report = time.time()
+        try:
+            while pipeline.running:
+                result = pipeline.get_result(timeout=1.0)
+                if result is not None:
+                    render_start = time.perf_counter()
+                    img = self.handle_frame(result["img"], result["gesture"])
+                    cv2.imshow("Spotify Gesture Control", img)
+                    pipeline.record_render(time.perf_counter() - render_start)
+                elif pipeline.error or not pipeline.alive:
+                    print(pipeline.error or "Pipeline stopped")
+                    break
+                
+                # Capture is paced by the camera, so only poll the keyboard here; it also keeps
+                # the window responsive while no results are coming in
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q'):
+                    print("Exiting application...")
+                    break
+                
+                if time.time() - last_report >= PIPELINE_REPORT_INTERVAL:
+                    print(GesturePipeline.format_report(pipeline.report()))
+                    if self.detector.idle is not None:
+                        print(IdleGovernor.format_report(self.detector.idle.report()))
+                    last_report = time.time()
                     
         finally:
             print("Cleaning up resources...")
+            pipeline.stop()
+            self.volume_writer.stop()
+            self.dispatcher.stop()
+            self.tracks.stop()
+            self.spotify.close()
             self.cap.release()
             cv2.destroyAllWindows()
 
@@ -0,0 +1,233 @@
+import threading
+import time
+from src.config.settings import METRICS_WINDOW
+
+# Metric names used across the app
+STAGE_SECONDS = "gesture_stage_seconds"
+SPOTIFY_SECONDS = "spotify_request_seconds"
+SPOTIFY_ERRORS = "spotify_request_errors_total"
+SPOTIFY_RETRIES = "spotify_request_retries_total"
+FRAMES_DROPPED = "gesture_frames_dropped_total"
+GESTURES = "gesture_recognized_total"
+COMMANDS = "spotify_commands_total"
+FRAME_AGE = "gesture_frame_age_seconds"
+FRAME_JITTER = "gesture_frame_jitter_seconds"
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Histogram layout: exact buckets below SUB_BUCKETS microseconds, then every power
+# of two is split into SUB_BUCKETS / 2 linear buckets (about 1.5% relative error)
+SUB_BUCKETS = 128
+HALF = SUB_BUCKETS // 2
+MAX_EXPONENT = 24  # Values up to ~35 minutes; larger ones land in the last bucket
+BUCKET_COUNT = SUB_BUCKETS + MAX_EXPONENT * HALF
+
+
+def bucket_index(micros):
+    if micros < SUB_BUCKETS:
+        return max(0, micros)
+    exponent = micros.bit_length() - SUB_BUCKETS.bit_length() + 1
+    if exponent > MAX_EXPONENT:
+        return BUCKET_COUNT - 1
+    return SUB_BUCKETS + (exponent - 1) * HALF + (micros >> exponent) - HALF
+
+
+def bucket_value(index):
+    """Midpoint of a bucket in microseconds"""
+    if index < SUB_BUCKETS:
+        return float(index)
+    exponent = (index - SUB_BUCKETS) // HALF + 1
+    mantissa = (index - SUB_BUCKETS) % HALF + HALF
+    return (mantissa << exponent) + (1 << exponent) / 2
+
+
+class RollingHistogram:
+    """Log-linear latency histogram over a rolling time window
+
+    Recording is a bucket increment, so timers can sit on the frame path.
+    Two windows are kept and rotated every `window` seconds; quantiles are
+    read from both, so they always cover between one and two windows of
+    samples. Count and sum are kept for the process lifetime.
+    """
+
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._current = [0] * BUCKET_COUNT
+        self._previous = [0] * BUCKET_COUNT
+        self._rotated_at = time.monotonic()
+        self.count = 0
+        self.sum = 0.0
+
+    def record(self, seconds):
+        index = bucket_index(int(seconds * 1e6))
+        with self._lock:
+            self._rotate()
+            self._current[index] += 1
+            self.count += 1
+            self.sum += seconds
+
+    def _rotate(self):
+        now = time.monotonic()
+        if now - self._rotated_at < self.window:
+            return
+        if now - self._rotated_at >= 2 * self.window:
+            # Idle for more than a full window: nothing recent survives
+            self._previous = [0] * BUCKET_COUNT
+        else:
+            self._previous = self._current
+        self._current = [0] * BUCKET_COUNT
+        self._rotated_at = now
+
+    def quantiles(self, quantiles=QUANTILES):
+        """Quantile values in seconds over the rolling window (None when it is empty)"""
+        with self._lock:
+            self._rotate()
+            counts = [a + b for a, b in zip(self._current, self._previous)]
+        total = sum(counts)
+        if not total:
+            return {q: None for q in quantiles}
+
+        result = {}
+        targets = sorted(quantiles)
+        seen = 0
+        target = 0
+        for index, count in enumerate(counts):
+            seen += count
+            while target < len(targets) and seen >= targets[target] * total:
+                result[targets[target]] = bucket_value(index) / 1e6
+                target += 1
+            if target == len(targets):
+                break
+        return result
+
+
+class MetricsRegistry:
+    """Process-wide latency histograms and counters, keyed by name and labels"""
+
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._histograms = {}  # (name, labels) -> RollingHistogram
+        self._counters = {}  # (name, labels) -> value
+        self._help = {}
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def histogram(self, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, RollingHistogram(self.window))
+        return histogram
+
+    def observe(self, name, seconds, **labels):
+        self.histogram(name, **labels).record(seconds)
+
+    def increment(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def counter(self, name, **labels):
+        return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def render_prometheus(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        described = set()
+        for (name, labels), histogram in histograms:
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} summary")
+            for quantile, value in histogram.quantiles().items():
+                if value is not None:
+                    lines.append(f"{name}{format_labels(labels + (('quantile', quantile),))} {value:.6f}")
+            lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum:.6f}")
+            lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+
+        for (name, labels), value in counters:
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """Rolling quantiles (ms) and counter values as plain dicts, e.g. for structured logs"""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        latency = {}
+        for (name, labels), histogram in histograms:
+            values = histogram.quantiles()
+            if values[QUANTILES[0]] is not None:
+                label = (name.split("_")[0] + ":" + ",".join(str(value) for _, value in labels) if labels else name)
+                latency[label] = {f"p{int(q * 100)}": round(values[q] * 1000, 3) for q in QUANTILES}
+        return {
+            "latency_ms": latency,
+            "counters": {name + format_labels(labels): value for (name, labels), value in counters},
+        }
+
+    def format_summary(self):
+        """Short multi-line report for the console"""
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        for (name, labels), histogram in histograms:
+            values = histogram.quantiles()
+            if values[QUANTILES[0]] is None:
+                continue
+            label = (name.split("_")[0] + ":" + ",".join(str(value) for _, value in labels) if labels else name)
+            quantiles = " ".join(f"p{int(q * 100)}={values[q] * 1000:.1f}ms" for q in QUANTILES)
+            lines.append(f"  {label:<24} {quantiles}")
+
+        if counters:
+            lines.append("  " + ", ".join(f"{name.replace('_total', '')}{format_labels(labels)}={value}"
+                                          for (name, labels), value in counters))
+        return "Metrics:\n" + "\n".join(lines) if lines else "Metrics: no samples yet"
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class Timer:
+    """`with Timer(STAGE_SECONDS, stage="capture"):` records the block's duration"""
+
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, name, **labels):
+        self.histogram = metrics.histogram(name, **labels)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter() - self.start)
+        return False
+
+
+metrics = MetricsRegistry()
+metrics.describe(STAGE_SECONDS, "Per-stage frame processing latency over the rolling window")
+metrics.describe(SPOTIFY_SECONDS, "Spotify Web API round trip time per endpoint")
+metrics.describe(SPOTIFY_ERRORS, "Spotify Web API requests that raised an error")
+metrics.describe(SPOTIFY_RETRIES, "Spotify Web API requests retried after a failed attempt")
+metrics.describe(FRAMES_DROPPED, "Frames dropped because the next stage was still busy")
+metrics.describe(GESTURES, "Gestures recognized after smoothing")
+metrics.describe(COMMANDS, "Spotify commands executed by the dispatcher")
+metrics.describe(FRAME_JITTER, "Deviation of each paced frame interval from the target interval")
+metrics.describe(FRAME_AGE, "Time from frame capture to its gesture being classified (glass to gesture)")
@@ -0,0 +1,70 @@
+import time
+from src.spotify.dispatcher import GESTURE_COMMANDS
+from src.config.settings import MULTICAM_CONFLICT_WINDOW
+
+
+class CommandArbiter:
+    """Turns gesture events from several cameras into one stream of Spotify commands
+
+    Gestures reported within `window` seconds of each other are treated as
+    competing: the most confident one wins, so the same hand seen by two
+    cameras triggers one command, and conflicting gestures don't both fire.
+    A shared cooldown then applies across all cameras. Workers only report
+    gesture changes, so a new gesture that arrives during the cooldown is
+    kept per camera and competes once the cooldown ends, as long as that
+    camera hasn't reported a different gesture since.
+    """
+
+    def __init__(self, dispatcher, cooldown=1.0, window=MULTICAM_CONFLICT_WINDOW):
+        self.dispatcher = dispatcher
+        self.cooldown = cooldown
+        self.window = window
+        self.last_action_time = 0.0
+        self.last_gesture = None
+        self._held = {}  # Source -> newest command gesture offered during the cooldown
+        self._candidates = []
+        self._window_start = None
+        self.conflicts = 0
+
+    def offer(self, event, now=None):
+        """Consider a gesture event from one of the cameras"""
+        if now is None:
+            now = time.monotonic()
+        if event["gesture"] not in GESTURE_COMMANDS:
+            # The hand changed to something else, so whatever it held is released
+            self._held.pop(event["source"], None)
+            return
+        if now - self.last_action_time < self.cooldown:
+            if event["gesture"] == self.last_gesture:
+                # Most likely the gesture that just fired, seen late or by another camera
+                self._held.pop(event["source"], None)
+            else:
+                self._held[event["source"]] = event
+            return
+        if self._window_start is None:
+            self._window_start = now
+        self._candidates.append(event)
+
+    def poll(self, now=None):
+        """Resolve the current window once it has elapsed; returns the winning event, if any"""
+        if now is None:
+            now = time.monotonic()
+        if self._held and now - self.last_action_time >= self.cooldown:
+            # Gestures still held from the cooldown get their turn now
+            held, self._held = list(self._held.values()), {}
+            if self._window_start is None:
+                self._window_start = now
+            self._candidates.extend(held)
+        if self._window_start is None or now - self._window_start < self.window:
+            return None
+
+        candidates, self._candidates = self._candidates, []
+        self._window_start = None
+        if len({event["gesture"] for event in candidates}) > 1:
+            self.conflicts += 1
+
+        winner = max(candidates, key=lambda event: event["confidence"])
+        self.dispatcher.submit(*GESTURE_COMMANDS[winner["gesture"]])
+        self.last_action_time = now
+        self.last_gesture = winner["gesture"]
+        return winner
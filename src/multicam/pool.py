@@ -0,0 +1,119 @@
+import multiprocessing
+import queue
+import time
+from src.multicam.worker import camera_worker, capture_worker, inference_worker
+from src.multicam.shm_ring import FrameRing
+from src.multicam.arbiter import CommandArbiter
+from src.spotify.client import SpotifyClient
+from src.spotify.dispatcher import CommandDispatcher, describe_event, VOLUME_COMMANDS
+from src.spotify.track_scheduler import TrackScheduler
+from src.config.settings import (CAMERA_SOURCES, MULTICAM_REPORT_INTERVAL, SHARED_MEMORY_FRAMES, FRAME_RING_SLOTS,
+                                 FRAME_WIDTH, FRAME_HEIGHT)
+
+
+class DetectorPool:
+    """One capture + detector process per camera, feeding a single command arbiter
+
+    Each source runs in its own process so detection scales with CPU cores
+    instead of sharing one interpreter. With shared memory enabled, capture
+    and inference are separate processes exchanging frames through a
+    FrameRing, with no per-frame pickling. Gesture events come back over a multiprocessing queue and only this
+    process talks to Spotify.
+    """
+
+    def __init__(self, sources=CAMERA_SOURCES, shared_memory=SHARED_MEMORY_FRAMES):
+        self.sources = list(sources)
+        self.shared_memory = shared_memory
+        self.frame_rings = []
+        self.context = multiprocessing.get_context("spawn")
+        self.events = self.context.Queue()
+        self.stop_event = self.context.Event()
+        self.processes = []
+        self.stats = {}  # Source id -> latest stats event
+        self.spotify = SpotifyClient()
+        self.dispatcher = CommandDispatcher(self.spotify)
+        # Keeps the cached playback state current for volume and toggle commands
+        self.tracks = TrackScheduler(self.spotify).start()
+        self.dispatcher.add_listener(self.on_command_event)
+        self.arbiter = CommandArbiter(self.dispatcher)
+
+    def on_command_event(self, event):
+        # Volume changes can't change the track, so only re-read it after other commands
+        if event["command"] not in VOLUME_COMMANDS:
+            self.tracks.poke()
+
+    def _spawn(self, target, args, name):
+        process = self.context.Process(target=target, args=args, name=name, daemon=True)
+        process.start()
+        self.processes.append(process)
+
+    def start(self):
+        for source_id, source in enumerate(self.sources):
+            if not self.shared_memory:
+                self._spawn(camera_worker, (source_id, source, self.events, self.stop_event), f"camera-{source_id}")
+                continue
+
+            # Capture and inference in separate processes, sharing frames through a ring
+            frame_ring = FrameRing(FRAME_RING_SLOTS, (FRAME_HEIGHT, FRAME_WIDTH, 3), ready=self.context.Condition())
+            self.frame_rings.append(frame_ring)
+            self._spawn(capture_worker, (source_id, source, frame_ring.spec(), self.events, self.stop_event),
+                        f"capture-{source_id}")
+            self._spawn(inference_worker, (source_id, frame_ring.spec(), self.events, self.stop_event),
+                        f"inference-{source_id}")
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        for ring in self.frame_rings:
+            ring.close()
+        self.dispatcher.stop()
+        self.tracks.stop()
+        self.spotify.close()
+
+    def format_report(self):
+        parts = []
+        for source_id, stats in sorted(self.stats.items()):
+            parts.append(f"camera {source_id} ({self.sources[source_id]}): "
+                         f"{stats['fps']:.1f} fps, {stats['latency_ms']:.1f} ms, {stats['dropped']} dropped")
+        return " | ".join(parts) + f" | conflicts: {self.arbiter.conflicts}"
+
+    def run(self):
+        self.start()
+        active = len(self.processes)
+        last_report = time.monotonic()
+        try:
+            while active:
+                try:
+                    event = self.events.get(timeout=self.arbiter.window / 2)
+                except queue.Empty:
+                    event = None
+
+                if event is not None:
+                    if event["type"] == "gesture":
+                        self.arbiter.offer(event)
+                    elif event["type"] == "stats":
+                        self.stats[event["source"]] = event
+                    elif event["type"] == "stopped":
+                        active -= 1
+                        if event["error"]:
+                            print(f"Camera {event['source']} stopped: {event['error']}")
+
+                winner = self.arbiter.poll()
+                if winner is not None:
+                    print(f"Camera {winner['source']}: {winner['gesture']}")
+
+                for result in self.dispatcher.drain_events():
+                    print(describe_event(result))
+
+                if self.stats and time.monotonic() - last_report >= MULTICAM_REPORT_INTERVAL:
+                    print(self.format_report())
+                    last_report = time.monotonic()
+        except KeyboardInterrupt:
+            print("Exiting application...")
+        finally:
+            print("Cleaning up resources...")
+            self.stop()
@@ -0,0 +1,156 @@
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+
+class SharedArrays:
+    """A set of NumPy arrays laid out back to back in one shared memory block
+
+    The creating process passes `spec()` to other processes, which attach to
+    the same block and get views of the same memory without any copying.
+    """
+
+    def __init__(self, layout, name=None):
+        self.layout = layout  # List of (field, shape, dtype)
+
+        # Lay the arrays out back to back, each aligned for its dtype
+        offsets = []
+        size = 0
+        for _, shape, dtype in layout:
+            itemsize = np.dtype(dtype).itemsize
+            size = -(-size // itemsize) * itemsize
+            offsets.append(size)
+            size += int(np.prod(shape)) * itemsize
+
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        self.arrays = {}
+        for (field, shape, dtype), offset in zip(layout, offsets):
+            self.arrays[field] = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+        if self.owner:
+            for array in self.arrays.values():
+                array.fill(0)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        self.arrays = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class FrameRing:
+    """Ring of preallocated frame slots in shared memory, tagged with sequence numbers
+
+    The single writer fills the next slot in place (e.g. `cap.read(image=...)`)
+    and then publishes its sequence number. Readers map the newest slot as a
+    NumPy view and can check afterwards that it wasn't overwritten while they
+    were using it. Sequence numbers start at 1; 0 means empty.
+
+    `ready` is a multiprocessing Condition shared by writer and readers: the
+    writer notifies it on every commit, so readers can block in `wait()`
+    instead of polling the sequence number.
+    """
+
+    def __init__(self, slots=4, shape=(480, 640, 3), name=None, ready=None):
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.ready = ready
+        self.memory = SharedArrays([
+            ("latest", (1,), np.int64),
+            ("closed", (1,), np.int8),
+            ("seq", (slots,), np.int64),
+            ("timestamps", (slots,), np.float64),
+            ("frames", (slots,) + self.shape, np.uint8),
+        ], name)
+        self.latest_seq = self.memory.arrays["latest"]
+        self.writer_closed = self.memory.arrays["closed"]
+        self.seq = self.memory.arrays["seq"]
+        self.timestamps = self.memory.arrays["timestamps"]
+        self.frames = self.memory.arrays["frames"]
+
+    def spec(self):
+        # The condition pickles only as a Process argument, which is how specs reach the workers
+        return {"slots": self.slots, "shape": self.shape, "name": self.memory.name, "ready": self.ready}
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(spec["slots"], spec["shape"], spec["name"], spec.get("ready"))
+
+    def begin_write(self):
+        """Claim the next slot; returns (seq, writable view of the slot)"""
+        seq = int(self.latest_seq[0]) + 1
+        slot = seq % self.slots
+        self.seq[slot] = -1  # Mark the slot as being written
+        return seq, self.frames[slot]
+
+    def commit(self, seq, timestamp):
+        slot = seq % self.slots
+        self.timestamps[slot] = timestamp
+        self.seq[slot] = seq
+        self.latest_seq[0] = seq
+        self._notify()
+
+    def _notify(self):
+        if self.ready is not None:
+            with self.ready:
+                self.ready.notify_all()
+
+    def wait(self, after, timeout):
+        """Block until a frame newer than `after` is committed or the writer closes; False on timeout"""
+        if self.ready is None:
+            # Without a condition all a reader can do is poll
+            time.sleep(min(timeout, 0.001))
+            return self.latest_seq[0] > after or self.finished
+        with self.ready:
+            return self.ready.wait_for(lambda: self.latest_seq[0] > after or self.finished, timeout)
+
+    def read_into(self, cap, timestamp_fn):
+        """Capture straight into the next slot; returns the new sequence number or None"""
+        seq, view = self.begin_write()
+        success, img = cap.read(image=view)
+        if not success:
+            return None
+        if img is not None and not np.shares_memory(img, view):
+            # The driver gave us a new buffer (e.g. a different frame size): copy it in
+            if img.shape != view.shape:
+                import cv2
+                img = cv2.resize(img, (self.shape[1], self.shape[0]))
+            view[:] = img
+        self.commit(seq, timestamp_fn())
+        return seq
+
+    def latest(self, after=0):
+        """Newest committed frame newer than `after` as (seq, view, timestamp), or None"""
+        seq = int(self.latest_seq[0])
+        if seq <= after:
+            return None
+        slot = seq % self.slots
+        if self.seq[slot] != seq:
+            return None
+        return seq, self.frames[slot], float(self.timestamps[slot])
+
+    def close_writer(self):
+        """Tell readers that no more frames will be written"""
+        self.writer_closed[0] = 1
+        self._notify()
+
+    @property
+    def finished(self):
+        return bool(self.writer_closed[0])
+
+    def still_valid(self, seq):
+        """True if the slot holding `seq` hasn't been reused since it was read"""
+        return self.seq[seq % self.slots] == seq
+
+    def close(self):
+        # Drop every view before the mapping goes away
+        self.latest_seq = self.writer_closed = self.seq = self.timestamps = self.frames = None
+        self.memory.close()
@@ -0,0 +1,145 @@
+import time
+from src.camera.sources import open_source
+from src.config.settings import MULTICAM_REPORT_INTERVAL, FRAME_WAIT_TIMEOUT
+
+
+class SourceReporter:
+    """Sends gesture changes and periodic FPS/latency stats for one source to the parent"""
+
+    def __init__(self, source_id, events, report_interval=MULTICAM_REPORT_INTERVAL):
+        self.source_id = source_id
+        self.events = events
+        self.report_interval = report_interval
+        self.prev_gesture = None
+        self.frames = 0
+        self.dropped = 0
+        self.latency = 0.0
+        self.last_report = time.monotonic()
+
+    def frame(self, gesture, landmarks, captured_at, latency):
+        self.frames += 1
+        self.latency += latency
+
+        if gesture != self.prev_gesture:
+            self.events.put({
+                "type": "gesture",
+                "source": self.source_id,
+                "gesture": gesture,
+                "confidence": landmarks.score if landmarks is not None else 0.0,
+                "captured_at": captured_at,
+            })
+            self.prev_gesture = gesture
+
+        now = time.monotonic()
+        if now - self.last_report >= self.report_interval:
+            self.events.put({
+                "type": "stats",
+                "source": self.source_id,
+                "fps": self.frames / (now - self.last_report),
+                "latency_ms": self.latency / self.frames * 1000 if self.frames else 0.0,
+                "dropped": self.dropped,
+            })
+            self.frames = 0
+            self.dropped = 0
+            self.latency = 0.0
+            self.last_report = now
+
+    def stopped(self, error=None):
+        self.events.put({"type": "stopped", "source": self.source_id, "error": error})
+
+
+def camera_worker(source_id, source, events, stop_event):
+    """Capture and detection loop for one source, run in its own process"""
+    # Imported here so each process builds its own MediaPipe graph after spawning
+    from src.gestures.detector import HandGestureDetector
+
+    # Detection is slower than capture, so grab on a thread and always process the newest frame
+    cap = open_source(source, threaded=True)
+    detector = HandGestureDetector()
+    reporter = SourceReporter(source_id, events)
+    error = None
+
+    try:
+        while not stop_event.is_set():
+            frame = cap.read_frame()
+            if frame is None:
+                error = f"Failed to read from source {source}"
+                break
+            start = time.perf_counter()
+
+            detector.find_hands(frame.img, draw=False)
+            hands = detector.find_all_landmarks()
+            gesture = detector.get_hands_gesture(hands)
+
+            reporter.frame(gesture, hands[0] if hands else None, frame.captured_at, time.perf_counter() - start)
+    except Exception as e:
+        error = str(e)
+    finally:
+        cap.release()
+        reporter.stopped(error)
+
+
+def capture_worker(source_id, source, ring_spec, events, stop_event):
+    """Capture process: reads frames straight into the shared memory ring"""
+    from src.multicam.shm_ring import FrameRing
+
+    ring = FrameRing.attach(ring_spec)
+    # The ring already keeps only the newest frames, and capturing into it needs the raw camera
+    cap = open_source(source, threaded=False)
+    error = None
+    try:
+        while not stop_event.is_set():
+            if ring.read_into(cap, time.time) is None:
+                error = f"Failed to read from source {source}"
+                break
+    except Exception as e:
+        error = str(e)
+    finally:
+        cap.release()
+        ring.close_writer()
+        ring.close()
+        events.put({"type": "stopped", "source": source_id, "error": error})
+
+
+def inference_worker(source_id, ring_spec, events, stop_event):
+    """Inference process: runs the detector on the newest frame in the ring, in place"""
+    from src.gestures.detector import HandGestureDetector
+    from src.multicam.shm_ring import FrameRing
+
+    ring = FrameRing.attach(ring_spec)
+    detector = HandGestureDetector()
+    reporter = SourceReporter(source_id, events)
+    last_seq = 0
+    error = None
+
+    try:
+        while not stop_event.is_set():
+            # Sleep until the capture process commits a frame; the timeout keeps stop_event responsive
+            if not ring.wait(last_seq, FRAME_WAIT_TIMEOUT):
+                continue
+            latest = ring.latest(after=last_seq)
+            if latest is None:
+                if ring.finished:
+                    break
+                continue
+            seq, frame, captured_at = latest
+            if last_seq:
+                reporter.dropped += seq - last_seq - 1
+            last_seq = seq
+            start = time.perf_counter()
+
+            # `frame` is a view of the shared slot: no copy between processes
+            detector.find_hands(frame, draw=False)
+            hands = detector.find_all_landmarks()
+            if not ring.still_valid(seq):
+                # The capture process lapped us mid-inference; the result is for a torn frame
+                reporter.dropped += 1
+                continue
+            gesture = detector.get_hands_gesture(hands)
+
+            reporter.frame(gesture, hands[0] if hands else None, captured_at, time.perf_counter() - start)
+    except Exception as e:
+        error = str(e)
+    finally:
+        ring.close()
+        reporter.stopped(error)
@@ -0,0 +1,128 @@
+import time
+import numpy as np
+from src.metrics.metrics import metrics, FRAME_JITTER
+from src.config.settings import (TARGET_FPS, FPS_GOVERNOR, MIN_FPS, IDLE_FPS, FPS_GOVERNOR_LOAD,
+                                 FPS_GOVERNOR_INTERVAL)
+
+# Weight of the newest frame in the processing time average the governor works from
+WORK_SMOOTHING = 0.1
+
+
+class FrameScheduler:
+    """Paces a frame loop against `time.perf_counter` deadlines, with an adaptive frame rate
+
+    The loop calls `begin()` once it has a frame and `wait()` when it is
+    done with it. Deadlines advance by a fixed interval, so sleep error
+    doesn't accumulate; a frame that overruns its slot starts a fresh
+    schedule instead of bursting through the missed ones.
+
+    The governor lowers the target rate when processing takes more than
+    FPS_GOVERNOR_LOAD of the frame interval, and raises it step by step
+    (never above `target_fps`) when there is headroom. While the scene is
+    idle the loop is paced at `idle_fps`.
+    """
+
+    def __init__(self, target_fps=TARGET_FPS, min_fps=MIN_FPS, idle_fps=IDLE_FPS, governor=FPS_GOVERNOR,
+                 sleep=time.sleep):
+        self.max_fps = target_fps
+        self.min_fps = min(min_fps, target_fps)
+        self.idle_fps = idle_fps
+        self.governor = governor
+        self.sleep = sleep  # e.g. a stop event's wait(), so shutdown doesn't wait out a frame
+        self.target_fps = target_fps
+        self.idle = False
+        self.late_frames = 0
+        self.adjustments = 0
+        self._deadline = None
+        self._woke = None
+        self._work_start = None
+        self._work = None  # Smoothed processing seconds per frame
+        self._last_adjust = time.perf_counter()
+        self._intervals = []  # Wake-to-wake seconds since the last report
+        self._deviations = []  # Their distance from the interval they were paced to
+        self._reported_late = 0
+
+    @property
+    def interval(self):
+        fps = min(self.target_fps, self.idle_fps) if self.idle else self.target_fps
+        return 1.0 / fps
+
+    def begin(self):
+        """Mark the start of processing; waiting for the camera before this doesn't count as load"""
+        self._work_start = time.perf_counter()
+
+    def wait(self, idle=False):
+        """Sleep until the next frame is due; returns False if this frame overran its slot"""
+        now = time.perf_counter()
+        self.idle = idle
+        start = self._work_start if self._work_start is not None else self._woke
+        if start is not None:
+            work = now - start
+            self._work = work if self._work is None else self._work + WORK_SMOOTHING * (work - self._work)
+            if self.governor and not idle:
+                self._govern(now)
+        self._work_start = None
+
+        interval = self.interval
+        on_time = True
+        if self._deadline is None:
+            self._deadline = now + interval
+        else:
+            self._deadline += interval
+            if self._deadline <= now:
+                # Behind schedule: start over from now rather than rushing through the missed frames
+                self.late_frames += 1
+                self._deadline = now
+                on_time = False
+        if self._deadline > now:
+            self.sleep(self._deadline - now)
+
+        woke = time.perf_counter()
+        if self._woke is not None:
+            deviation = abs(woke - self._woke - interval)
+            self._intervals.append(woke - self._woke)
+            self._deviations.append(deviation)
+            metrics.observe(FRAME_JITTER, deviation)
+        self._woke = woke
+        return on_time
+
+    def _govern(self, now):
+        if now - self._last_adjust < FPS_GOVERNOR_INTERVAL or not self._work:
+            return
+        self._last_adjust = now
+        sustainable = FPS_GOVERNOR_LOAD / self._work
+        if sustainable < self.target_fps * 0.95:
+            # Drop straight to what the loop can sustain
+            target = max(self.min_fps, sustainable)
+        elif sustainable > self.target_fps * 1.1 and self.target_fps < self.max_fps:
+            # Climb back gradually, so a single cheap stretch doesn't cause an overshoot
+            target = min(self.max_fps, self.target_fps * 1.1)
+        else:
+            return
+        if abs(target - self.target_fps) >= 0.1:
+            self.target_fps = target
+            self.adjustments += 1
+
+    def report(self):
+        """Achieved rate, target and jitter since the last report"""
+        intervals, self._intervals = self._intervals, []
+        deviations, self._deviations = self._deviations, []
+        late, self._reported_late = self.late_frames - self._reported_late, self.late_frames
+        total = sum(intervals)
+        return {
+            "target_fps": round(1.0 / self.interval, 1),
+            "max_fps": self.max_fps,
+            "achieved_fps": round(len(intervals) / total, 1) if total > 0 else 0.0,
+            "jitter_ms": round(float(np.std(intervals)) * 1000, 2) if intervals else 0.0,
+            "jitter_p99_ms": round(float(np.percentile(deviations, 99)) * 1000, 2) if deviations else 0.0,
+            "late_frames": late,
+            "load": round(self._work / self.interval, 2) if self._work else 0.0,
+            "idle": self.idle,
+        }
+
+    @staticmethod
+    def format_report(report):
+        text = (f"Frame pacing: {report['achieved_fps']:.1f}/{report['target_fps']:.1f} fps "
+                f"(max {report['max_fps']}), jitter {report['jitter_ms']:.2f} ms (p99 {report['jitter_p99_ms']:.2f} ms), "
+                f"{report['late_frames']} late, load {report['load']:.0%}")
+        return text + " [idle]" if report["idle"] else text
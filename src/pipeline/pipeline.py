@@ -0,0 +1,165 @@
+import threading
+import time
+from src.pipeline.queues import LatestFrameQueue
+from src.metrics.metrics import metrics, STAGE_SECONDS, FRAMES_DROPPED, FRAME_AGE
+from src.config.settings import PIPELINE_QUEUE_SIZE
+
+
+class StageStats:
+    """Throughput and busy-time counters for a single pipeline stage"""
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._count = 0
+        self._busy = 0.0
+        self._window_start = time.perf_counter()
+
+    def record(self, duration):
+        with self._lock:
+            self._count += 1
+            self._busy += duration
+
+    def snapshot(self):
+        """Return rate and mean latency since the previous snapshot, then reset the window"""
+        with self._lock:
+            now = time.perf_counter()
+            elapsed = now - self._window_start
+            count, busy = self._count, self._busy
+            self._count = 0
+            self._busy = 0.0
+            self._window_start = now
+        return {
+            "fps": count / elapsed if elapsed > 0 else 0.0,
+            "avg_ms": (busy / count) * 1000 if count else 0.0,
+        }
+
+
+class GesturePipeline:
+    """Runs capture and inference on their own threads, handing results to a render stage
+
+    Stages are joined by latest-frame-wins queues, so a slow stage never works
+    through a backlog of stale frames. The render stage is driven by the caller
+    (it usually owns the window or the socket) through get_result().
+    """
+
+    def __init__(self, cap, detector, draw=True, queue_size=PIPELINE_QUEUE_SIZE):
+        self.cap = cap  # A FrameSource
+        self.detector = detector
+        self.draw = draw
+        self.capture_queue = LatestFrameQueue(queue_size)
+        self.result_queue = LatestFrameQueue(queue_size)
+        self.stats = {
+            "capture": StageStats("capture"),
+            "inference": StageStats("inference"),
+            "render": StageStats("render"),
+        }
+        self.error = None
+        self._reported_drops = {"capture": 0, "inference": 0}
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="pipeline-capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="pipeline-inference", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.capture_queue.close()
+        self.result_queue.close()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+
+    @property
+    def running(self):
+        return not self._stop.is_set()
+
+    @property
+    def alive(self):
+        """False once any stage thread has exited"""
+        return all(thread.is_alive() for thread in self._threads)
+
+    def _fail(self, stage, error):
+        """Record why a stage died and end the pipeline, waking whoever waits on either queue"""
+        self.error = f"Pipeline {stage} stage failed: {error}"
+        self._stop.set()
+        self.capture_queue.close()
+        self.result_queue.close()
+
+    def _capture_loop(self):
+        try:
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                frame = self.cap.read_frame()
+                if frame is None:
+                    self.error = "Failed to capture image from camera"
+                    break
+                duration = time.perf_counter() - start
+                self.stats["capture"].record(duration)
+                metrics.observe(STAGE_SECONDS, duration, stage="capture")
+                if self.capture_queue.put((frame.img, frame.captured_at)):
+                    metrics.increment(FRAMES_DROPPED, stage="inference")
+        except Exception as e:
+            self._fail("capture", e)
+        finally:
+            self.capture_queue.close()
+
+    def _inference_loop(self):
+        try:
+            while not self._stop.is_set():
+                item = self.capture_queue.get(timeout=0.5)
+                if item is None:
+                    if self.capture_queue.closed:
+                        break
+                    continue
+                img, captured_at = item
+                start = time.perf_counter()
+                img = self.detector.find_hands(img, draw=self.draw)
+                hands = self.detector.find_all_landmarks()
+                gesture = self.detector.get_hands_gesture(hands)
+                self.stats["inference"].record(time.perf_counter() - start)
+                metrics.observe(FRAME_AGE, time.time() - captured_at)
+                dropped = self.result_queue.put({
+                    "img": img,
+                    "gesture": gesture,
+                    "landmarks": hands[0] if hands else None,
+                    "hands": hands,
+                    "captured_at": captured_at,
+                })
+                if dropped:
+                    metrics.increment(FRAMES_DROPPED, stage="render")
+        except Exception as e:
+            self._fail("inference", e)
+        finally:
+            self.result_queue.close()
+
+    def get_result(self, timeout=None):
+        """Block until the next inference result is ready (None once the pipeline has ended)"""
+        return self.result_queue.get(timeout)
+
+    def record_render(self, duration):
+        self.stats["render"].record(duration)
+
+    def report(self):
+        """Per-stage throughput since the last report, plus frames dropped between stages"""
+        report = {name: stats.snapshot() for name, stats in self.stats.items()}
+        for name, queue in (("capture", self.capture_queue), ("inference", self.result_queue)):
+            dropped = queue.dropped
+            report[name]["dropped"] = dropped - self._reported_drops[name]
+            self._reported_drops[name] = dropped
+        return report
+
+    @staticmethod
+    def format_report(report):
+        parts = []
+        for name, stage in report.items():
+            text = f"{name}: {stage['fps']:.1f} fps ({stage['avg_ms']:.1f} ms)"
+            if stage.get("dropped"):
+                text += f", {stage['dropped']} dropped"
+            parts.append(text)
+        return " | ".join(parts)
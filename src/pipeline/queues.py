@@ -0,0 +1,41 @@
+import threading
+from collections import deque
+
+
+class LatestFrameQueue:
+    """Bounded hand-off between pipeline stages where the newest item always wins"""
+
+    def __init__(self, maxsize=1):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0  # Items evicted before a consumer picked them up
+
+    def put(self, item):
+        """Queue an item; returns True if the oldest one had to be dropped for it"""
+        with self._cond:
+            dropped = len(self._items) == self._items.maxlen
+            if dropped:
+                # Stale frame: drop it rather than letting the backlog grow
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+            return dropped
+
+    def get(self, timeout=None):
+        """Return the oldest queued item, or None on timeout or after close()"""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
@@ -0,0 +1,258 @@
+import threading
+import time
+from collections import Counter
+import numpy as np
+from src.gestures.detector import HandGestureDetector
+from src.gestures.smoothing import GestureWindow
+from src.metrics.metrics import RollingHistogram, bucket_index, bucket_value, HALF
+from src.multicam.shm_ring import FrameRing
+from src.replay.replay import ReplayHands, ReplaySource
+from src.spotify.dispatcher import CommandDispatcher, GESTURE_COMMANDS
+from src.spotify.transport import SpotifyTransport, CircuitBreaker, CircuitOpenError
+from src.config.settings import GESTURE_SMOOTHING_FRAMES
+
+
+def replay_gestures(recording):
+    """(raw, smoothed, seconds spent) for every frame of a recording, from recorded landmarks"""
+    detector = HandGestureDetector(hands=ReplayHands(recording), idle_mode=False)
+    source = ReplaySource(recording)
+    gestures = []
+    try:
+        while True:
+            success, img = source.read()
+            if not success:
+                return gestures
+            start = time.perf_counter()
+            detector.find_hands(img, draw=False)
+            smoothed = detector.get_hands_gesture(detector.find_all_landmarks(), source.timestamp())
+            gestures.append((detector.gesture_history[-1], smoothed, time.perf_counter() - start))
+    finally:
+        source.release()
+
+
+def check_gesture_window(raw, sizes=(3, GESTURE_SMOOTHING_FRAMES)):
+    """Incremental counts and leader against a recount of the window after every push"""
+    failures = []
+    for size in sizes:
+        window = GestureWindow(size)
+        for i, gesture in enumerate(raw):
+            window.push(gesture)
+            expected = Counter(raw[max(0, i + 1 - size):i + 1])
+            counts = {name: count for name, count in window.counts.items() if count > 1e-9}
+            if counts != expected or abs(window.total - sum(expected.values())) > 1e-9:
+                failures.append(f"size {size}, frame {i}: counts {counts} != {dict(expected)}")
+            elif expected[window.leader] != max(expected.values()):
+                failures.append(f"size {size}, frame {i}: leader {window.leader} is not the most frequent")
+            if failures:
+                break
+    return failures
+
+
+def check_histogram(samples):
+    """RollingHistogram quantiles against exact percentiles of the same samples"""
+    failures = []
+    for seconds in samples:
+        micros = int(seconds * 1e6)
+        value = bucket_value(bucket_index(micros))
+        if abs(value - micros) > max(1.0, micros / HALF):
+            failures.append(f"{micros}us lands in a bucket centred on {value}us")
+            break
+
+    histogram = RollingHistogram(window=3600)
+    for seconds in samples:
+        histogram.record(seconds)
+    if histogram.count != len(samples):
+        failures.append(f"count {histogram.count} != {len(samples)}")
+    if samples:
+        ordered = np.sort(np.asarray(samples))
+        for q, value in histogram.quantiles().items():
+            # A quantile is the midpoint of the bucket holding the sample at that rank
+            rank = ordered[max(0, int(np.ceil(q * len(ordered))) - 1)]
+            tolerance = 2e-6 + rank / HALF
+            if abs(value - rank) > tolerance:
+                failures.append(f"q{q}: {value * 1000:.3f}ms, exact {rank * 1000:.3f}ms")
+    return failures
+
+
+class _GatedSpotify:
+    """Client stand-in with just enough state to compare command outcomes; blocks until `gate` is set"""
+
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.playing = False
+        self.volume = 0
+        self.track = 0
+        self.calls = 0
+
+    def _call(self):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait()
+        return True
+
+    def play(self):
+        self.playing = True
+        return self._call()
+
+    def pause(self):
+        self.playing = False
+        return self._call()
+
+    def toggle_playback(self):
+        self.playing = not self.playing
+        return self._call()
+
+    def next_track(self):
+        self.track += 1
+        return self._call()
+
+    def previous_track(self):
+        self.track -= 1
+        return self._call()
+
+    def increase_volume(self, step):
+        # Unclamped, so summed volume steps must land exactly where single steps do
+        self.volume += step
+        return self._call()
+
+    def decrease_volume(self, step):
+        self.volume -= step
+        return self._call()
+
+    def set_volume(self, volume):
+        self.volume = volume
+        return self._call()
+
+
+def check_dispatcher(smoothed):
+    """Commands coalesced behind a slow request leave Spotify where running them one by one would"""
+    commands = []
+    previous = None
+    for gesture in smoothed:
+        if gesture != previous and gesture in GESTURE_COMMANDS:
+            commands.append(GESTURE_COMMANDS[gesture])
+        previous = gesture
+    if not commands:
+        return []
+
+    sequential = _GatedSpotify()
+    dispatcher = CommandDispatcher(sequential)
+    try:
+        for command, value in commands:
+            dispatcher.submit(command, value)
+            dispatcher.flush(5.0)
+    finally:
+        dispatcher.stop()
+
+    gate = threading.Event()
+    coalesced = _GatedSpotify(gate)
+    dispatcher = CommandDispatcher(coalesced)
+    try:
+        # The first command blocks the worker, so everything after it queues up and coalesces
+        dispatcher.submit(*commands[0])
+        deadline = time.monotonic() + 1.0
+        while not coalesced.calls and time.monotonic() < deadline:
+            time.sleep(0.001)
+        for command, value in commands[1:]:
+            dispatcher.submit(command, value)
+        gate.set()
+        if not dispatcher.flush(5.0):
+            return ["dispatcher did not drain"]
+    finally:
+        gate.set()
+        dispatcher.stop()
+
+    failures = []
+    for name in ("playing", "volume", "track"):
+        if getattr(coalesced, name) != getattr(sequential, name):
+            failures.append(f"{name}: {getattr(coalesced, name)} coalesced, {getattr(sequential, name)} sequential")
+    if coalesced.calls > sequential.calls:
+        failures.append(f"{coalesced.calls} calls coalesced, more than the {sequential.calls} sequential")
+    return failures
+
+
+class _ServerError(Exception):
+    http_status = 500
+
+
+def check_breaker(threshold=3, reset_timeout=0.05):
+    """Breaker opens after `threshold` failed calls (one per call, however many retries), then recovers"""
+    breaker = CircuitBreaker(threshold, reset_timeout)
+    transport = SpotifyTransport(max_retries=2, breaker=breaker)
+    failures = []
+
+    def fail():
+        raise _ServerError("server error")
+
+    for i in range(threshold):
+        if breaker.state != "closed":
+            failures.append(f"open after {i} failed calls")
+            break
+        transport.call("default", fail)
+    if breaker.state != "open":
+        failures.append(f"still {breaker.state} after {threshold} failed calls")
+
+    result = transport.call("default", lambda: "ok")
+    if not isinstance(result.exception, CircuitOpenError):
+        failures.append("call went through while open")
+
+    time.sleep(reset_timeout)
+    result = transport.call("default", lambda: "ok")
+    if not result or breaker.state != "closed":
+        failures.append(f"trial call {result!r} left the breaker {breaker.state}")
+    return failures
+
+
+def check_frame_ring(recording, slots=4, read_every=3):
+    """Frames written through a FrameRing read back intact, and lapped or torn slots are refused"""
+    source = ReplaySource(recording)
+    ring = None
+    failures = []
+    try:
+        written = {}
+        last_read = 0
+        while not failures:
+            success, img = source.read()
+            if not success:
+                break
+            if ring is None:
+                ring = FrameRing(slots, img.shape)
+            seq, view = ring.begin_write()
+            view[:] = img
+            ring.commit(seq, source.timestamp())
+            written[seq] = img
+            if seq % read_every:
+                continue
+
+            latest = ring.latest(after=last_read)
+            if latest is None or latest[0] != seq:
+                failures.append(f"seq {seq}: latest() returned {latest and latest[0]}")
+            elif not np.array_equal(latest[1], img) or latest[2] != source.timestamp():
+                failures.append(f"seq {seq}: frame or timestamp differs from what was written")
+            elif ring.latest(after=seq) is not None:
+                failures.append(f"seq {seq}: latest(after={seq}) returned a frame")
+            if seq > slots and ring.still_valid(seq - slots):
+                failures.append(f"seq {seq - slots} still valid after its slot was reused")
+            last_read = seq
+
+        if ring is not None and not failures:
+            seq, view = ring.begin_write()
+            if ring.latest(after=seq - 1) is not None:
+                failures.append("an uncommitted slot was returned")
+    finally:
+        source.release()
+        if ring is not None:
+            ring.close()
+    return failures
+
+
+def run_checks(recording):
+    """Name -> failure messages for each stateful component, driven by a recording"""
+    frames = replay_gestures(recording)
+    return {
+        "gesture_window": check_gesture_window([raw for raw, _, _ in frames]),
+        "histogram": check_histogram([seconds for _, _, seconds in frames]),
+        "dispatcher": check_dispatcher([smoothed for _, smoothed, _ in frames]),
+        "circuit_breaker": check_breaker(),
+        "frame_ring": check_frame_ring(recording),
+    }
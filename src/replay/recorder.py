@@ -0,0 +1,101 @@
+import argparse
+import json
+import os
+import time
+import cv2
+from src.config.settings import CAMERA_INDEX, TARGET_FPS
+
+FRAMES_FILE = "frames.avi"
+LANDMARKS_FILE = "landmarks.jsonl"
+
+
+def serialize_results(results):
+    """Convert MediaPipe hand results to plain lists for the landmarks file"""
+    hands = []
+    if results is not None and results.multi_hand_landmarks:
+        for i, hand_landmarks in enumerate(results.multi_hand_landmarks):
+            hand = {
+                "points": [[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark],
+                "handedness": "Right",
+                "score": 1.0,
+            }
+            if results.multi_handedness and len(results.multi_handedness) > i:
+                classification = results.multi_handedness[i].classification[0]
+                hand["handedness"] = classification.label
+                hand["score"] = classification.score
+            hands.append(hand)
+    return hands
+
+
+class SessionRecorder:
+    """Saves raw frames to a video file plus per-frame landmarks and timestamps
+
+    A recording is a directory holding `frames.avi` and `landmarks.jsonl`
+    (one JSON object per frame, in the same order as the video).
+    """
+
+    def __init__(self, path, fps=TARGET_FPS):
+        self.path = path
+        self.fps = fps
+        os.makedirs(path, exist_ok=True)
+        self.writer = None
+        self.landmarks_file = open(os.path.join(path, LANDMARKS_FILE), "w")
+        self.frame_count = 0
+
+    def write(self, img, results=None, timestamp=None):
+        """Record one unannotated frame and the detector results for it"""
+        if self.writer is None:
+            h, w = img.shape[:2]
+            self.writer = cv2.VideoWriter(os.path.join(self.path, FRAMES_FILE),
+                                          cv2.VideoWriter_fourcc(*'MJPG'), self.fps, (w, h))
+        self.writer.write(img)
+        record = {
+            "frame": self.frame_count,
+            "t": timestamp if timestamp is not None else time.time(),
+            "size": list(img.shape[:2]),
+            "hands": serialize_results(results),
+        }
+        self.landmarks_file.write(json.dumps(record) + "\n")
+        self.frame_count += 1
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+        self.landmarks_file.close()
+
+
+def record(path, seconds, camera_index=CAMERA_INDEX):
+    """Record from the camera, running the detector so landmarks are saved with each frame"""
+    from src.gestures.detector import HandGestureDetector
+
+    from src.camera.sources import CameraSource
+
+    # Unthreaded: a recording wants every frame, not just the newest
+    cap = CameraSource(camera_index)
+    # Every frame needs landmarks, so never skip inference while recording; keep both hands
+    # so a recording can be replayed with or without two-hand features
+    detector = HandGestureDetector(idle_mode=False, max_hands=2)
+    recorder = SessionRecorder(path)
+    start = time.time()
+    try:
+        while time.time() - start < seconds:
+            success, img = cap.read()
+            if not success:
+                print("Failed to capture image from camera")
+                break
+            timestamp = time.time()
+            detector.find_hands(img, draw=False)
+            recorder.write(img, detector.results, timestamp)
+    finally:
+        recorder.close()
+        cap.release()
+    print(f"Recorded {recorder.frame_count} frames to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record camera frames and hand landmarks for replay")
+    parser.add_argument("output", help="Directory to write the recording to")
+    parser.add_argument("--seconds", type=float, default=30, help="Length of the recording")
+    parser.add_argument("--camera", type=int, default=CAMERA_INDEX, help="Camera index")
+    args = parser.parse_args()
+    record(args.output, args.seconds, args.camera)
@@ -0,0 +1,101 @@
+import json
+import os
+from types import SimpleNamespace
+import cv2
+from src.camera.sources import FrameSource
+from src.replay.recorder import FRAMES_FILE, LANDMARKS_FILE
+
+
+def _to_results(hands):
+    """Rebuild an object shaped like MediaPipe's hand results from recorded hands"""
+    if not hands:
+        return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+    landmarks = []
+    handedness = []
+    for hand in hands:
+        landmarks.append(SimpleNamespace(
+            landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in hand["points"]]))
+        handedness.append(SimpleNamespace(
+            classification=[SimpleNamespace(label=hand["handedness"], score=hand["score"])]))
+    return SimpleNamespace(multi_hand_landmarks=landmarks, multi_handedness=handedness)
+
+
+class Recording:
+    """A recording made by SessionRecorder, loaded for replay"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, LANDMARKS_FILE)) as f:
+            self.frames = [json.loads(line) for line in f if line.strip()]
+        self.video_path = os.path.join(path, FRAMES_FILE)
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def timestamps(self):
+        return [frame["t"] for frame in self.frames]
+
+    def results(self):
+        """MediaPipe-shaped results for every frame, in order"""
+        return [_to_results(frame["hands"]) for frame in self.frames]
+
+
+class ReplayHands:
+    """Stand-in for `mp.solutions.hands.Hands` that returns recorded results in order
+
+    Passed to HandGestureDetector(hands=...) it makes find_hands()/find_landmarks()/
+    get_gesture() fully deterministic, with no camera or model involved.
+    """
+
+    def __init__(self, recording, loop=False):
+        self._results = recording.results()
+        self._loop = loop
+        self._index = 0
+
+    def process(self, img_rgb):
+        if self._index >= len(self._results):
+            if not self._loop:
+                return _to_results(None)
+            self._index = 0
+        result = self._results[self._index]
+        self._index += 1
+        return result
+
+    def close(self):
+        pass
+
+
+class ReplaySource(FrameSource):
+    """Reads frames back from a recording as a FrameSource"""
+
+    def __init__(self, recording, loop=False, size=None):
+        super().__init__()
+        self.recording = recording
+        self.loop = loop
+        self.size = size  # Optional (width, height) to resize frames to
+        self.cap = cv2.VideoCapture(recording.video_path)
+        self.index = 0
+
+    def _grab(self):
+        success, img = self.cap.read()
+        if not success and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self.index = 0
+            success, img = self.cap.read()
+        if not success:
+            return None
+        if self.size is not None and (img.shape[1], img.shape[0]) != tuple(self.size):
+            img = cv2.resize(img, tuple(self.size), interpolation=cv2.INTER_AREA)
+        self.index += 1
+        return img
+
+    def timestamp(self):
+        """Recorded capture time of the frame most recently returned by read()/read_frame()"""
+        return self.recording.frames[self.index - 1]["t"]
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
@@ -0,0 +1,137 @@
+import threading
+import time
+from spotipy.cache_handler import CacheHandler, CacheFileHandler
+from spotipy.oauth2 import SpotifyOAuth
+from src.metrics.metrics import metrics, SPOTIFY_SECONDS, SPOTIFY_ERRORS
+from src.config.settings import TOKEN_CACHE_PATH, TOKEN_REFRESH_MARGIN, TOKEN_REFRESH_RETRY
+
+
+class MemoryTokenCache(CacheHandler):
+    """Keeps the OAuth token in memory and writes it to disk only when it changes
+
+    spotipy's file cache reads the token file on every API call; this one
+    reads it once and afterwards serves the token from memory.
+    """
+
+    def __init__(self, cache_path=TOKEN_CACHE_PATH):
+        self.disk = CacheFileHandler(cache_path=cache_path)
+        self._lock = threading.Lock()
+        self._token = self.disk.get_cached_token()
+        self.writes = 0
+
+    def get_cached_token(self):
+        return self._token
+
+    def save_token_to_cache(self, token_info):
+        with self._lock:
+            if token_info == self._token:
+                return
+            self._token = token_info
+            self.writes += 1
+            self.disk.save_token_to_cache(token_info)
+
+
+class ProactiveOAuth(SpotifyOAuth):
+    """SpotifyOAuth that refreshes the token before it expires instead of inside an API call
+
+    A background thread refreshes TOKEN_REFRESH_MARGIN seconds before
+    expiry, so commands find a valid token in memory. If a call does hit an
+    expired token anyway, concurrent callers wait on a single refresh
+    instead of each sending their own.
+    """
+
+    def __init__(self, *args, cache_handler=None, refresh_margin=TOKEN_REFRESH_MARGIN, **kwargs):
+        super().__init__(*args, cache_handler=cache_handler or MemoryTokenCache(), **kwargs)
+        self.refresh_margin = refresh_margin
+        self.refreshes = 0
+        self._refresh_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="spotify-token-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def get_access_token(self, code=None, as_dict=True, check_cache=True):
+        if code is None and check_cache:
+            token_info = self.current_token()
+            if token_info is not None:
+                return token_info if as_dict else token_info["access_token"]
+        # No usable token yet: the interactive authorization flow
+        token_info = super().get_access_token(code, as_dict, check_cache)
+        self._reschedule()
+        return token_info
+
+    def current_token(self):
+        """The cached token, refreshed first if it has expired; None if there is none for our scope"""
+        token_info = self.cache_handler.get_cached_token()
+        if token_info is None or "scope" not in token_info or not self._is_scope_subset(self.scope,
+                                                                                         token_info["scope"]):
+            return None
+        if self.is_token_expired(token_info):
+            return self.refresh(token_info)
+        return token_info
+
+    def refresh(self, stale):
+        """Refresh `stale`, unless another thread already replaced it while we waited for the lock"""
+        with self._refresh_lock:
+            current = self.cache_handler.get_cached_token()
+            if current is not None and current.get("expires_at", 0) > stale.get("expires_at", 0):
+                return current
+            start = time.perf_counter()
+            try:
+                token_info = self.refresh_access_token(stale["refresh_token"])
+            except Exception:
+                metrics.increment(SPOTIFY_ERRORS, endpoint="token_refresh")
+                raise
+            finally:
+                metrics.observe(SPOTIFY_SECONDS, time.perf_counter() - start, endpoint="token_refresh")
+            self.refreshes += 1
+        self._reschedule()
+        return token_info
+
+    def _reschedule(self):
+        with self._cond:
+            self._cond.notify()
+
+    def _refresh_delay(self):
+        """Seconds until the next proactive refresh, or None while there is no token"""
+        token_info = self.cache_handler.get_cached_token()
+        if not token_info or "expires_at" not in token_info:
+            return None
+        return token_info["expires_at"] - self.refresh_margin - time.time()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    delay = self._refresh_delay()
+                    if delay is not None and delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                if not self._running:
+                    return
+            try:
+                self.refresh(self.cache_handler.get_cached_token())
+            except Exception as e:
+                print(f"Error refreshing Spotify token, retrying in {TOKEN_REFRESH_RETRY}s: {e}")
+                with self._cond:
+                    self._cond.wait(TOKEN_REFRESH_RETRY)
+
+
+if __name__ == "__main__":
+    # The apps never prompt for a login, so this is how the token cache gets its first token
+    from src.spotify.client import SpotifyClient
+    SpotifyClient().login()
+    print(f"Logged in; token cached in {TOKEN_CACHE_PATH}")
@@ -1,90 +1,195 @@
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
-from src.config.settings import SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET, SPOTIFY_REDIRECT_URI
+import threading
+from src.spotify.state import PlaybackState
+from src.spotify.transport import SpotifyTransport, SpotifyResult
+from src.config.settings import (SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET, SPOTIFY_REDIRECT_URI, PLAYBACK_STATE_MAX_AGE,
+                                 SPOTIFY_TIMEOUTS, SPOTIFY_API_URL)
+
+
+def format_track(playback):
+    """Track info dict shown by the UIs, built from a playback response (None if nothing is playing)"""
+    if not playback or not playback.get('item'):
+        return None
+    track = playback['item']
+    artists = ", ".join([artist['name'] for artist in track['artists']])
+    return {
+        "id": track.get('id'),
+        "name": track['name'],
+        "artist": artists,
+        "album": track['album']['name'],
+        "cover_url": track['album']['images'][0]['url'] if track['album']['images'] else None,
+        "is_playing": playback['is_playing'],
+        "progress_ms": playback.get('progress_ms'),
+        "duration_ms": track.get('duration_ms'),
+    }
 
 class SpotifyClient:
-    def __init__(self):
+    """Spotify Web API commands for the controllers
+
+    Every call goes through a SpotifyTransport (pooled session, time budgets,
+    retries, circuit breaker). Commands return a SpotifyResult, which is
+    truthy on success and carries the error otherwise.
+    """
+
+    def __init__(self, transport=None, api_url=SPOTIFY_API_URL):
+        self.transport = transport or SpotifyTransport()
+        self.api_url = api_url  # Set to talk to another Web API, e.g. src/spotify/fake_api.py
         self.scope = "user-read-playback-state user-modify-playback-state user-read-currently-playing"
-        self.sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
+        self._sp = None
+        self.auth = None  # ProactiveOAuth once connected to the real API
+        self._connect_lock = threading.Lock()
+        
+        # Cached playback state so commands don't need a read before every write
+        self.state = PlaybackState()
+    
+    @property
+    def sp(self):
+        if self._sp is None:
+            self.connect()
+        return self._sp
+    
+    def connect(self):
+        """Create the authenticated spotipy client; safe to call from several threads"""
+        with self._connect_lock:
+            if self._sp is None:
+                # spotipy (and requests behind it) are only imported once Spotify is needed
+                import spotipy
+                # API calls and token refreshes share the transport's keep-alive pool; retries
+                # are left to the transport, which knows each endpoint's budget
+                session = self.transport.session
+                if self.api_url:
+                    # A stand-in API doesn't check tokens, so skip the OAuth flow
+                    auth = {"auth": "local"}
+                else:
+                    oauth = self._oauth()
+                    # connect() runs as a startup task, where a login prompt would hang it: without a
+                    # usable cached token it fails instead, and the startup phase reports that
+                    if oauth.current_token() is None:
+                        raise RuntimeError("No cached Spotify token; log in once with python -m src.spotify.auth")
+                    # The token lives in memory and is refreshed in the background before it expires
+                    self.auth = oauth.start()
+                    auth = {"auth_manager": self.auth}
+                sp = spotipy.Spotify(requests_session=session, requests_timeout=SPOTIFY_TIMEOUTS["default"],
+                                     retries=0, status_retries=0, **auth)
+                if self.api_url:
+                    sp.prefix = self.api_url.rstrip("/") + "/"
+                self._sp = sp
+        return self._sp
+    
+    def _oauth(self):
+        from src.spotify.auth import ProactiveOAuth
+        return ProactiveOAuth(
             client_id=SPOTIFY_CLIENT_ID,
             client_secret=SPOTIFY_CLIENT_SECRET,
             redirect_uri=SPOTIFY_REDIRECT_URI,
             scope=self.scope,
-            cache_path=".spotify_cache"
-        ))
-        
-    def play(self):
+            requests_session=self.transport.session,
+            requests_timeout=SPOTIFY_TIMEOUTS["default"]
+        )
+    
+    def login(self):
+        """Run the interactive authorization flow and cache the token for connect()"""
+        self._oauth().get_access_token(as_dict=False)
+    
+    def close(self):
+        """Stop the background token refresh"""
+        if self.auth is not None:
+            self.auth.stop()
+    
+    def _api(self, endpoint, *args, **kwargs):
+        """Call a spotipy endpoint through the transport and return its SpotifyResult"""
         try:
-            self.sp.start_playback()
-            return True
+            function = getattr(self.sp, endpoint)
         except Exception as e:
-            print(f"Error playing track: {e}")
-            return False
+            # Not connected (missing credentials, failed login...)
+            return SpotifyResult(endpoint, error=f"Spotify not connected: {e}", attempts=0, exception=e)
+        return self.transport.call(endpoint, function, *args, **kwargs)
+    
+    def fetch_playback(self):
+        """Read the full playback state and update the cache; raises on API errors"""
+        playback = self._api("current_playback").raise_for_error()
+        self.state.update_from_playback(playback)
+        return playback
+    
+    def refresh_state(self):
+        """Re-read the full playback state from Spotify"""
+        result = self._api("current_playback")
+        if result:
+            self.state.update_from_playback(result.value)
+        else:
+            self.state.invalidate()
+        return result
+    
+    def _ensure_state(self):
+        if not self.state.is_fresh(PLAYBACK_STATE_MAX_AGE):
+            result = self.refresh_state()
+            if not result:
+                return result
+        return SpotifyResult("current_playback", attempts=0)
+    
+    def _command(self, endpoint, *args, **changes):
+        """Send a player command and apply `changes` to the cached state if it succeeded"""
+        result = self._api(endpoint, *args)
+        if result:
+            self.state.apply(**changes)
+        else:
+            self.state.invalidate()
+        return result
+    
+    def play(self):
+        return self._command("start_playback", is_playing=True)
     
     def pause(self):
-        try:
-            self.sp.pause_playback()
-            return True
-        except Exception as e:
-            print(f"Error pausing track: {e}")
-            return False
+        return self._command("pause_playback", is_playing=False)
+    
+    def toggle_playback(self):
+        # Guessing from a stale state could send the opposite of what the user meant
+        result = self._ensure_state()
+        if not result:
+            return result
+        if self.state.is_playing:
+            return self.pause()
+        return self.play()
     
     def next_track(self):
-        try:
-            self.sp.next_track()
-            return True
-        except Exception as e:
-            print(f"Error skipping to next track: {e}")
-            return False
+        # The new track isn't known until the next refresh
+        return self._command("next_track", track=None, progress_ms=0, is_playing=True)
     
     def previous_track(self):
-        try:
-            self.sp.previous_track()
-            return True
-        except Exception as e:
-            print(f"Error going to previous track: {e}")
-            return False
+        return self._command("previous_track", track=None, progress_ms=0, is_playing=True)
+    
+    def set_volume(self, volume):
+        volume = max(0, min(100, int(volume)))
+        return self._command("volume", volume, volume=volume)
     
     def increase_volume(self, step=5):
-        try:
-            current_playback = self.sp.current_playback()
-            if current_playback and 'device' in current_playback:
-                current_volume = current_playback['device']['volume_percent']
-                new_volume = min(100, current_volume + step)
-                self.sp.volume(new_volume)
-                return True
-            return False
-        except Exception as e:
-            print(f"Error increasing volume: {e}")
-            return False
+        result = self._ensure_state()
+        if not result:
+            return result
+        if self.state.volume is None:
+            return SpotifyResult.failed("volume", "Active device has no volume control")
+        return self.set_volume(min(100, self.state.volume + step))
     
     def decrease_volume(self, step=5):
-        try:
-            current_playback = self.sp.current_playback()
-            if current_playback and 'device' in current_playback:
-                current_volume = current_playback['device']['volume_percent']
-                new_volume = max(0, current_volume - step)
-                self.sp.volume(new_volume)
-                return True
-            return False
-        except Exception as e:
-            print(f"Error decreasing volume: {e}")
-            return False
-            
+        result = self._ensure_state()
+        if not result:
+            return result
+        if self.state.volume is None:
+            return SpotifyResult.failed("volume", "Active device has no volume control")
+        return self.set_volume(max(0, self.state.volume - step))
+    
     def get_current_track(self):
-        try:
-            current = self.sp.currently_playing()
-            if current and current['item']:
-                track = current['item']
-                artists = ", ".join([artist['name'] for artist in track['artists']])
-                return {
-                    "name": track['name'],
-                    "artist": artists,
-                    "album": track['album']['name'],
-                    "cover_url": track['album']['images'][0]['url'] if track['album']['images'] else None,
-                    "is_playing": current['is_playing']
-                }
+        result = self._api("currently_playing")
+        current = result.value
+        if not result or not current or not current['item']:
             return None
-        except Exception as e:
-            print(f"Error getting current track: {e}")
-            return None
\ No newline at end of file
+        self.state.apply(track=current['item'], is_playing=current['is_playing'],
+                         progress_ms=current.get('progress_ms'))
+        return format_track(current)
+    
+    def get_next_track(self):
+        """First track waiting in the playback queue, as a track dict, or None"""
+        result = self._api("queue")
+        queue = result.value
+        if not result or not queue or not queue.get('queue'):
+            return None
+        return format_track({'item': queue['queue'][0], 'is_playing': False})
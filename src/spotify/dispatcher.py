@@ -0,0 +1,195 @@
+import queue
+import threading
+import time
+from src.metrics.metrics import metrics, COMMANDS
+from src.config.settings import VOLUME_STEP
+
+# Commands that set the playback state; they coalesce with each other
+PLAYBACK_COMMANDS = ("play", "pause", "toggle")
+
+# Commands that only change the volume (the track can't have changed after them)
+VOLUME_COMMANDS = ("volume", "set_volume")
+
+# Dispatcher command (and value) triggered by each gesture
+GESTURE_COMMANDS = {
+    "Play/Pause": ("toggle", None),
+    "Next Track": ("next", None),
+    "Previous Track": ("previous", None),
+    "Volume Up": ("volume", VOLUME_STEP),
+    "Volume Down": ("volume", -VOLUME_STEP),
+}
+
+
+class CommandDispatcher:
+    """Runs Spotify commands on a background worker so the frame loop never waits on the network
+
+    Callers submit intents; intents that are still pending when a new one
+    arrives are coalesced (volume steps are summed, opposing playback changes
+    collapse). Every executed command produces an event dict that is pushed to
+    the `events` queue and handed to any registered listeners.
+    """
+
+    def __init__(self, spotify):
+        self.spotify = spotify
+        self.events = queue.Queue()
+        self._listeners = []
+        self._pending = []
+        self._busy = False  # The worker is executing a batch
+        self._cond = threading.Condition()
+        self._running = True
+        self._worker = threading.Thread(target=self._run, name="spotify-dispatcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, command, value=None):
+        """Queue an intent: play, pause, toggle, next, previous, volume (value = delta %) or set_volume (value = %)"""
+        with self._cond:
+            self._coalesce(command, value)
+            self._cond.notify_all()
+
+    def add_listener(self, callback):
+        """Call `callback(event)` on the worker thread after every command"""
+        self._listeners.append(callback)
+
+    def drain_events(self):
+        """Return all events produced since the last call without blocking"""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def flush(self, timeout=None):
+        """Block until every submitted command has run; False if `timeout` passed first"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def stop(self, timeout=1.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._worker.join(timeout)
+
+    def _coalesce(self, command, value):
+        # Entries are [command, value, submitted_at]; a merged entry keeps its oldest submit time
+        now = time.perf_counter()
+        if command == "set_volume":
+            # An absolute volume makes every pending volume change irrelevant
+            self._pending = [entry for entry in self._pending if entry[0] not in VOLUME_COMMANDS]
+            self._pending.append([command, value, now])
+            return
+
+        if command == "volume":
+            for entry in self._pending:
+                if entry[0] == "volume":
+                    entry[1] += value
+                    if entry[1] == 0:
+                        self._pending.remove(entry)
+                    return
+                if entry[0] == "set_volume":
+                    entry[1] = max(0, min(100, entry[1] + value))
+                    return
+            if value:
+                self._pending.append(["volume", value, now])
+            return
+
+        if command in PLAYBACK_COMMANDS:
+            previous = next((entry for entry in reversed(self._pending) if entry[0] in PLAYBACK_COMMANDS), None)
+            if previous is not None:
+                self._pending.remove(previous)
+                if command == "toggle":
+                    if previous[0] == "toggle":
+                        # Two toggles cancel out
+                        return
+                    # play + toggle -> pause, pause + toggle -> play
+                    command = "pause" if previous[0] == "play" else "play"
+                # A later play/pause simply supersedes the earlier one
+
+        self._pending.append([command, value, now])
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._pending:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                batch, self._pending = self._pending, []
+                self._busy = True
+
+            for command, value, submitted_at in batch:
+                queued = time.perf_counter() - submitted_at
+                event = self._execute(command, value)
+                event["queued"] = queued  # Seconds the intent waited behind earlier commands
+                self._publish(event)
+
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _execute(self, command, value):
+        start = time.perf_counter()
+        error = None
+        try:
+            if command == "play":
+                ok = self.spotify.play()
+            elif command == "pause":
+                ok = self.spotify.pause()
+            elif command == "toggle":
+                ok = self.spotify.toggle_playback()
+            elif command == "next":
+                ok = self.spotify.next_track()
+            elif command == "previous":
+                ok = self.spotify.previous_track()
+            elif command == "set_volume":
+                ok = self.spotify.set_volume(value)
+            elif command == "volume":
+                if value > 0:
+                    ok = self.spotify.increase_volume(value)
+                else:
+                    ok = self.spotify.decrease_volume(-value)
+            else:
+                ok = False
+                error = f"Unknown command: {command}"
+        except Exception as e:
+            ok = False
+            error = str(e)
+        if not ok and error is None:
+            # SpotifyResult carries the reason the command failed
+            error = getattr(ok, "error", None)
+
+        return {
+            "command": command,
+            "value": value,
+            "ok": bool(ok),
+            "error": error,
+            "latency": time.perf_counter() - start,
+        }
+
+    def _publish(self, event):
+        metrics.increment(COMMANDS, command=event["command"], result="ok" if event["ok"] else "failed")
+        self.events.put(event)
+        for callback in self._listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Error in command listener: {e}")
+
+
+def describe_event(event):
+    """Human readable summary of a dispatcher event"""
+    if not event["ok"]:
+        reason = f": {event['error']}" if event["error"] else ""
+        return f"Command {event['command']} failed{reason}"
+    if event["command"] == "volume":
+        direction = "Increased" if event["value"] > 0 else "Decreased"
+        return f"{direction} volume by {abs(event['value'])}%"
+    if event["command"] == "set_volume":
+        return f"Set volume to {event['value']}%"
+    return {
+        "play": "Started playback",
+        "pause": "Paused playback",
+        "toggle": "Toggled playback",
+        "next": "Skipped to next track",
+        "previous": "Went to previous track",
+    }.get(event["command"], event["command"])
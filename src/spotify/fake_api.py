@@ -0,0 +1,292 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+# Status codes returned for injected server errors
+SERVER_ERRORS = (500, 502, 503)
+
+
+def default_tracks(count=10, duration_ms=200000):
+    """A looping playlist of made-up tracks"""
+    return [{
+        "id": f"fake{i:04d}",
+        "name": f"Fake Track {i + 1}",
+        "artists": [{"name": f"Fake Artist {i % 3 + 1}"}],
+        "album": {"name": f"Fake Album {i // 4 + 1}", "images": []},
+        "duration_ms": duration_ms,
+    } for i in range(count)]
+
+
+class FakePlayer:
+    """Player state behind the fake API: one device playing through a looping playlist
+
+    Progress advances with the clock while playing and rolls over into the
+    next track, so track changes happen on their own like on a real device.
+    """
+
+    def __init__(self, tracks=None, volume=50):
+        self.tracks = tracks or default_tracks()
+        self.index = 0
+        self.is_playing = False
+        self.volume = volume
+        self._position_ms = 0  # Progress at `_since`
+        self._since = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _progress(self):
+        if not self.is_playing:
+            return self._position_ms
+        return self._position_ms + int((time.monotonic() - self._since) * 1000)
+
+    def _advance(self):
+        """Roll over into the following tracks when the current one has played out"""
+        progress = self._progress()
+        while progress >= self.tracks[self.index]["duration_ms"]:
+            progress -= self.tracks[self.index]["duration_ms"]
+            self.index = (self.index + 1) % len(self.tracks)
+        self._seek(progress)
+
+    def _seek(self, position_ms):
+        self._position_ms = position_ms
+        self._since = time.monotonic()
+
+    def playback(self):
+        """Body of GET /me/player"""
+        with self._lock:
+            self._advance()
+            return {
+                "device": {"id": "fake-device", "name": "Fake Speaker", "type": "Speaker",
+                           "is_active": True, "volume_percent": self.volume},
+                "shuffle_state": False,
+                "repeat_state": "context",
+                "timestamp": int(time.time() * 1000),
+                "progress_ms": self._progress(),
+                "is_playing": self.is_playing,
+                "currently_playing_type": "track",
+                "item": self.tracks[self.index],
+            }
+
+    def currently_playing(self):
+        """Body of GET /me/player/currently-playing"""
+        playback = self.playback()
+        return {key: playback[key] for key in ("timestamp", "progress_ms", "is_playing", "item",
+                                               "currently_playing_type")}
+
+    def queue(self):
+        with self._lock:
+            self._advance()
+            upcoming = [self.tracks[(self.index + i) % len(self.tracks)] for i in range(1, 4)]
+            return {"currently_playing": self.tracks[self.index], "queue": upcoming}
+
+    def play(self):
+        with self._lock:
+            self._advance()
+            self._seek(self._progress())
+            self.is_playing = True
+
+    def pause(self):
+        """Returns False when already paused (Spotify answers 403 to that)"""
+        with self._lock:
+            if not self.is_playing:
+                return False
+            self._advance()
+            self._seek(self._progress())
+            self.is_playing = False
+            return True
+
+    def skip(self, step):
+        with self._lock:
+            self.index = (self.index + step) % len(self.tracks)
+            self._seek(0)
+            self.is_playing = True
+
+    def set_volume(self, volume):
+        with self._lock:
+            self.volume = volume
+
+
+class FakeSpotifyAPI:
+    """Local stand-in for the Spotify Web API player endpoints the client uses
+
+    Requests wait `latency` seconds (± uniform `jitter`), then fail with a
+    429 carrying `retry_after` with probability `rate_limit_rate`, or with a
+    5xx with probability `error_rate`; otherwise they act on a FakePlayer.
+    Point the app at `url` with SPOTIFY_API_URL. Authorization is not checked.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, rate_limit_rate=0.0, retry_after=1,
+                 error_rate=0.0, player=None, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.player = player or FakePlayer()
+        self.random = random.Random(seed)
+        self._stats_lock = threading.Lock()
+        self.requests = {}  # (method, path, status) -> count
+        self.server = ThreadingHTTPServer((host, port), FakeAPIHandler)
+        self.server.daemon_threads = True
+        self.server.api = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-spotify-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def record(self, method, path, status):
+        with self._stats_lock:
+            key = (method, path, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def stats(self):
+        """Request counts by status and by endpoint"""
+        with self._stats_lock:
+            requests = dict(self.requests)
+        by_status = {}
+        for (_, _, status), count in requests.items():
+            by_status[status] = by_status.get(status, 0) + count
+        return {
+            "requests": sum(requests.values()),
+            "by_status": by_status,
+            "by_endpoint": {f"{method} {path} {status}": count
+                            for (method, path, status), count in sorted(requests.items())},
+        }
+
+    def fault(self):
+        """Injected failure for the next request as (status, headers), or None"""
+        with self._stats_lock:
+            roll = self.random.random()
+            error = self.random.choice(SERVER_ERRORS)
+            delay = self.latency + self.random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if roll < self.rate_limit_rate:
+            return 429, {"Retry-After": str(self.retry_after)}
+        if roll < self.rate_limit_rate + self.error_rate:
+            return error, {}
+        return None
+
+    def handle(self, method, path, query):
+        """(status, body) for one request against the player"""
+        player = self.player
+        if method == "GET" and path == "/v1/me/player":
+            return 200, player.playback()
+        if method == "GET" and path == "/v1/me/player/currently-playing":
+            return 200, player.currently_playing()
+        if method == "GET" and path == "/v1/me/player/queue":
+            return 200, player.queue()
+        if method == "PUT" and path == "/v1/me/player/play":
+            player.play()
+            return 204, None
+        if method == "PUT" and path == "/v1/me/player/pause":
+            if not player.pause():
+                return 403, error_body(403, "Player command failed: Restriction violated", "UNKNOWN")
+            return 204, None
+        if method == "POST" and path == "/v1/me/player/next":
+            player.skip(1)
+            return 204, None
+        if method == "POST" and path == "/v1/me/player/previous":
+            player.skip(-1)
+            return 204, None
+        if method == "PUT" and path == "/v1/me/player/volume":
+            try:
+                volume = int(query["volume_percent"][0])
+            except (KeyError, ValueError):
+                volume = -1
+            if not 0 <= volume <= 100:
+                return 400, error_body(400, "Invalid volume_percent")
+            player.set_volume(volume)
+            return 204, None
+        return 404, error_body(404, "Service not found")
+
+
+def error_body(status, message, reason=None):
+    error = {"status": status, "message": message}
+    if reason:
+        error["reason"] = reason
+    return {"error": error}
+
+
+class FakeAPIHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so client connection pooling behaves as it does against the real API
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, method):
+        api = self.server.api
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        url = urlsplit(self.path)
+
+        headers = {}
+        fault = api.fault()
+        if fault is not None:
+            status, headers = fault
+            body = error_body(status, "API rate limit exceeded" if status == 429 else "Server error")
+        else:
+            status, body = api.handle(method, url.path, parse_qs(url.query))
+        api.record(method, url.path, status)
+
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if data:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._respond("GET")
+
+    def do_PUT(self):
+        self._respond("PUT")
+
+    def do_POST(self):
+        self._respond("POST")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake of the Spotify Web API player endpoints")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Uniform ± seconds around the latency")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with a 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 5xx")
+    parser.add_argument("--track-seconds", type=float, default=200, help="Length of every fake track")
+    args = parser.parse_args()
+
+    api = FakeSpotifyAPI(args.host, args.port, args.latency, args.jitter, args.rate_limit_rate, args.retry_after,
+                         args.error_rate, FakePlayer(default_tracks(duration_ms=int(args.track_seconds * 1000))))
+    print(f"Fake Spotify API listening on {api.url} (set SPOTIFY_API_URL={api.url})")
+    try:
+        api.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
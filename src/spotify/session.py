@@ -0,0 +1,36 @@
+import threading
+from contextlib import contextmanager
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class BudgetedSession(requests.Session):
+    """A keep-alive session whose request timeout can be narrowed per call and per thread
+
+    spotipy passes one fixed `requests_timeout` to every request; inside
+    `with session.timeout(...)` this thread's requests use the given timeout
+    instead, so each endpoint can run on its own budget.
+    """
+
+    def __init__(self, pool_size):
+        super().__init__()
+        self._local = threading.local()
+        # Retries are handled by SpotifyTransport, which knows the endpoint and its budget
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    @contextmanager
+    def timeout(self, timeout):
+        previous = getattr(self._local, "timeout", None)
+        self._local.timeout = timeout
+        try:
+            yield
+        finally:
+            self._local.timeout = previous
+
+    def request(self, method, url, **kwargs):
+        timeout = getattr(self._local, "timeout", None)
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return super().request(method, url, **kwargs)
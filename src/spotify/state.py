@@ -0,0 +1,69 @@
+import threading
+import time
+
+
+class PlaybackState:
+    """Local model of the Spotify player
+
+    Filled from `current_playback()` responses, updated optimistically after
+    every successful command and invalidated when a command fails, so most
+    commands can be computed locally and sent as a single write.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.volume = None
+        self.is_playing = None
+        self.device_id = None
+        self.device_name = None
+        self.track = None
+        self.progress_ms = None
+        self.updated_at = 0
+        self.valid = False
+
+    def update_from_playback(self, playback):
+        """Replace the model with a `current_playback()` / `currently_playing()` response"""
+        with self._lock:
+            if not playback:
+                # Nothing is active on the account
+                self.is_playing = False
+                self.track = None
+                self.progress_ms = None
+            else:
+                device = playback.get('device')
+                if device:
+                    self.volume = device.get('volume_percent')
+                    self.device_id = device.get('id')
+                    self.device_name = device.get('name')
+                self.is_playing = playback.get('is_playing', False)
+                self.track = playback.get('item')
+                self.progress_ms = playback.get('progress_ms')
+            self.updated_at = time.time()
+            self.valid = True
+
+    def apply(self, **changes):
+        """Optimistically record the effect of a command that just succeeded"""
+        with self._lock:
+            for name, value in changes.items():
+                setattr(self, name, value)
+            self.updated_at = time.time()
+
+    def invalidate(self):
+        with self._lock:
+            self.valid = False
+
+    def is_fresh(self, max_age):
+        return self.valid and time.time() - self.updated_at <= max_age
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "volume": self.volume,
+                "is_playing": self.is_playing,
+                "device_id": self.device_id,
+                "device_name": self.device_name,
+                "track": self.track,
+                "progress_ms": self.progress_ms,
+                "updated_at": self.updated_at,
+                "valid": self.valid,
+            }
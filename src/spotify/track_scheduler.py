@@ -0,0 +1,127 @@
+import threading
+import time
+from src.spotify.client import format_track
+from src.spotify.transport import retry_after, CircuitOpenError
+from src.config.settings import (TRACK_POLL_INTERVAL, TRACK_BOUNDARY_MARGIN, TRACK_PAUSED_MAX_INTERVAL,
+                                 TRACK_ERROR_MAX_INTERVAL, TRACK_COMMAND_REFRESH_DELAY)
+
+
+class TrackScheduler:
+    """Keeps the current track up to date from a background thread
+
+    Instead of polling on a fixed beat from the frame loop, the next poll is
+    predicted from the playback position so it lands just after the current
+    track ends. While paused (or with nothing playing) the interval backs
+    off, `poke()` forces a refresh shortly after a command, and a 429
+    response holds all polls until its Retry-After has passed.
+    """
+
+    def __init__(self, spotify, on_change=None):
+        self.spotify = spotify
+        self.on_change = on_change  # Called with the new track dict whenever it changes
+        self.current_track = None
+        self.polls = 0
+        self.rate_limited = 0
+        self._paused_interval = TRACK_POLL_INTERVAL
+        self._error_interval = TRACK_POLL_INTERVAL
+        self._next_poll = 0  # Monotonic time of the next scheduled poll
+        self._hold_until = 0  # No polls before this time (Retry-After)
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="spotify-track-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def poke(self, delay=TRACK_COMMAND_REFRESH_DELAY):
+        """Refresh within `delay` seconds, e.g. after a command changed the player"""
+        with self._cond:
+            self._next_poll = min(self._next_poll, time.monotonic() + delay)
+            self._paused_interval = TRACK_POLL_INTERVAL
+            self._cond.notify()
+
+    def next_delay(self, playback):
+        """Seconds until the next poll after a successful read"""
+        self._error_interval = TRACK_POLL_INTERVAL
+        if not playback or not playback.get('is_playing') or not playback.get('item'):
+            # Nothing will change on its own while paused, so poll less and less often
+            delay = self._paused_interval
+            self._paused_interval = min(self._paused_interval * 2, TRACK_PAUSED_MAX_INTERVAL)
+            return delay
+
+        self._paused_interval = TRACK_POLL_INTERVAL
+        progress = playback.get('progress_ms')
+        duration = playback['item'].get('duration_ms')
+        if progress is None or not duration:
+            return TRACK_POLL_INTERVAL
+        remaining = max(0, duration - progress) / 1000
+        return min(TRACK_POLL_INTERVAL, remaining + TRACK_BOUNDARY_MARGIN)
+
+    def _poll(self):
+        """Read the playback state once and return the delay before the next poll"""
+        self.polls += 1
+        try:
+            playback = self.spotify.fetch_playback()
+        except Exception as e:
+            wait = retry_after(e)
+            if wait is not None:
+                self.rate_limited += 1
+                self._hold_until = time.monotonic() + wait
+                print(f"Spotify rate limit hit, pausing track updates for {wait:.1f}s")
+                return wait
+            if isinstance(e, CircuitOpenError):
+                # The transport already knows when the API is worth trying again
+                return max(e.retry_in or 0.0, TRACK_COMMAND_REFRESH_DELAY)
+            print(f"Error getting current track: {e}")
+            self.spotify.state.invalidate()
+            delay = self._error_interval
+            self._error_interval = min(self._error_interval * 2, TRACK_ERROR_MAX_INTERVAL)
+            return delay
+
+        track = format_track(playback)
+        changed = self._changed(track)
+        self.current_track = track
+        # Progress moves on every poll, so listeners only hear about real changes
+        if changed and self.on_change is not None:
+            try:
+                self.on_change(track)
+            except Exception as e:
+                print(f"Error in track listener: {e}")
+        return self.next_delay(playback)
+
+    def _changed(self, track):
+        """Whether anything besides the playback position differs from the current track"""
+        previous = self.current_track
+        if track is None or previous is None:
+            return track is not previous
+        return any(track[key] != previous[key] for key in track if key != "progress_ms")
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    now = time.monotonic()
+                    due = max(self._next_poll, self._hold_until)
+                    if now >= due:
+                        break
+                    self._cond.wait(due - now)
+                if not self._running:
+                    return
+                # Far in the future until this poll decides otherwise; a poke can still pull it in
+                self._next_poll = float('inf')
+
+            delay = self._poll()
+            with self._cond:
+                self._next_poll = min(self._next_poll, time.monotonic() + delay)
@@ -0,0 +1,242 @@
+import random
+import threading
+import time
+from src.metrics.metrics import metrics, SPOTIFY_SECONDS, SPOTIFY_ERRORS, SPOTIFY_RETRIES
+from src.config.settings import (SPOTIFY_POOL_SIZE, SPOTIFY_CONNECT_TIMEOUT, SPOTIFY_TIMEOUTS, SPOTIFY_MAX_RETRIES,
+                                 SPOTIFY_BACKOFF_BASE, SPOTIFY_BACKOFF_MAX, SPOTIFY_BREAKER_FAILURES,
+                                 SPOTIFY_BREAKER_RESET)
+
+# Endpoints that must not be repeated once the request may have reached Spotify
+NON_IDEMPOTENT = ("next_track", "previous_track")
+
+
+class CircuitOpenError(Exception):
+    """Raised in place of a request while the circuit breaker is open"""
+
+    def __init__(self, retry_in):
+        if retry_in is None:
+            super().__init__("Spotify API unavailable, waiting on a trial request")
+        else:
+            super().__init__(f"Spotify API unavailable, retrying in {retry_in:.1f}s")
+        self.retry_in = retry_in  # None while half-open: a trial call is already in flight
+
+
+class SpotifyResult:
+    """Outcome of one Web API call; truthy when it succeeded
+
+    `value` is the response on success. On failure `error` describes what
+    went wrong, `status` is the HTTP status if there was one and `exception`
+    is the final exception raised.
+    """
+
+    __slots__ = ("endpoint", "value", "error", "status", "attempts", "exception")
+
+    def __init__(self, endpoint, value=None, error=None, status=None, attempts=1, exception=None):
+        self.endpoint = endpoint
+        self.value = value
+        self.error = error
+        self.status = status
+        self.attempts = attempts
+        self.exception = exception
+
+    @classmethod
+    def failed(cls, endpoint, error):
+        return cls(endpoint, error=error, attempts=0)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __bool__(self):
+        return self.ok
+
+    def raise_for_error(self):
+        if self.exception is not None:
+            raise self.exception
+        if self.error is not None:
+            raise RuntimeError(self.error)
+        return self.value
+
+    def __repr__(self):
+        if self.ok:
+            return f"SpotifyResult({self.endpoint}, ok, attempts={self.attempts})"
+        return f"SpotifyResult({self.endpoint}, error={self.error!r}, status={self.status}, attempts={self.attempts})"
+
+
+def retry_after(error):
+    """Seconds requested by a 429 response's Retry-After header, or None for other errors"""
+    if getattr(error, 'http_status', None) != 429:
+        return None
+    headers = getattr(error, 'headers', None) or {}
+    try:
+        return max(0.0, float(headers.get('Retry-After', headers.get('retry-after', 1))))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def describe_error(error):
+    """Short message for an API error: spotipy's message without the request URL"""
+    status = getattr(error, 'http_status', None)
+    if status is not None:
+        message = (getattr(error, 'msg', '') or '').splitlines()
+        detail = message[-1].strip() if message else ''
+        return f"HTTP {status}: {detail if detail and detail != 'None' else 'request failed'}"
+    import requests
+    if isinstance(error, requests.exceptions.Timeout):
+        return "Request timed out"
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return "Could not connect to Spotify"
+    return f"{type(error).__name__}: {error}"
+
+
+def is_degraded(error):
+    """Whether an error says the API itself is struggling (as opposed to a bad request)"""
+    status = getattr(error, 'http_status', None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return True
+
+
+def is_retryable(error, idempotent=True):
+    status = getattr(error, 'http_status', None)
+    if status is not None:
+        return status == 429 or (idempotent and status >= 500)
+    import requests
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        # The request never left, so even a skip is safe to repeat
+        return True
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return idempotent
+    return False
+
+
+class CircuitBreaker:
+    """Fails requests fast while the API keeps failing
+
+    After `threshold` consecutive failed calls the breaker opens and every
+    call is refused for `reset_timeout` seconds. Then a single trial call is
+    let through: success closes the breaker, failure opens it again. A call
+    counts once however many attempts it made.
+    """
+
+    def __init__(self, threshold=SPOTIFY_BREAKER_FAILURES, reset_timeout=SPOTIFY_BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._trial = False
+            if self.state == "half_open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def retry_in(self):
+        """Seconds until a trial call is let through; None while half-open, when one already has been"""
+        with self._lock:
+            if self.state != "open":
+                return None
+            return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.threshold:
+                if self.state != "open":
+                    print(f"Spotify API failing, pausing requests for {self.reset_timeout}s")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class SpotifyTransport:
+    """Runs Web API calls on a pooled keep-alive session within per-endpoint time budgets
+
+    Each call gets the budget from SPOTIFY_TIMEOUTS (the "default" entry for
+    unlisted endpoints), covering every attempt and the waits between them.
+    Failed attempts are retried with jittered exponential backoff, or after
+    the Retry-After of a 429, as long as the budget allows; skips are only
+    repeated when the request never reached Spotify. A circuit breaker
+    refuses calls while the API is degraded; it sees each call's final
+    outcome, not every attempt.
+    """
+
+    def __init__(self, pool_size=SPOTIFY_POOL_SIZE, timeouts=SPOTIFY_TIMEOUTS, max_retries=SPOTIFY_MAX_RETRIES,
+                 connect_timeout=SPOTIFY_CONNECT_TIMEOUT, breaker=None):
+        self.pool_size = pool_size
+        self.timeouts = timeouts
+        self.max_retries = max_retries
+        self.connect_timeout = connect_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The shared session, created on first use (requests is only imported once Spotify is needed)"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    from src.spotify.session import BudgetedSession
+                    self._session = BudgetedSession(self.pool_size)
+        return self._session
+
+    def budget(self, endpoint):
+        return self.timeouts.get(endpoint, self.timeouts["default"])
+
+    def backoff(self, attempt):
+        """Full jitter: anywhere up to the exponential delay for this attempt"""
+        return random.uniform(0, min(SPOTIFY_BACKOFF_MAX, SPOTIFY_BACKOFF_BASE * 2 ** (attempt - 1)))
+
+    def call(self, endpoint, function, *args, **kwargs):
+        """Call `function(*args, **kwargs)` for `endpoint` and return a SpotifyResult; never raises"""
+        deadline = time.monotonic() + self.budget(endpoint)
+        idempotent = endpoint not in NON_IDEMPOTENT
+        if not self.breaker.allow():
+            error = CircuitOpenError(self.breaker.retry_in())
+            return SpotifyResult(endpoint, error=str(error), attempts=0, exception=error)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = max(0.01, deadline - time.monotonic())
+            start = time.perf_counter()
+            try:
+                with self.session.timeout((min(self.connect_timeout, remaining), remaining)):
+                    value = function(*args, **kwargs)
+            except Exception as e:
+                metrics.observe(SPOTIFY_SECONDS, time.perf_counter() - start, endpoint=endpoint)
+                metrics.increment(SPOTIFY_ERRORS, endpoint=endpoint)
+
+                wait = retry_after(e)
+                if wait is None:
+                    wait = self.backoff(attempt)
+                if (attempt > self.max_retries or not is_retryable(e, idempotent)
+                        or time.monotonic() + wait >= deadline):
+                    if is_degraded(e):
+                        self.breaker.record_failure()
+                    else:
+                        # The API answered; the request itself was wrong (no device, bad scope...)
+                        self.breaker.record_success()
+                    return SpotifyResult(endpoint, error=describe_error(e), status=getattr(e, 'http_status', None),
+                                         attempts=attempt, exception=e)
+                metrics.increment(SPOTIFY_RETRIES, endpoint=endpoint)
+                time.sleep(wait)
+                continue
+
+            metrics.observe(SPOTIFY_SECONDS, time.perf_counter() - start, endpoint=endpoint)
+            self.breaker.record_success()
+            return SpotifyResult(endpoint, value, attempts=attempt)
@@ -0,0 +1,79 @@
+import threading
+import time
+from src.config.settings import VOLUME_WRITE_INTERVAL, VOLUME_DEADBAND
+
+
+class VolumeWriter:
+    """Turns a continuously changing volume target into a few rate-limited writes
+
+    The frame loop calls `set_target()` every frame while the volume dial is
+    held. A worker thread submits only the newest target to the dispatcher,
+    at most once per `interval` and only when it differs from the last
+    written volume by at least `deadband` points, so jitter and intermediate
+    values are never sent. Calling `release()` when the dial is let go writes
+    the final position even if it is within the deadband.
+    """
+
+    def __init__(self, dispatcher, interval=VOLUME_WRITE_INTERVAL, deadband=VOLUME_DEADBAND):
+        self.dispatcher = dispatcher
+        self.interval = interval
+        self.deadband = deadband
+        self.writes = 0
+        self._target = None
+        self._written = None
+        self._final = False  # The dial was let go; write the target whatever the deadband
+        self._last_write = 0
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="volume-writer", daemon=True)
+        self._thread.start()
+
+    def set_target(self, volume):
+        with self._cond:
+            if self._written is None:
+                # Start from the player's volume so a dial held still doesn't write anything
+                self._written = self.dispatcher.spotify.state.volume
+            self._target = int(round(volume))
+            self._final = False
+            self._cond.notify()
+
+    def release(self):
+        """The dial was let go: make sure its last target gets written"""
+        with self._cond:
+            if self._target is not None and self._target != self._written:
+                self._final = True
+                self._cond.notify()
+
+    def stop(self, timeout=1.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _due(self):
+        if self._target is None:
+            return False
+        if self._written is None or self._final:
+            return self._target != self._written
+        return abs(self._target - self._written) >= self.deadband
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    if self._due():
+                        wait = self._last_write + self.interval - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                if not self._running:
+                    return
+                volume = self._target
+                self._written = volume
+                self._final = False
+                self._last_write = time.monotonic()
+                self.writes += 1
+
+            self.dispatcher.submit("set_volume", volume)
@@ -0,0 +1,86 @@
+import threading
+import time
+
+
+class StartupOrchestrator:
+    """Runs independent startup tasks concurrently and reports their progress
+
+    Opening the camera, building the hand model and authenticating with
+    Spotify don't depend on each other, so each runs on its own thread.
+    Callers block only on the results they need next, and `status()`
+    exposes the readiness of every task for health checks.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tasks = {}  # Name -> task record, in start order
+        self.started_at = time.monotonic()
+
+    def run(self, name, target, *args):
+        """Start `target(*args)` on a background thread under `name`"""
+        task = {
+            "state": "running",
+            "started": time.monotonic(),
+            "finished": None,
+            "result": None,
+            "error": None,
+            "done": threading.Event(),
+        }
+        with self._lock:
+            self._tasks[name] = task
+
+        def runner():
+            try:
+                task["result"] = target(*args)
+                task["state"] = "done"
+            except Exception as e:
+                task["error"] = str(e)
+                task["state"] = "failed"
+                print(f"Startup task {name} failed: {e}")
+            task["finished"] = time.monotonic()
+            task["done"].set()
+
+        threading.Thread(target=runner, name=f"startup-{name}", daemon=True).start()
+        return self
+
+    def wait(self, name, timeout=None):
+        """Block until a task finishes and return its result; raises RuntimeError if it failed"""
+        task = self._tasks[name]
+        if not task["done"].wait(timeout):
+            raise RuntimeError(f"Startup task {name} did not finish in time")
+        if task["state"] == "failed":
+            raise RuntimeError(f"Startup task {name} failed: {task['error']}")
+        return task["result"]
+
+    @property
+    def phase(self):
+        """'starting' until every task has finished, then 'ready' or 'failed'"""
+        with self._lock:
+            states = [task["state"] for task in self._tasks.values()]
+        if not states or "running" in states:
+            return "starting"
+        return "failed" if "failed" in states else "ready"
+
+    def status(self):
+        now = time.monotonic()
+        with self._lock:
+            tasks = {
+                name: {
+                    "state": task["state"],
+                    "seconds": round((task["finished"] or now) - task["started"], 3),
+                    "error": task["error"],
+                }
+                for name, task in self._tasks.items()
+            }
+        phase = self.phase
+        return {
+            "phase": phase,
+            "ready": phase == "ready",
+            "uptime": round(now - self.started_at, 3),
+            "tasks": tasks,
+        }
+
+    def format_summary(self):
+        status = self.status()
+        tasks = ", ".join(f"{name} {task['state']} ({task['seconds']:.2f}s)" for name, task in status["tasks"].items())
+        return f"Startup {status['phase']} after {status['uptime']:.2f}s: {tasks}"
@@ -0,0 +1,114 @@
+import cv2
+import numpy as np
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+
+class Layer:
+    """A pre-rendered panel: a uniform background box plus the pixels of its text and border
+
+    The box is blended with a single weighted add over its ROI; text and
+    border pixels are kept as coordinate lists with their coverage, so only
+    those pixels are touched when compositing.
+    """
+
+    def __init__(self, box_size, background, background_alpha, drawn, color):
+        width, height = box_size
+        self.box_size = box_size
+        self.background_alpha = background_alpha
+        self.background = np.empty((height, width, 3), dtype=np.uint8)
+        self.background[:] = background
+        self.size = (drawn.shape[1], drawn.shape[0])
+
+        if background_alpha >= 1.0:
+            # Opaque box: bake the text into it so compositing is a plain copy
+            box_drawn = drawn[:height, :width]
+            coverage = (box_drawn.astype(np.float32) / 255.0)[..., None]
+            baked = self.background * (1.0 - coverage) + np.asarray(color, dtype=np.float32) * coverage
+            self.background = np.rint(baked).astype(np.uint8)
+            drawn = drawn.copy()
+            drawn[:height, :width] = 0
+
+        ys, xs = np.nonzero(drawn)
+        coverage = (drawn[ys, xs].astype(np.float32) / 255.0)[:, None]
+        self.ys = ys
+        self.xs = xs
+        self.keep = 1.0 - coverage
+        self.premultiplied = np.asarray(color, dtype=np.float32)[None, :] * coverage
+
+
+def render_panel(size, lines, font_scale=0.7, thickness=2, color=(255, 255, 255),
+                 background=(0, 0, 0), background_alpha=0.7, border=None):
+    """Rasterize a text panel once
+
+    `size` is the (width, height) of the background box and `lines` a list of
+    (text, (x, y)) with positions relative to the box. Text that runs past the
+    box is kept, as it would be when drawn straight onto the frame. A border,
+    if given, is drawn in the text color.
+    """
+    width, height = size
+    for text, (x, y) in lines:
+        (text_w, text_h), baseline = cv2.getTextSize(text, FONT, font_scale, thickness)
+        width = max(width, x + text_w + thickness)
+        height = max(height, y + baseline + thickness)
+
+    # Coverage mask of everything drawn on top of the background box
+    drawn = np.zeros((height, width), dtype=np.uint8)
+    if border is not None:
+        cv2.rectangle(drawn, (0, 0), (size[0] - 1, size[1] - 1), 255, 1)
+    for text, origin in lines:
+        cv2.putText(drawn, text, origin, FONT, font_scale, 255, thickness)
+
+    return Layer(size, background, background_alpha, drawn, color)
+
+
+class OverlayCompositor:
+    """Draws overlays from cached layers, touching only each layer's ROI
+
+    Each panel is identified by a key and re-rasterized only when its content
+    changes, so static panels are rendered once and dynamic ones only when
+    their text does.
+    """
+
+    def __init__(self):
+        self._layers = {}
+
+    def draw_panel(self, img, key, origin, size, lines, **style):
+        content = (tuple(lines), tuple(size), tuple(sorted(style.items())))
+        cached = self._layers.get(key)
+        if cached is None or cached[0] != content:
+            cached = (content, render_panel(size, lines, **style))
+            self._layers[key] = cached
+        self.blend(img, cached[1], origin)
+        return img
+
+    @staticmethod
+    def blend(img, layer, origin):
+        x, y = origin
+        frame_h, frame_w = img.shape[:2]
+
+        # Background box, clipped to the frame
+        box_w, box_h = layer.box_size
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(frame_w, x + box_w), min(frame_h, y + box_h)
+        if x0 < x1 and y0 < y1 and layer.background_alpha > 0:
+            roi = img[y0:y1, x0:x1]
+            background = layer.background[y0 - y:y1 - y, x0 - x:x1 - x]
+            if layer.background_alpha >= 1.0:
+                roi[:] = background
+            else:
+                cv2.addWeighted(background, layer.background_alpha, roi, 1 - layer.background_alpha, 0, dst=roi)
+
+        # Text and border pixels
+        ys, xs = layer.ys + y, layer.xs + x
+        keep, premultiplied = layer.keep, layer.premultiplied
+        layer_w, layer_h = layer.size
+        if x < 0 or y < 0 or x + layer_w > frame_w or y + layer_h > frame_h:
+            inside = (ys >= 0) & (ys < frame_h) & (xs >= 0) & (xs < frame_w)
+            ys, xs, keep, premultiplied = ys[inside], xs[inside], keep[inside], premultiplied[inside]
+        pixels = img[ys, xs] * keep + premultiplied
+        img[ys, xs] = np.rint(pixels).astype(np.uint8)
+        return img
+
+    def clear(self):
+        self._layers.clear()
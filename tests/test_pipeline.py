@@ -0,0 +1,74 @@
+import time
+import numpy as np
+from src.camera.sources import FrameSource, SyntheticSource
+from src.pipeline.pipeline import GesturePipeline
+
+
+class FailingDetector:
+    def find_hands(self, img, draw=True):
+        raise ValueError("model crashed")
+
+
+class PassthroughDetector:
+    def find_hands(self, img, draw=True):
+        return img
+
+    def find_all_landmarks(self):
+        return []
+
+    def get_hands_gesture(self, hands):
+        return "No Hand"
+
+
+class FailingSource(FrameSource):
+    def _grab(self):
+        raise OSError("camera unplugged")
+
+
+def wait_until_dead(pipeline, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while pipeline.alive and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_inference_exception_ends_the_pipeline():
+    pipeline = GesturePipeline(SyntheticSource(fps=0), FailingDetector(), draw=False).start()
+    try:
+        start = time.monotonic()
+        assert pipeline.get_result(timeout=5.0) is None
+        # Woken by the failure, not by the timeout
+        assert time.monotonic() - start < 1.0
+        assert "inference" in pipeline.error and "model crashed" in pipeline.error
+        assert not pipeline.running
+        wait_until_dead(pipeline)
+        assert not pipeline.alive
+    finally:
+        pipeline.stop()
+
+
+def test_capture_exception_ends_the_pipeline():
+    pipeline = GesturePipeline(FailingSource(), PassthroughDetector(), draw=False).start()
+    try:
+        assert pipeline.get_result(timeout=5.0) is None
+        assert "capture" in pipeline.error and "camera unplugged" in pipeline.error
+        assert not pipeline.running
+        wait_until_dead(pipeline)
+        assert not pipeline.alive
+    finally:
+        pipeline.stop()
+
+
+def test_results_flow_until_the_source_ends():
+    pipeline = GesturePipeline(SyntheticSource(width=64, height=48, fps=0, frames=5), PassthroughDetector(),
+                               draw=False).start()
+    try:
+        results = []
+        while True:
+            result = pipeline.get_result(timeout=2.0)
+            if result is None:
+                break
+            results.append(result)
+        assert results and all(isinstance(result["img"], np.ndarray) for result in results)
+        assert pipeline.error == "Failed to capture image from camera"
+    finally:
+        pipeline.stop()
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from src.gestures.landmarks import HandLandmarks, classify_hand
+from src.replay.checks import run_checks, check_dispatcher
+from src.replay.recorder import SessionRecorder
+from src.replay.replay import Recording
+from src.spotify.dispatcher import CommandDispatcher, GESTURE_COMMANDS
+
+WIDTH, HEIGHT = 320, 240
+FPS = 30
+
+
+def find_poses(gestures, seed=0):
+    """Random landmark sets that classify as each of `gestures`"""
+    rng = np.random.default_rng(seed)
+    poses = {}
+    while len(poses) < len(gestures):
+        points = rng.random((21, 3)).astype(np.float32)
+        gesture = classify_hand(HandLandmarks(points, "Right", 1.0, WIDTH, HEIGHT))
+        if gesture in gestures:
+            poses.setdefault(gesture, points)
+    return poses
+
+
+def mediapipe_results(points):
+    if points is None:
+        return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+    landmarks = SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in points])
+    handedness = SimpleNamespace(classification=[SimpleNamespace(label="Right", score=0.95)])
+    return SimpleNamespace(multi_hand_landmarks=[landmarks], multi_handedness=[handedness])
+
+
+@pytest.fixture(scope="module")
+def recording(tmp_path_factory):
+    """A recording with every command gesture held for a while, separated by frames without a hand"""
+    path = str(tmp_path_factory.mktemp("recording"))
+    poses = find_poses(set(GESTURE_COMMANDS))
+    sequence = ["Play/Pause", "Volume Up", "Volume Up", "Next Track", "Volume Down", "Play/Pause",
+                "Previous Track", "Volume Up"]
+    recorder = SessionRecorder(path, fps=FPS)
+    t = 1000.0
+    frame = 0
+    for gesture in sequence:
+        for points in [poses[gesture]] * 15 + [None] * 10:
+            img = np.full((HEIGHT, WIDTH, 3), frame % 255, np.uint8)
+            recorder.write(img, mediapipe_results(points), t)
+            t += 1 / FPS
+            frame += 1
+    recorder.close()
+    return Recording(path)
+
+
+@pytest.fixture(scope="module")
+def results(recording):
+    return run_checks(recording)
+
+
+@pytest.mark.parametrize("name", ["gesture_window", "histogram", "dispatcher", "circuit_breaker", "frame_ring"])
+def test_check_passes(results, name):
+    assert results[name] == []
+
+
+def test_dispatcher_check_catches_broken_coalescing(monkeypatch):
+    coalesce = CommandDispatcher._coalesce
+
+    def overwrite_volume(self, command, value):
+        # Bug: a pending volume step is replaced instead of summed
+        for entry in self._pending:
+            if command == "volume" and entry[0] == "volume":
+                entry[1] = value
+                return
+        coalesce(self, command, value)
+
+    monkeypatch.setattr(CommandDispatcher, "_coalesce", overwrite_volume)
+    smoothed = []
+    for gesture in ["Next Track", "Volume Up", "Volume Up", "Volume Up"]:
+        smoothed += [gesture, "No Hand"]
+    assert check_dispatcher(smoothed)
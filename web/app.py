@@ -1,6 +1,5 @@
-from flask import Flask, render_template, Response, jsonify
-from flask_socketio import SocketIO
-import cv2
+from flask import Flask, render_template, Response, jsonify, request
+from flask_socketio import SocketIO, emit
 import threading
 import time
 import sys
@@ -10,48 +9,98 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.gestures.detector import HandGestureDetector
+from src.gestures.idle import IdleGovernor
 from src.spotify.client import SpotifyClient
-from src.config.settings import CAMERA_INDEX, VOLUME_STEP, TARGET_FPS
+from src.spotify.dispatcher import CommandDispatcher, describe_event, VOLUME_COMMANDS, GESTURE_COMMANDS
+from src.spotify.volume import VolumeWriter
+from src.gestures.landmarks import DIAL_GESTURE
+from src.spotify.track_scheduler import TrackScheduler
+from src.pipeline.pipeline import GesturePipeline
+from src.ui.overlay import OverlayCompositor
+from src.metrics.metrics import metrics, Timer, STAGE_SECONDS, FRAME_AGE
+from src.camera.sources import open_source
+from src.startup.orchestrator import StartupOrchestrator
+from src.pacing.frame_scheduler import FrameScheduler
+from web.broadcaster import FrameBroadcaster
+from web.publisher import StatePublisher
+from web.covers import CoverCache, etag_matches
+from src.config.settings import COVER_DISPLAY_SIZE, CAMERA_SOURCE, VOLUME_STEP, TARGET_FPS, PIPELINE_MODE, PIPELINE_REPORT_INTERVAL, VOLUME_MODE
 
 app = Flask(__name__)
 socketio = SocketIO(app, cors_allowed_origins="*")
 
 # Global variables
-frame_buffer = None
-frame_lock = threading.Lock()
-current_gesture = "No Gesture"
+frame_broadcaster = FrameBroadcaster()
+state_publisher = StatePublisher(socketio)
+cover_cache = CoverCache()
+startup = StartupOrchestrator()
+# Constructing the client is cheap; auth happens in the "spotify" startup task
 spotify_client = SpotifyClient()
+command_dispatcher = CommandDispatcher(spotify_client)
+volume_writer = VolumeWriter(command_dispatcher)
 current_track = None
 running = True
 
+def on_track_change(track):
+    """Push track changes found by the scheduler to web clients"""
+    global current_track
+    previous_id = current_track["id"] if current_track else None
+    if track and track["cover_url"]:
+        # Serve the cover through the caching proxy instead of Spotify's CDN
+        key = cover_cache.prefetch(track["cover_url"], COVER_DISPLAY_SIZE)
+        track = dict(track, cover=f"/cover/{key}?size={COVER_DISPLAY_SIZE}")
+    current_track = track
+    state_publisher.update(track=track)
+    
+    # Warm the cache with the next track's cover (runs on the scheduler thread)
+    if track and track["id"] != previous_id:
+        upcoming = spotify_client.get_next_track()
+        if upcoming and upcoming["cover_url"]:
+            cover_cache.prefetch(upcoming["cover_url"], COVER_DISPLAY_SIZE)
+
+def on_command_event(event):
+    """Log command results and schedule a track refresh"""
+    print(describe_event(event))
+    
+    # Re-read the track shortly after the action (runs on the dispatcher thread)
+    if event["command"] not in VOLUME_COMMANDS:
+        track_scheduler.poke()
+    state_publisher.update(last_action=describe_event(event))
+
+track_scheduler = TrackScheduler(spotify_client, on_change=on_track_change)
+command_dispatcher.add_listener(on_command_event)
+
+def open_camera():
+    """Open the frame source (runs as a startup task)"""
+    import logging
+    logging.info(f"Opening frame source {CAMERA_SOURCE}")
+    start_time = time.time()
+    # The pipeline's capture thread already reads continuously; only the sequential loop needs a grabber
+    cap = open_source(CAMERA_SOURCE, threaded=not PIPELINE_MODE)
+    logging.info(f"Opening the frame source took {time.time() - start_time:.2f} seconds")
+    
+    if not cap.isOpened():
+        logging.error(f"Failed to open frame source {CAMERA_SOURCE}")
+    return cap
+
+def create_detector():
+    """Build the hand model and run a warm-up inference (runs as a startup task)"""
+    import logging
+    logging.info("Initializing hand gesture detector")
+    detector_start_time = time.time()
+    detector = HandGestureDetector().warm_up()
+    logging.info(f"Detector initialization and warm-up took {time.time() - detector_start_time:.2f} seconds")
+    return detector
+
+def connect_spotify():
+    """Authenticate with Spotify and start track updates (runs as a startup task)"""
+    spotify_client.connect()
+    track_scheduler.start()
+
 class WebGestureController:
-    # In the WebGestureController.__init__ method, add these lines:
-    def __init__(self):
-        import logging
-        logging.info(f"Initializing camera with index {CAMERA_INDEX}")
-        start_time = time.time()
-        self.cap = cv2.VideoCapture(CAMERA_INDEX)
-        logging.info(f"Camera initialization took {time.time() - start_time:.2f} seconds")
-        
-        if not self.cap.isOpened():
-            logging.error(f"Failed to open camera with index {CAMERA_INDEX}")
-        else:
-            logging.info(f"Successfully opened camera with index {CAMERA_INDEX}")
-        
-        # Set camera properties for higher FPS
-        logging.info("Setting camera properties")
-        prop_start_time = time.time()
-        self.cap.set(cv2.CAP_PROP_FPS, TARGET_FPS)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
-        logging.info(f"Setting camera properties took {time.time() - prop_start_time:.2f} seconds")
-        
-        logging.info("Initializing hand gesture detector")
-        detector_start_time = time.time()
-        self.detector = HandGestureDetector()
-        logging.info(f"Detector initialization took {time.time() - detector_start_time:.2f} seconds")
-        
+    def __init__(self, cap, detector):
+        self.cap = cap
+        self.detector = detector
         self.prev_time = 0
         self.current_time = 0
         self.prev_gesture = None
@@ -60,131 +109,140 @@ class WebGestureController:
         self.frame_count = 0
         self.fps_update_interval = 10
         self.fps = 0
+        self.overlay = OverlayCompositor()
     
     def process_gesture(self, gesture):
-        global current_gesture, current_track
         current_time = time.time()
         
-        # Update the current gesture for the web interface
-        current_gesture = gesture
+        # The volume dial is continuous: no cooldown, the writer rate-limits the API calls
+        if gesture == DIAL_GESTURE:
+            if self.detector.volume_target is not None:
+                volume_writer.set_target(self.detector.volume_target)
+            self.prev_gesture = gesture
+            return
         
         # Check cooldown to prevent multiple triggers
         if current_time - self.last_action_time < self.gesture_cooldown:
             return
         
-        # Process different gestures
-        if gesture == "Play/Pause" and self.prev_gesture != "Play/Pause":
-            track = spotify_client.get_current_track()
-            if track and track['is_playing']:
-                spotify_client.pause()
-                print("Paused playback")
-            else:
-                spotify_client.play()
-                print("Started playback")
-            self.last_action_time = current_time
-            
-        elif gesture == "Next Track" and self.prev_gesture != "Next Track":
-            spotify_client.next_track()
-            print("Skipped to next track")
-            self.last_action_time = current_time
-            
-        elif gesture == "Previous Track" and self.prev_gesture != "Previous Track":
-            spotify_client.previous_track()
-            print("Went to previous track")
-            self.last_action_time = current_time
-            
-        elif gesture == "Volume Up" and self.prev_gesture != "Volume Up":
-            spotify_client.increase_volume(VOLUME_STEP)
-            print(f"Increased volume by {VOLUME_STEP}%")
-            self.last_action_time = current_time
-            
-        elif gesture == "Volume Down" and self.prev_gesture != "Volume Down":
-            spotify_client.decrease_volume(VOLUME_STEP)
-            print(f"Decreased volume by {VOLUME_STEP}%")
+        # Queue the command; the dispatcher talks to Spotify off the frame loop
+        if gesture in GESTURE_COMMANDS and self.prev_gesture != gesture:
+            command_dispatcher.submit(*GESTURE_COMMANDS[gesture])
             self.last_action_time = current_time
             
         self.prev_gesture = gesture
+    
+    def handle_frame(self, img, gesture):
+        """Act on the detected gesture and publish the annotated frame"""
+        # Process the detected gesture
+        # Letting go of the dial writes its final position, even within the deadband
+        if gesture != DIAL_GESTURE:
+            volume_writer.release()
+        if gesture != "No Hand" and gesture != "Unknown Gesture":
+            self.process_gesture(gesture)
+        
+        # Calculate and update FPS
+        self.current_time = time.time()
+        self.frame_count += 1
+        
+        if self.frame_count >= self.fps_update_interval:
+            self.fps = self.fps_update_interval / (self.current_time - self.prev_time) if (self.current_time - self.prev_time) > 0 else 0
+            self.prev_time = self.current_time
+            self.frame_count = 0
+        
+        label = gesture
+        if gesture == DIAL_GESTURE and self.detector.volume_target is not None:
+            label = f"{gesture} {int(self.detector.volume_target)}%"
+        
+        # Add FPS and gesture text to the image (re-rasterized only when the values change)
+        with Timer(STAGE_SECONDS, stage="overlay"):
+            self.overlay.draw_panel(img, "status", (10, 0), (0, 0), [
+                (f"FPS: {int(self.fps)}", (0, 30)),
+                (f"Gesture: {label}", (0, 60)),
+            ], font_scale=0.7, thickness=2, color=(0, 255, 0), background_alpha=0)
         
-        # Update track info after action
-        current_track = spotify_client.get_current_track()
+        # Encode once for all /video_feed clients (skipped when nobody is watching)
+        frame_broadcaster.publish_image(img)
+        
+        # Only changed values reach web clients, at a throttled rate
+        state_publisher.update(gesture=gesture, fps=int(self.fps))
     
     def run(self):
-        global frame_buffer, current_track, running
-        
+        if PIPELINE_MODE:
+            self.run_pipelined()
+        else:
+            self.run_sequential()
+    
+    def run_sequential(self):
+        import logging
+        # Frame rate control: perf_counter deadlines, adapted to what the loop can sustain
+        scheduler = FrameScheduler(TARGET_FPS)
+        last_report = time.time()
         try:
             while running:
-                # Calculate time for frame rate control
-                frame_start_time = time.time()
-                
-                success, img = self.cap.read()
-                if not success:
+                with Timer(STAGE_SECONDS, stage="capture"):
+                    frame = self.cap.read_frame()
+                if frame is None:
                     print("Failed to capture image from camera")
                     break
+                scheduler.begin()
                     
                 # Find hands and get landmarks
-                img = self.detector.find_hands(img)
-                landmark_list = self.detector.find_position(img)
+                img = self.detector.find_hands(frame.img)
+                hands = self.detector.find_all_landmarks()
                 
                 # Get gesture and process it
-                gesture = self.detector.get_gesture(landmark_list)
+                gesture = self.detector.get_hands_gesture(hands)
+                metrics.observe(FRAME_AGE, frame.age)
                 
-                # Update current track info periodically
-                if time.time() % 5 < 0.1:  # Update roughly every 5 seconds
-                    current_track = spotify_client.get_current_track()
-                    # Emit track info to web clients
-                    if current_track:
-                        socketio.emit('track_update', current_track)
+                self.handle_frame(img, gesture)
                 
-                # Process the detected gesture
-                if gesture != "No Hand" and gesture != "Unknown Gesture":
-                    self.process_gesture(gesture)
+                idle = self.detector.idle is not None and self.detector.idle.state == "idle"
+                scheduler.wait(idle=idle)
                 
-                # Calculate and update FPS
-                self.current_time = time.time()
-                self.frame_count += 1
+                if time.time() - last_report >= PIPELINE_REPORT_INTERVAL:
+                    logging.info(FrameScheduler.format_report(scheduler.report()))
+                    last_report = time.time()
                 
-                if self.frame_count >= self.fps_update_interval:
-                    self.fps = self.fps_update_interval / (self.current_time - self.prev_time) if (self.current_time - self.prev_time) > 0 else 0
-                    self.prev_time = self.current_time
-                    self.frame_count = 0
-                    # Emit FPS to web clients
-                    socketio.emit('fps_update', {'fps': int(self.fps)})
-                
-                # Add FPS and gesture text to the image
-                cv2.putText(img, f"FPS: {int(self.fps)}", (10, 30), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                cv2.putText(img, f"Gesture: {gesture}", (10, 60), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                
-                # Update the frame buffer with lock to prevent race conditions
-                _, buffer = cv2.imencode('.jpg', img)
-                with frame_lock:
-                    frame_buffer = buffer.tobytes()
+        finally:
+            self.cap.release()
+    
+    def run_pipelined(self):
+        """Capture and inference run on worker threads; this thread encodes and publishes"""
+        import logging
+        pipeline = GesturePipeline(self.cap, self.detector).start()
+        last_report = time.time()
+        try:
+            while running and pipeline.running:
+                result = pipeline.get_result(timeout=1.0)
+                if result is None:
+                    if pipeline.error or not pipeline.alive:
+                        logging.error(pipeline.error or "Pipeline stopped")
+                        break
+                    continue
                 
-                # Emit gesture update to web clients
-                socketio.emit('gesture_update', {'gesture': gesture})
+                render_start = time.perf_counter()
+                self.handle_frame(result["img"], result["gesture"])
+                pipeline.record_render(time.perf_counter() - render_start)
                 
-                # Control frame rate
-                frame_time = time.time() - frame_start_time
-                wait_time = max(0.001, (1.0/TARGET_FPS - frame_time))
-                time.sleep(wait_time)
+                if time.time() - last_report >= PIPELINE_REPORT_INTERVAL:
+                    logging.info(GesturePipeline.format_report(pipeline.report()))
+                    if self.detector.idle is not None:
+                        logging.info(IdleGovernor.format_report(self.detector.idle.report()))
+                    last_report = time.time()
                 
         finally:
+            pipeline.stop()
             self.cap.release()
 
 def generate_frames():
     """Generate frames for the video feed"""
-    while True:
-        with frame_lock:
-            if frame_buffer is not None:
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + frame_buffer + b'\r\n')
-        time.sleep(1/TARGET_FPS)  # Match the target FPS
+    return frame_broadcaster.stream()
 
 @app.route('/')
 def index():
     """Render the main page"""
-    return render_template('index.html')
+    return render_template('index.html', volume_mode=VOLUME_MODE)
 
 @app.route('/video_feed')
 def video_feed():
@@ -200,38 +258,62 @@ def get_track_info():
         return jsonify(current_track)
     return jsonify({"error": "No track playing"})
 
+@app.route('/cover/<cover_id>')
+def get_cover(cover_id):
+    """Cached, optionally resized album art for a cover id from the track info"""
+    size = request.args.get('size', type=int)
+    entry = cover_cache.get(cover_id, size)
+    if entry is None:
+        return jsonify({"error": "Unknown cover"}), 404
+    data, etag = entry
+    
+    # Cover ids are content hashes, so a given URL never changes
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        return Response(status=304, headers=headers)
+    return Response(data, mimetype='image/jpeg', headers=headers)
+
+@app.route('/health')
+def health_check():
+    """Liveness plus startup readiness: phase, and state and duration of each startup task"""
+    return jsonify(startup.status())
+
+@app.route('/metrics')
+def get_metrics():
+    """Latency histograms and counters in the Prometheus text format"""
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/get_gesture')
 def get_gesture():
     """Get current detected gesture"""
-    global current_gesture
-    return jsonify({"gesture": current_gesture})
+    return jsonify({"gesture": state_publisher.state["gesture"]})
+
+@app.route('/state')
+def get_state():
+    """Full UI state snapshot"""
+    return jsonify(state_publisher.snapshot())
 
 @app.route('/control/<action>')
 def control_spotify(action):
     """Control Spotify playback"""
-    if action == "play":
-        spotify_client.play()
-        return jsonify({"status": "success", "action": "play"})
-    elif action == "pause":
-        spotify_client.pause()
-        return jsonify({"status": "success", "action": "pause"})
-    elif action == "next":
-        spotify_client.next_track()
-        return jsonify({"status": "success", "action": "next"})
-    elif action == "previous":
-        spotify_client.previous_track()
-        return jsonify({"status": "success", "action": "previous"})
-    elif action == "volume_up":
-        spotify_client.increase_volume(VOLUME_STEP)
-        return jsonify({"status": "success", "action": "volume_up"})
-    elif action == "volume_down":
-        spotify_client.decrease_volume(VOLUME_STEP)
-        return jsonify({"status": "success", "action": "volume_down"})
+    commands = {
+        "play": ("play", None),
+        "pause": ("pause", None),
+        "next": ("next", None),
+        "previous": ("previous", None),
+        "volume_up": ("volume", VOLUME_STEP),
+        "volume_down": ("volume", -VOLUME_STEP),
+    }
+    if action in commands:
+        command_dispatcher.submit(*commands[action])
+        return jsonify({"status": "success", "action": action})
     return jsonify({"status": "error", "message": "Invalid action"})
 
 @socketio.on('connect')
 def handle_connect():
     print('Client connected')
+    # Resync the new (or reconnecting) client from the current snapshot
+    emit('state_snapshot', state_publisher.snapshot())
 
 @socketio.on('disconnect')
 def handle_disconnect():
@@ -255,7 +337,17 @@ def exit_application():
 
 def start_gesture_controller():
     """Start the gesture controller in a separate thread"""
-    controller = WebGestureController()
+    import logging
+    # Camera, hand model and Spotify auth initialize concurrently
+    startup.run("camera", open_camera)
+    startup.run("detector", create_detector)
+    startup.run("spotify", connect_spotify)
+    try:
+        controller = WebGestureController(startup.wait("camera"), startup.wait("detector"))
+    except RuntimeError as e:
+        logging.error(e)
+        return
+    logging.info(startup.format_summary())
     controller.run()
 
 if __name__ == '__main__':
@@ -0,0 +1,78 @@
+import threading
+import cv2
+from src.metrics.metrics import Timer, STAGE_SECONDS
+from src.config.settings import JPEG_QUALITY
+
+
+class FrameBroadcaster:
+    """Encode-once, notify-many publisher for the MJPEG video feed
+
+    The producer publishes each encoded frame with an increasing version and
+    every `/video_feed` client waits on a condition variable for a version
+    newer than the one it last sent. A slow client simply skips to the newest
+    frame, and nothing is encoded while no client is subscribed.
+    """
+
+    def __init__(self, quality=JPEG_QUALITY):
+        self.quality = quality
+        self._cond = threading.Condition()
+        self._frame = None
+        self._version = 0
+        self._subscribers = 0
+        self._closed = False
+        self.encoded_frames = 0
+        self.skipped_encodes = 0
+
+    @property
+    def subscribers(self):
+        return self._subscribers
+
+    def publish(self, frame):
+        """Publish already-encoded JPEG bytes"""
+        with self._cond:
+            self._frame = frame
+            self._version += 1
+            self._cond.notify_all()
+
+    def publish_image(self, img):
+        """Encode and publish a BGR frame, unless nobody is watching"""
+        if not self._subscribers:
+            self.skipped_encodes += 1
+            return False
+        with Timer(STAGE_SECONDS, stage="jpeg_encode"):
+            success, buffer = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not success:
+            return False
+        self.encoded_frames += 1
+        self.publish(buffer.tobytes())
+        return True
+
+    def wait_for_frame(self, last_version, timeout=1.0):
+        """Block until a frame newer than `last_version` exists; return (version, frame) or None"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._version != last_version or self._closed, timeout)
+            if self._closed or self._version == last_version or self._frame is None:
+                return None
+            return self._version, self._frame
+
+    def stream(self):
+        """Multipart MJPEG generator for one client"""
+        with self._cond:
+            self._subscribers += 1
+        try:
+            version = 0
+            while not self._closed:
+                latest = self.wait_for_frame(version)
+                if latest is None:
+                    continue
+                version, frame = latest
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
@@ -0,0 +1,215 @@
+import hashlib
+import os
+import queue
+import re
+import threading
+from collections import OrderedDict
+import cv2
+import numpy as np
+import requests
+from src.config.settings import (COVER_CACHE_DIR, COVER_CACHE_ITEMS, COVER_CACHE_DISK_MB, COVER_SIZES,
+                                 COVER_FETCH_TIMEOUT, JPEG_QUALITY)
+
+# Spotify image URLs end in a content hash, e.g. https://i.scdn.co/image/ab67616d0000b273...
+COVER_ID = re.compile(r"^[A-Za-z0-9]{8,64}$")
+
+
+def cover_id(url):
+    """Stable id for an album image URL"""
+    tail = url.rstrip("/").rsplit("/", 1)[-1]
+    if COVER_ID.fullmatch(tail):
+        return tail
+    return hashlib.sha1(url.encode()).hexdigest()
+
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header matches `etag` (weak comparison, as the header requires)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    etag = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+class CoverCache:
+    """Album art proxy cache: bounded in-memory LRU in front of an on-disk LRU
+
+    Images are only fetched for URLs registered through `register()`, and
+    only well-formed ids that were registered or are already cached on disk
+    are looked up, so the `/cover/<id>` route can neither fetch arbitrary
+    URLs nor read arbitrary files. Resized
+    variants are cached separately and limited to COVER_SIZES so a client
+    can't fill the cache with one-off sizes. `prefetch()` warms the cache
+    from a background thread so covers are ready before the browser asks.
+    """
+
+    def __init__(self, directory=COVER_CACHE_DIR, max_items=COVER_CACHE_ITEMS, max_disk_mb=COVER_CACHE_DISK_MB,
+                 sizes=COVER_SIZES):
+        self.directory = directory
+        self.max_items = max_items
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024)
+        self.sizes = sorted(sizes)
+        self._urls = {}  # Cover id -> source URL
+        self._memory = OrderedDict()  # (cover id, size) -> (image bytes, etag)
+        self._lock = threading.Lock()
+        self._prefetch_queue = queue.Queue()
+        self.hits = 0
+        self.disk_hits = 0
+        self.fetches = 0
+        os.makedirs(directory, exist_ok=True)
+        threading.Thread(target=self._prefetch_loop, name="cover-prefetch", daemon=True).start()
+
+    def register(self, url):
+        """Remember a cover URL and return the id it is served under"""
+        key = cover_id(url)
+        with self._lock:
+            self._urls[key] = url
+        return key
+
+    def snap_size(self, size):
+        """Smallest allowed size that covers the requested one (None keeps the original)"""
+        if not size:
+            return None
+        for allowed in self.sizes:
+            if allowed >= size:
+                return allowed
+        return None
+
+    def known(self, key):
+        """Whether `key` is a well-formed cover id that was registered or is cached on disk"""
+        if not isinstance(key, str) or not COVER_ID.fullmatch(key):
+            return False
+        with self._lock:
+            if key in self._urls:
+                return True
+        return os.path.isfile(self._path(key, None))
+
+    def get(self, key, size=None):
+        """(image bytes, etag) for a registered cover, or None if it is unknown or can't be fetched"""
+        # Checked before the key gets anywhere near a file path
+        if not self.known(key):
+            return None
+        size = self.snap_size(size)
+        entry = self._from_memory(key, size)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        data = self._from_disk(key, size)
+        if data is not None:
+            self.disk_hits += 1
+        else:
+            original = self._from_disk(key, None)
+            if original is None:
+                original = self._fetch(key)
+                if original is None:
+                    return None
+                self._to_disk(key, None, original)
+            data = original if size is None else self._resize(original, size)
+            if size is not None:
+                self._to_disk(key, size, data)
+
+        entry = (data, '"' + hashlib.sha1(data).hexdigest() + '"')
+        self._to_memory(key, size, entry)
+        return entry
+
+    def prefetch(self, url, size=None):
+        """Register a cover and load it into the cache in the background"""
+        key = self.register(url)
+        self._prefetch_queue.put((key, size))
+        return key
+
+    def _prefetch_loop(self):
+        while True:
+            key, size = self._prefetch_queue.get()
+            try:
+                self.get(key, size)
+            except Exception as e:
+                print(f"Error prefetching cover {key}: {e}")
+
+    def _from_memory(self, key, size):
+        with self._lock:
+            entry = self._memory.get((key, size))
+            if entry is not None:
+                self._memory.move_to_end((key, size))
+            return entry
+
+    def _to_memory(self, key, size, entry):
+        with self._lock:
+            self._memory[(key, size)] = entry
+            self._memory.move_to_end((key, size))
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def _path(self, key, size):
+        return os.path.join(self.directory, f"{key}_{size or 'orig'}.jpg")
+
+    def _from_disk(self, key, size):
+        path = self._path(key, size)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # Bump the modification time so disk eviction is least-recently-used
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def _to_disk(self, key, size, data):
+        path = self._path(key, size)
+        temp = path + ".tmp"
+        try:
+            with open(temp, "wb") as f:
+                f.write(data)
+            os.replace(temp, path)
+            self._evict_disk()
+        except OSError as e:
+            print(f"Error caching cover {key}: {e}")
+
+    def _evict_disk(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".jpg"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def _fetch(self, key):
+        with self._lock:
+            url = self._urls.get(key)
+        if url is None:
+            return None
+        try:
+            response = requests.get(url, timeout=COVER_FETCH_TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"Error fetching cover {key}: {e}")
+            return None
+        self.fetches += 1
+        return response.content
+
+    def _resize(self, data, size):
+        img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if img is None or max(img.shape[:2]) <= size:
+            return data
+        h, w = img.shape[:2]
+        scale = size / max(h, w)
+        img = cv2.resize(img, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+        ok, encoded = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+        return encoded.tobytes() if ok else data
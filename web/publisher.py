@@ -0,0 +1,57 @@
+import threading
+import time
+from src.config.settings import STATE_MAX_UPDATES_PER_SECOND
+
+
+class StatePublisher:
+    """Single versioned UI state pushed to Socket.IO clients as throttled deltas
+
+    update() only records fields whose value actually changed. Changes are
+    coalesced and emitted as one `state_delta` event at most
+    `max_rate` times per second; clients resync from snapshot() on connect.
+    """
+
+    def __init__(self, socketio, max_rate=STATE_MAX_UPDATES_PER_SECOND):
+        self.socketio = socketio
+        self.min_interval = 1.0 / max_rate
+        self.state = {"gesture": "No Gesture", "fps": 0, "track": None, "last_action": None}
+        self.version = 0
+        self._dirty = {}
+        self._lock = threading.Lock()
+        self._last_emit = 0.0
+        self._timer = None
+        self.emitted = 0
+
+    def update(self, **changes):
+        with self._lock:
+            for name, value in changes.items():
+                if self.state.get(name) != value:
+                    self.state[name] = value
+                    self._dirty[name] = value
+            if not self._dirty or self._timer is not None:
+                return
+            wait = self._last_emit + self.min_interval - time.monotonic()
+            if wait > 0:
+                # Coalesce everything that changes until the next slot into one delta
+                self._timer = threading.Timer(wait, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._timer = None
+            if not self._dirty:
+                return
+            self.version += 1
+            delta = dict(self._dirty, version=self.version)
+            self._dirty = {}
+            self._last_emit = time.monotonic()
+        self.socketio.emit('state_delta', delta)
+        self.emitted += 1
+
+    def snapshot(self):
+        with self._lock:
+            # Pending changes are already in `state`, so a snapshot is always current
+            return dict(self.state, version=self.version)
@@ -13,6 +13,9 @@ const noTrackMessage = document.getElementById('no-track-message');
 const trackDetails = document.getElementById('track-details');
 const playPauseBtn = document.getElementById('play-pause-btn');
 
+// Version of the last server state applied to the page
+let stateVersion = -1;
+
 // Socket.IO event listeners
 socket.on('connect', () => {
     console.log('Connected to server');
@@ -22,17 +25,36 @@ socket.on('disconnect', () => {
     console.log('Disconnected from server');
 });
 
-socket.on('gesture_update', (data) => {
-    currentGestureElement.textContent = data.gesture;
+// Full state, sent by the server on every (re)connect
+socket.on('state_snapshot', (state) => {
+    stateVersion = state.version;
+    applyState(state);
 });
 
-socket.on('fps_update', (data) => {
-    fpsElement.textContent = data.fps;
+// Only the fields that changed since the previous update
+socket.on('state_delta', (delta) => {
+    if (delta.version <= stateVersion) {
+        return;
+    }
+    stateVersion = delta.version;
+    applyState(delta);
 });
 
-socket.on('track_update', (data) => {
-    updateTrackInfo(data);
-});
+// Apply whichever state fields are present
+function applyState(state) {
+    if ('gesture' in state) {
+        currentGestureElement.textContent = state.gesture;
+    }
+    if ('fps' in state) {
+        fpsElement.textContent = state.fps;
+    }
+    if ('track' in state) {
+        updateTrackInfo(state.track);
+    }
+    if ('last_action' in state && state.last_action) {
+        console.log('Last action:', state.last_action);
+    }
+}
 
 // Function to update track information
 function updateTrackInfo(track) {
@@ -48,9 +70,12 @@ function updateTrackInfo(track) {
             controlSpotify(track.is_playing ? 'pause' : 'play');
         };
         
-        // Update album cover if available
-        if (track.cover_url) {
-            albumCoverElement.src = track.cover_url;
+        // Update album cover if available, preferring the server's cached copy
+        const coverSrc = track.cover || track.cover_url;
+        if (coverSrc) {
+            if (albumCoverElement.getAttribute('src') !== coverSrc) {
+                albumCoverElement.src = coverSrc;
+            }
             albumCoverElement.style.display = 'block';
         } else {
             albumCoverElement.style.display = 'none';
@@ -70,54 +95,37 @@ function updateTrackInfo(track) {
     }
 }
 
-// Function to control Spotify
-function controlSpotify(action) {
-    fetch(`/control/${action}`)
+// Show startup progress until the camera and hand model are ready
+function checkStartup() {
+    fetch('/health')
         .then(response => response.json())
-        .then(data => {
-            console.log(`${action} action:`, data);
-            // Fetch updated track info after action
-            setTimeout(fetchTrackInfo, 500);
-        })
-        .catch(error => {
-            console.error('Error controlling Spotify:', error);
-        });
-}
-
-// Function to fetch current track info
-function fetchTrackInfo() {
-    fetch('/get_track_info')
-        .then(response => response.json())
-        .then(data => {
-            if (!data.error) {
-                updateTrackInfo(data);
-            } else {
-                // No track playing
-                noTrackMessage.style.display = 'block';
-                trackDetails.style.display = 'none';
+        .then(status => {
+            if (status.phase === 'starting') {
+                const pending = Object.keys(status.tasks).filter(name => status.tasks[name].state === 'running');
+                currentGestureElement.textContent = `Starting (${pending.join(', ')})...`;
+                setTimeout(checkStartup, 250);
+            } else if (status.phase === 'failed') {
+                const failed = Object.keys(status.tasks).filter(name => status.tasks[name].state === 'failed');
+                currentGestureElement.textContent = `Startup failed: ${failed.join(', ')}`;
             }
         })
-        .catch(error => {
-            console.error('Error fetching track info:', error);
-        });
+        .catch(() => setTimeout(checkStartup, 1000));
 }
 
-// Initial fetch of track info when page loads
-document.addEventListener('DOMContentLoaded', () => {
-    fetchTrackInfo();
-});
+checkStartup();
 
-// Periodically update gesture info as a fallback if socket fails
-setInterval(() => {
-    fetch('/get_gesture')
+// Function to control Spotify
+function controlSpotify(action) {
+    fetch(`/control/${action}`)
         .then(response => response.json())
         .then(data => {
-            currentGestureElement.textContent = data.gesture;
+            // The updated track arrives as a state update once the command has run
+            console.log(`${action} action:`, data);
         })
         .catch(error => {
-            console.error('Error fetching gesture:', error);
+            console.error('Error controlling Spotify:', error);
         });
-}, 1000);
+}
 
 // Function to exit the application
 function exitApplication() {
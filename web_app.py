@@ -9,17 +9,21 @@ import requests
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+HEALTH_POLL_INTERVAL = 0.2  # Seconds between checks while the server starts
+
 def check_server_ready():
     try:
-        response = requests.get('http://127.0.0.1:5000/health')
+        # The page shows camera/model progress itself, so open it as soon as the server answers
+        response = requests.get('http://127.0.0.1:5000/health', timeout=1.0)
         if response.status_code == 200:
+            logging.info(f"Server up, startup phase: {response.json()['phase']}")
             webbrowser.open('http://127.0.0.1:5000')
             return
-    except requests.exceptions.ConnectionError:
+    except requests.exceptions.RequestException:
         pass
     
-    # If we get here, the server isn't ready yet, try again in 1 second
-    Timer(1.0, check_server_ready).start()
+    # If we get here, the server isn't ready yet, try again shortly
+    Timer(HEALTH_POLL_INTERVAL, check_server_ready).start()
 
 if __name__ == "__main__":
     # Add the current directory to the path
@@ -28,16 +32,11 @@ if __name__ == "__main__":
     logging.info("Starting Spotify Gesture Control Web App")
     
     # Start checking if the server is ready
-    Timer(2.0, check_server_ready).start()
+    Timer(HEALTH_POLL_INTERVAL, check_server_ready).start()
     
-    # Import and run the Flask app
+    # Import and run the Flask app (heavy modules load later, in the startup tasks)
     from web.app import app, socketio, start_gesture_controller
     
-    # Add a health check endpoint
-    @app.route('/health')
-    def health_check():
-        return "OK"
-    
     # Start the gesture controller in a separate thread
     logging.info("Starting gesture controller thread")
     from threading import Thread